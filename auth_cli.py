@@ -0,0 +1,172 @@
+"""命令行入口：获取验证码、列出账户、导出账户
+
+    main.py                      启动界面（已在运行时显示主窗口）
+    main.py show                 同上
+    main.py get <关键词>          打印匹配账户的当前验证码
+    main.py list                 列出全部账户
+    main.py export <文件> [--format json|csv|uri] [--encrypt]
+
+程序已在运行时 get/list 转发给运行中的实例；否则直接读取账户文件计算，
+只导入 OTP 计算和账户文件读取模块，不加载界面库、pyzbar、PIL 和 pystray。
+--config-dir <目录> 指定账户目录（总是直接读取，不转发；界面不支持，不能与 show 一起使用）。
+无法连接运行中的实例（IPC 目录权限、超时等）时 show 直接启动界面。
+"""
+import sys
+import time
+
+from instance_ipc import send_command
+from gauth_core.otp_engine import decode_secret, hotp_code
+from gauth_core.vault_store import (read_settings, resolve_config_dir, vault_path, read_vault, read_vault_candidates,
+                         find_accounts, stable_account_id)
+
+USAGE = "用法：main.py [show | get <关键词> | list | export <文件> [--format json|csv|uri] [--encrypt]] [--config-dir <目录>]"
+TOTP_PERIOD = 30
+
+
+def _error(message):
+    print(message, file=sys.stderr)
+
+
+def _print_codes(entries):
+    if len(entries) == 1:
+        print(entries[0]["code"])
+    else:
+        for entry in entries:
+            print(f"{entry['code']}\t{entry['issuer']}\t{entry['name']}")
+
+
+def _print_accounts(entries):
+    for entry in entries:
+        print(f"{entry['issuer']}\t{entry['name']}")
+
+
+def _parse_options(args):
+    """拆分位置参数和 --选项 值"""
+    positional, options = [], {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--encrypt":
+            options["encrypt"] = True
+        elif arg in ("--format", "--config-dir"):
+            if i + 1 >= len(args):
+                raise ValueError(f"{arg} 缺少参数值")
+            options[arg[2:]] = args[i + 1]
+            i += 1
+        elif arg.startswith("--"):
+            raise ValueError(f"未知选项：{arg}")
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, options
+
+
+def _config_dir(options):
+    return options.get("config-dir") or resolve_config_dir(read_settings())
+
+
+def headless_codes(config_dir, query):
+    """直接读取账户文件计算验证码（HOTP 取账户文件与计数器日志中的较大值，不推进计数器）"""
+    matches = find_accounts(read_vault_candidates(vault_path(config_dir), query), query)
+    journal = None
+    now_counter = int(time.time()) // TOTP_PERIOD
+    entries = []
+    for acc in matches:
+        if acc.get("type") == "hotp":
+            if journal is None:
+                from gauth_core.hotp_store import HotpCounterJournal
+                journal = HotpCounterJournal(config_dir).load()
+            counter = max(int(acc.get("counter", 0)), journal.get(stable_account_id(acc["secret"]), 0))
+        else:
+            counter = now_counter
+        entries.append({"issuer": acc["issuer"], "name": acc["name"],
+                        "code": hotp_code(decode_secret(acc["secret"]), counter)})
+    return entries
+
+
+def headless_export(config_dir, output, format_name=None, encrypt=False):
+    """流式导出账户文件（按需导入导出模块）"""
+    import getpass
+    from gauth_core.exporters import export_accounts, iter_vault_records, ENCRYPTED_SUFFIX
+
+    password = None
+    if encrypt:
+        password = getpass.getpass("设置导出密码: ")
+        if password != getpass.getpass("再次输入密码: "):
+            raise ValueError("两次输入的密码不一致")
+        if not output.endswith(ENCRYPTED_SUFFIX):
+            output += ENCRYPTED_SUFFIX
+    count = export_accounts(iter_vault_records(vault_path(config_dir)), output, format_name, password)
+    print(f"已导出 {count} 个账户到 {output}")
+
+
+def main(argv):
+    """执行命令行；返回进程退出码，需要启动界面时返回 None"""
+    try:
+        positional, options = _parse_options(argv)
+    except ValueError as e:
+        _error(f"{e}\n{USAGE}")
+        return 2
+    cmd = positional[0] if positional else "show"
+    args = positional[1:]
+    headless = "config-dir" in options
+
+    try:
+        if cmd == "show":
+            if headless:
+                _error(f"show 不支持 --config-dir\n{USAGE}")
+                return 2
+            try:
+                response = send_command("show")
+            except OSError as e:
+                _error(f"无法连接运行中的实例，启动界面：{e}")
+                return None
+            return None if response is None else 0
+
+        if cmd == "get":
+            if not args:
+                _error(USAGE)
+                return 2
+            query = " ".join(args)
+            response = None if headless else send_command("get", [query])
+            if response is None:
+                entries = headless_codes(_config_dir(options), query)
+                if not entries:
+                    raise ValueError(f"未找到匹配的账户：{query}")
+                _print_codes(entries)
+                return 0
+            if not response.get("ok"):
+                raise ValueError(response.get("error", "命令执行失败"))
+            _print_codes(response["result"])
+            return 0
+
+        if cmd == "list":
+            response = None if headless else send_command("list")
+            if response is None:
+                _print_accounts(read_vault(vault_path(_config_dir(options))))
+                return 0
+            if not response.get("ok"):
+                raise ValueError(response.get("error", "命令执行失败"))
+            _print_accounts(response["result"])
+            return 0
+
+        if cmd == "export":
+            if len(args) != 1:
+                _error(USAGE)
+                return 2
+            headless_export(_config_dir(options), args[0], options.get("format"), options.get("encrypt", False))
+            return 0
+    except (OSError, ValueError) as e:
+        _error(str(e))
+        return 1
+
+    _error(f"未知命令：{cmd}\n{USAGE}")
+    return 2
+
+
+if __name__ == "__main__":
+    exit_code = main(sys.argv[1:])
+    if exit_code is None:
+        _error("程序未运行，请运行 main.py 启动界面")
+        exit_code = 1
+    sys.exit(exit_code)
@@ -0,0 +1,125 @@
+"""本地 JSON-RPC 接口压力测试：多个持久连接并发请求，统计吞吐量和延迟
+
+    python benchmarks/api_load.py [账户数量] [并发连接数] [每连接请求数] [批量大小]
+    python benchmarks/api_load.py --url 127.0.0.1:8765 --token <令牌>   （测试运行中的程序）
+
+不指定 --url 时在本进程内用随机账户启动接口。
+"""
+import base64
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from gauth_core.code_cache import CodeCache  # noqa: E402
+from local_api import LocalApiServer, RPC_PATH  # noqa: E402
+from perf_metrics import LatencyStats  # noqa: E402
+from gauth_core.vault_store import stable_account_id  # noqa: E402
+
+
+def make_accounts(count):
+    accounts = {}
+    for i in range(count):
+        secret = base64.b32encode(os.urandom(20)).decode("ascii")
+        account_id = stable_account_id(secret)
+        accounts[account_id] = {"id": account_id, "issuer": f"Issuer{i}", "name": f"user{i}", "secret": secret}
+    return accounts
+
+
+def rpc_client(address, token, stats, bodies, errors):
+    """单个持久连接，依次发送 bodies"""
+    host, _, port = address.rpartition(":")
+    conn = http.client.HTTPConnection(host.strip("[]"), int(port), timeout=10)
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+    for body in bodies:
+        start = time.perf_counter()
+        conn.request("POST", RPC_PATH, body, headers)
+        response = conn.getresponse()
+        data = response.read()
+        stats.record((time.perf_counter() - start) * 1000)
+        if response.status != 200 or b'"error": {' in data:
+            errors.append(data[:200])
+    conn.close()
+
+
+def run_load(address, token, ids, connections, requests, batch):
+    """并发压测，返回 (请求数/秒, 验证码数/秒, 延迟统计, 错误列表)"""
+    stats = LatencyStats("请求延迟", window=connections * requests)
+    errors = []
+    threads = []
+    for c in range(connections):
+        bodies = []
+        for r in range(requests):
+            offset = (c * requests + r) * batch
+            chosen = [ids[(offset + k) % len(ids)] for k in range(batch)]
+            if batch == 1:
+                request = {"jsonrpc": "2.0", "id": r, "method": "get_code", "params": [chosen[0]]}
+            else:
+                request = {"jsonrpc": "2.0", "id": r, "method": "get_codes", "params": [chosen]}
+            bodies.append(json.dumps(request).encode("utf-8"))
+        threads.append(threading.Thread(target=rpc_client, args=(address, token, stats, bodies, errors)))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = connections * requests
+    return total / elapsed, total * batch / elapsed, stats, errors
+
+
+def main():
+    args = sys.argv[1:]
+    url = token = None
+    if "--url" in args:
+        url = args.pop(args.index("--url") + 1)
+        args.remove("--url")
+    if "--token" in args:
+        token = args.pop(args.index("--token") + 1)
+        args.remove("--token")
+    count = int(args[0]) if len(args) > 0 else 1000
+    connections = int(args[1]) if len(args) > 1 else 8
+    requests = int(args[2]) if len(args) > 2 else 2000
+    batch = int(args[3]) if len(args) > 3 else 50
+
+    server = None
+    if url is None:
+        accounts = make_accounts(count)
+        cache = CodeCache()
+        token = "benchmark-token"
+        server = LocalApiServer("127.0.0.1:0", token, lambda: accounts, cache.code, cache.remaining).start()
+        url = server.bound_address()
+        ids = list(accounts)
+    else:
+        if not token:
+            raise SystemExit("测试运行中的程序需要 --token")
+        conn = http.client.HTTPConnection(*url.rsplit(":", 1))
+        conn.request("POST", RPC_PATH, json.dumps({"jsonrpc": "2.0", "id": 0, "method": "list_accounts"}),
+                     {"Authorization": f"Bearer {token}"})
+        ids = [acc["id"] for acc in json.loads(conn.getresponse().read())["result"]]
+        conn.close()
+        if not ids:
+            raise SystemExit("运行中的程序没有账户")
+
+    try:
+        print(f"接口：{url}，账户 {len(ids)} 个，{connections} 个持久连接，每连接 {requests} 次请求")
+        for size in (1, batch):
+            rate, codes, stats, errors = run_load(url, token, ids, connections, requests, size)
+            s = stats.summary()
+            label = "单个 get_code" if size == 1 else f"批量 get_codes×{size}"
+            print(f"{label}：{rate:.0f} 请求/秒，{codes:.0f} 验证码/秒，"
+                  f"p50 {s['p50']:.2f}ms，p95 {s['p95']:.2f}ms，错误 {len(errors)}")
+            for error in errors[:5]:
+                print(f"  {error!r}")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""命令行启动耗时测试：生成账户文件，多次运行 auth_cli.py get，统计从启动到打印验证码的耗时
+
+    python benchmarks/cli_startup.py [账户数量] [运行次数]
+
+耗时包括解释器启动；同时输出扣除解释器空启动后的命令自身耗时。
+get 必须导入的标准库 json（连带 re、enum、functools）和 hashlib（OpenSSL）占命令自身耗时的大半，
+查找和计算本身约 3ms。在开发用的 Linux 容器上（空启动约 18-23ms）中位数约 55-59ms，
+超过 50ms 的目标；空启动较快的机器上可以达标。
+"""
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+# 允许写入 .pyc：否则每次都要重新编译源码，测到的是编译耗时
+ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+from gauth_core.exporters import write_json  # noqa: E402
+from gauth_core.vault_store import VAULT_FILE_NAME  # noqa: E402
+
+HEAVY_MODULES = ("customtkinter", "tkinter", "PIL", "pyzbar", "pystray", "pyotp", "google.protobuf")
+
+
+def make_vault(directory, count):
+    records = (
+        {
+            "issuer": f"Issuer{i}",
+            "name": f"user{i}@example.com",
+            "secret": base64.b32encode(os.urandom(20)).decode("ascii"),
+            "type": "totp",
+            "counter": 0
+        }
+        for i in range(count)
+    )
+    with open(os.path.join(directory, VAULT_FILE_NAME), "w", encoding="utf-8") as f:
+        write_json(f, records)
+
+
+def timed_run(args):
+    start = time.perf_counter()
+    result = subprocess.run(args, capture_output=True, text=True, cwd=ROOT, env=ENV)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"运行失败：{result.stderr}")
+    return elapsed, result.stdout
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    with tempfile.TemporaryDirectory() as directory:
+        make_vault(directory, count)
+        query = f"Issuer{count // 2}"
+        cli = [sys.executable, os.path.join(ROOT, "auth_cli.py"), "get", query, "--config-dir", directory]
+        timed_run(cli)  # 预先生成 .pyc
+        baseline = sorted(timed_run([sys.executable, "-c", "pass"])[0] for _ in range(runs))
+        timings = sorted(timed_run(cli)[0] for _ in range(runs))
+
+        # 确认没有加载界面相关模块
+        check = (f"import sys; sys.argv = {cli[1:]!r}; import runpy\n"
+                 f"try:\n    runpy.run_path(sys.argv[0], run_name='__main__')\n"
+                 f"except SystemExit:\n    pass\n"
+                 f"print([m for m in {HEAVY_MODULES!r} if m in sys.modules])")
+        loaded = timed_run([sys.executable, "-c", check])[1].strip().splitlines()[-1]
+
+    median = timings[len(timings) // 2]
+    base = baseline[len(baseline) // 2]
+    print(f"账户数量：{count}，运行 {runs} 次")
+    print(f"解释器空启动：中位数 {base:.1f}ms")
+    print(f"get 命令：中位数 {median:.1f}ms，最快 {timings[0]:.1f}ms，最慢 {timings[-1]:.1f}ms，"
+          f"扣除空启动约 {median - base:.1f}ms")
+    print(f"加载的界面相关模块：{loaded}")
+    print("✅ 达标（< 50ms）" if median < 50 else "⚠️ 超过 50ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""共享内存验证码表读取测试：写入端在子进程中按周期刷新，本进程反复读取
+
+    python benchmarks/code_table_read.py [账户数量] [读取次数]
+
+先测量写入端空闲时（正常情况：每30秒写一次）的读取速度，
+再让写入端以最快速度连续重写（每轮验证码全部相同且为轮次编号）检查 seqlock：
+读者读到的整表快照必须来自同一轮。
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from code_table import CodeTablePublisher, CodeTableReader  # noqa: E402
+
+BENCH_TABLE = f"gauth_codes_bench_{os.getpid()}"
+
+
+def account_ids(count):
+    return [f"{i:016x}" for i in range(count)]
+
+
+def writer(count, ready, churn, stop):
+    """churn 置位后连续重写：第 n 轮所有验证码都是 n（6 位）"""
+    publisher = CodeTablePublisher(BENCH_TABLE)
+    ids = account_ids(count)
+    round_number = 0
+    now = int(time.time())
+    publisher.publish([(account_id, f"{round_number:06d}", False) for account_id in ids], 0, now + 3600)
+    ready.set()
+    churn.wait()
+    while not stop.is_set():
+        round_number = (round_number + 1) % 1000000
+        publisher.publish([(account_id, f"{round_number:06d}", False) for account_id in ids], 0, now + 3600)
+    publisher.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    reads = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    ready, churn, stop = multiprocessing.Event(), multiprocessing.Event(), multiprocessing.Event()
+    process = multiprocessing.Process(target=writer, args=(count, ready, churn, stop))
+    process.start()
+    try:
+        ready.wait(10)
+        reader = CodeTableReader(BENCH_TABLE)
+        ids = account_ids(count)
+
+        print(f"账户数量：{count}")
+        for label in ("写入端空闲", "写入端连续重写"):
+            if label != "写入端空闲":
+                churn.set()
+            start = time.perf_counter()
+            for i in range(reads):
+                reader.get(ids[i % count])
+            elapsed = time.perf_counter() - start
+            print(f"{label}，单个读取：{reads / elapsed:.0f} 次/秒，平均 {elapsed / reads * 1e6:.2f}µs")
+
+        torn = gave_up = 0
+        snapshots = 2000
+        start = time.perf_counter()
+        for _ in range(snapshots):
+            table = reader.snapshot()
+            if table is None:
+                gave_up += 1
+                continue
+            codes = {code for code, _ in table.values()}
+            if len(codes) != 1:
+                torn += 1
+        elapsed = time.perf_counter() - start
+        print(f"整表快照：{snapshots / elapsed:.0f} 次/秒，不一致快照 {torn} 个，放弃 {gave_up} 次")
+        reader.close()
+    finally:
+        stop.set()
+        process.join()
+    sys.exit(1 if torn else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""核心服务无界面测试：读取、保存、验证码，以及慢操作进行时事件循环是否仍能及时响应
+
+    python benchmarks/core_service.py [账户数量]
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.cli_startup import make_vault  # noqa: E402
+from core_service import CoreService  # noqa: E402
+from perf_metrics import LatencyStats  # noqa: E402
+
+
+async def ping():
+    return time.perf_counter()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as directory:
+        make_vault(directory, count)
+        core = CoreService(directory).start()
+        try:
+            start = time.perf_counter()
+            records = core.call(core.load_accounts())
+            print(f"读取 {len(records)} 个账户：{(time.perf_counter() - start) * 1000:.1f}ms")
+
+            start = time.perf_counter()
+            codes = core.call(core.codes(records))
+            print(f"计算 {len(codes)} 个验证码：{(time.perf_counter() - start) * 1000:.1f}ms")
+            start = time.perf_counter()
+            core.call(core.codes(records))
+            print(f"同一窗口再次获取（缓存）：{(time.perf_counter() - start) * 1000:.1f}ms")
+
+            # 连续提交保存，同时测量调用方提交耗时和事件循环响应延迟
+            submit_stats = LatencyStats("提交保存（调用方耗时）")
+            ping_stats = LatencyStats("保存进行中的事件循环响应")
+            saves = []
+            start = time.perf_counter()
+            for _ in range(20):
+                t = time.perf_counter()
+                saves.append(core.submit(core.save_accounts(records)))
+                submit_stats.record((time.perf_counter() - t) * 1000)
+                for _ in range(5):
+                    t = time.perf_counter()
+                    core.call(ping())
+                    ping_stats.record((time.perf_counter() - t) * 1000)
+            for future in saves:
+                future.result()
+            elapsed = time.perf_counter() - start
+            print(f"保存 20 次：共 {elapsed * 1000:.0f}ms")
+            print(submit_stats.report())
+            print(ping_stats.report())
+            for line in core.report():
+                print(line)
+        finally:
+            core.stop()
+
+
+if __name__ == "__main__":
+    main()
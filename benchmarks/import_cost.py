@@ -0,0 +1,61 @@
+"""核心库导入耗时测试：在新进程中多次 import gauth_core，统计中位数
+
+    python benchmarks/import_cost.py [运行次数] [模块名]
+
+扣除解释器空启动的耗时，即嵌入方实际付出的导入代价（包括核心库间接加载的标准库模块）。
+同时检查导入后没有加载界面库、protobuf、cryptography、typing 以及 re/json/hashlib 等
+较慢的标准库模块（在慢机器上各要数毫秒到十几毫秒），也没有向标准输出打印任何内容。
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 允许写入 .pyc：否则每次都要重新编译源码，测到的是编译耗时
+ENV = {k: v for k, v in os.environ.items() if k != "PYTHONDONTWRITEBYTECODE"}
+
+HEAVY_MODULES = ("customtkinter", "tkinter", "PIL", "pyzbar", "pystray", "pyotp",
+                 "google.protobuf", "cryptography", "typing", "asyncio", "main",
+                 "re", "json", "base64", "hashlib")
+BUDGET_MS = 3.0
+
+
+def timed_run(code):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, env=ENV)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f"运行失败：{result.stderr}")
+    return elapsed, result.stdout
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    module = sys.argv[2] if len(sys.argv) > 2 else "gauth_core"
+    timed_run(f"import {module}")  # 预先生成 .pyc
+
+    baseline, timings = [], []
+    for _ in range(runs):
+        # 交替运行，减少机器负载波动的影响
+        baseline.append(timed_run("pass")[0])
+        timings.append(timed_run(f"import {module}")[0])
+    base, median = (sorted(values)[len(values) // 2] for values in (baseline, timings))
+
+    check = f"import sys; import {module}; print([m for m in {HEAVY_MODULES!r} if m in sys.modules])"
+    output = timed_run(check)[1].strip().splitlines()
+    loaded = output[-1]
+    printed = output[:-1]
+
+    print(f"导入 {module}，运行 {runs} 次")
+    print(f"解释器空启动：中位数 {base:.1f}ms")
+    print(f"空启动 + 导入：中位数 {median:.1f}ms，导入总代价约 {median - base:.1f}ms")
+    print(f"加载的重量级模块：{loaded}")
+    print(f"导入时打印的内容：{printed}")
+    ok = median - base < BUDGET_MS and loaded == "[]" and not printed
+    print(f"✅ 达标（< {BUDGET_MS:.0f}ms，无副作用）" if ok else "⚠️ 未达标")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""账户文件多进程写入测试：多个进程同时新增账户，检查没有修改丢失；并比较轮询与整体解析的耗时
+
+    python benchmarks/vault_concurrency.py [进程数] [每进程新增账户数] [初始账户数]
+
+每个进程像界面一样：读取一次，之后每次在自己的内存列表上新增一个账户并保存（不主动重新读取），
+版本冲突由核心服务持锁合并后保存。结束时账户文件必须包含初始账户和所有进程新增的账户。
+"""
+import base64
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.cli_startup import make_vault  # noqa: E402
+from core_service import CoreService  # noqa: E402
+from gauth_core.vault_store import VaultWatcher, read_vault, read_vault_version, vault_path  # noqa: E402
+
+
+def writer(directory, index, count, start, results):
+    core = CoreService(directory).start()
+    try:
+        records = core.call(core.load_accounts())
+        start.wait()
+        merged = 0
+        for i in range(count):
+            records.append({"issuer": f"Writer{index}", "name": f"added{i}",
+                            "secret": base64.b32encode(os.urandom(20)).decode("ascii"),
+                            "type": "totp", "counter": 0})
+            result = core.call(core.save_accounts(records))
+            merged += result["merged"]
+        results.put((index, merged))
+    finally:
+        core.stop()
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    per_process = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    initial = int(sys.argv[3]) if len(sys.argv) > 3 else 1000
+    with tempfile.TemporaryDirectory() as directory:
+        make_vault(directory, initial)
+        path = vault_path(directory)
+
+        start, results = multiprocessing.Event(), multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=writer, args=(directory, i, per_process, start, results))
+                   for i in range(processes)]
+        for worker in workers:
+            worker.start()
+        time.sleep(0.5)
+        begin = time.perf_counter()
+        start.set()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - begin
+        merged = sum(results.get()[1] for _ in workers)
+
+        accounts = read_vault(path)
+        added = sum(1 for acc in accounts if acc["issuer"].startswith("Writer"))
+        expected = processes * per_process
+        print(f"{processes} 个进程各保存 {per_process} 次：共 {elapsed:.2f}秒，合并保存 {merged} 次")
+        print(f"账户文件版本 {read_vault_version(path)}，账户 {len(accounts)} 个（新增 {added}/{expected}）")
+
+        # 轮询成本：文件未变时 stat，被 touch 后读首行，与整体解析比较
+        watcher = VaultWatcher(path)
+        watcher.mark(read_vault_version(path))
+        rounds = 10000
+        watcher.changed()
+        t = time.perf_counter()
+        for _ in range(rounds):
+            watcher.changed()
+        poll_us = (time.perf_counter() - t) / rounds * 1e6
+        t = time.perf_counter()
+        for _ in range(rounds):
+            read_vault_version(path)
+        header_us = (time.perf_counter() - t) / rounds * 1e6
+        t = time.perf_counter()
+        for _ in range(100):
+            read_vault(path)
+        parse_us = (time.perf_counter() - t) / 100 * 1e6
+        print(f"轮询（文件未变）：{poll_us:.1f}µs，读首行：{header_us:.1f}µs，整体解析：{parse_us:.0f}µs")
+
+    ok = added == expected and len(accounts) == initial + expected
+    print("✅ 没有修改丢失" if ok else "❌ 有修改丢失")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
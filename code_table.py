@@ -0,0 +1,214 @@
+"""共享内存验证码表
+
+运行中的程序每个30秒窗口把全部账户的当前验证码写入一块命名共享内存，
+本机其他进程高频读取时无需任何系统调用或 IPC 往返。
+
+布局（小端）：
+    表头 40 字节：magic(8) version(8) count(4) capacity(4) layout(4) retired(4) window(8)
+    记录 40 字节：账户ID(16, ASCII) 验证码(10, ASCII，不足补 0) 保留(6) 过期时间(8，HOTP 为 0)
+
+version 是 seqlock 计数器：写入前加一（奇数表示正在写），写完再加一。
+读者先读 version，为奇数或读完后发生变化就重试；写入端中途退出时 version 会一直是奇数，
+读者重试 MAX_READ_ATTEMPTS 次后放弃。
+layout 在账户集合或顺序变化时加一，读者据此重建 账户ID -> 槽位 索引。
+容量不足时写入端创建新的共享内存并把旧表标记为 retired，读者检测到后重新连接。
+
+读取示例：
+    from code_table import CodeTableReader
+    reader = CodeTableReader()
+    code = reader.get("0123456789abcdef")
+"""
+import os
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+MAGIC = b"GACODES1"
+HEADER = struct.Struct("<8sQIIIIQ")
+RECORD = struct.Struct("<16s10s6xQ")
+VERSION = struct.Struct("<Q")
+VERSION_OFFSET = 8
+ID_SIZE = 16
+MIN_CAPACITY = 64
+# 读者最多重试的次数（正在写时让出CPU；写入端卡住时约几十毫秒后放弃）
+MAX_READ_ATTEMPTS = 1000
+
+
+def table_name():
+    """本用户的共享内存名"""
+    if sys.platform.startswith("win"):
+        return "gauth_codes_" + os.environ.get("USERNAME", "user")
+    return f"gauth_codes_{os.getuid()}"
+
+
+def _write_header(buf, magic, version, count, capacity, layout, retired, window):
+    """先写除 version 外的表头，最后单独写 version
+
+    struct.pack_into 会先把目标区域清零再逐个写字段，读者可能看到 magic/version 为 0；
+    这里用整段复制（magic 不变，version 保持旧值）代替。
+    """
+    old_version = VERSION.unpack_from(buf, VERSION_OFFSET)[0]
+    buf[:HEADER.size] = HEADER.pack(magic, old_version, count, capacity, layout, retired, window)
+    buf[VERSION_OFFSET:VERSION_OFFSET + VERSION.size] = VERSION.pack(version)
+
+
+def _segment_size(capacity):
+    return HEADER.size + capacity * RECORD.size
+
+
+def _attach(name):
+    """连接已存在的共享内存；旧版本 Python 中避免读者退出时被 resource_tracker 删除"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    if not sys.platform.startswith("win"):
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class CodeTablePublisher:
+    """写入端（只在一个线程中调用 publish）"""
+
+    def __init__(self, name=None):
+        self.name = name or table_name()
+        self.shm = None
+        self.capacity = 0
+        self.version = 0
+        self.layout = 0
+        self.ids = ()
+
+    def _create(self, capacity):
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=_segment_size(capacity))
+        except FileExistsError:
+            # 上次异常退出留下的，或扩容前的旧表：替换掉
+            stale = _attach(self.name)
+            self._retire(stale)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=_segment_size(capacity))
+        return shm
+
+    def _retire(self, shm):
+        buf = shm.buf
+        if len(buf) >= HEADER.size and bytes(buf[:8]) == MAGIC:
+            magic, version, count, capacity, layout, _, window = HEADER.unpack_from(buf)
+            _write_header(buf, magic, version + 2 - version % 2, count, capacity, layout, 1, window)
+
+    def publish(self, entries, window, expiry):
+        """写入 [(账户ID, 验证码, 是否 HOTP), ...]；window 为窗口编号，expiry 为窗口结束的 Unix 时间"""
+        ids = tuple(entry[0] for entry in entries)
+        if len(entries) > self.capacity or self.shm is None:
+            capacity = max(MIN_CAPACITY, self.capacity)
+            while capacity < len(entries):
+                capacity *= 2
+            old = self.shm
+            if old is not None:
+                self._retire(old)
+                old.close()
+                old.unlink()
+            self.shm = self._create(capacity)
+            self.capacity = capacity
+            self.ids = None
+        if ids != self.ids:
+            self.layout += 1
+            self.ids = ids
+
+        buf = self.shm.buf
+        self.version += 1  # 奇数：正在写
+        buf[VERSION_OFFSET:VERSION_OFFSET + VERSION.size] = VERSION.pack(self.version)
+        offset = HEADER.size
+        for account_id, code, hotp in entries:
+            RECORD.pack_into(buf, offset, account_id.encode("ascii"), code.encode("ascii"), 0 if hotp else expiry)
+            offset += RECORD.size
+        self.version += 1
+        _write_header(buf, MAGIC, self.version, len(entries), self.capacity, self.layout, 0, window)
+
+    def close(self):
+        """退出时删除共享内存"""
+        if self.shm is not None:
+            self._retire(self.shm)
+            self.shm.close()
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+            self.shm = None
+
+
+class CodeTableReader:
+    """读取端：直接读共享内存，不发起系统调用（首次连接和写入端扩容后重连除外）"""
+
+    def __init__(self, name=None):
+        self.name = name or table_name()
+        self.shm = None
+        self.buf = None
+        self.layout = -1
+        self.slots = {}
+
+    def _connect(self):
+        self.close()
+        self.shm = _attach(self.name)  # 程序未运行时抛出 FileNotFoundError
+        self.buf = self.shm.buf
+        self.layout = -1
+
+    def _header(self):
+        if self.buf is None:
+            self._connect()
+        header = HEADER.unpack_from(self.buf)
+        if header[0] != MAGIC or header[5]:
+            self._connect()
+            header = HEADER.unpack_from(self.buf)
+            if header[0] != MAGIC:
+                raise FileNotFoundError("验证码表尚未写入")
+        return header
+
+    def _index(self, count, layout):
+        if layout != self.layout:
+            buf = self.buf
+            self.slots = {
+                bytes(buf[HEADER.size + i * RECORD.size:HEADER.size + i * RECORD.size + ID_SIZE]).decode("ascii"): i
+                for i in range(count)
+            }
+            self.layout = layout
+        return self.slots
+
+    def get(self, account_id):
+        """账户当前验证码；过期（程序已停止刷新）、找不到账户或一直读不到一致的数据时返回 None"""
+        for _ in range(MAX_READ_ATTEMPTS):
+            _, version, count, _, layout, _, _ = self._header()
+            if version % 2:
+                time.sleep(0)
+                continue
+            slot = self._index(count, layout).get(account_id)
+            if slot is None:
+                code = expiry = None
+            else:
+                _, code, expiry = RECORD.unpack_from(self.buf, HEADER.size + slot * RECORD.size)
+            if VERSION.unpack_from(self.buf, VERSION_OFFSET)[0] != version:
+                continue
+            if code is None or (expiry and expiry <= time.time()):
+                return None
+            return code.rstrip(b"\0").decode("ascii")
+        return None
+
+    def snapshot(self):
+        """一致地读取整张表：{账户ID: (验证码, 过期时间)}；一直读不到一致的数据时返回 None"""
+        for _ in range(MAX_READ_ATTEMPTS):
+            _, version, count, _, _, _, _ = self._header()
+            if version % 2:
+                time.sleep(0)
+                continue
+            records = [RECORD.unpack_from(self.buf, HEADER.size + i * RECORD.size) for i in range(count)]
+            if VERSION.unpack_from(self.buf, VERSION_OFFSET)[0] == version:
+                return {account_id.decode("ascii"): (code.rstrip(b"\0").decode("ascii"), expiry)
+                        for account_id, code, expiry in records}
+        return None
+
+    def close(self):
+        if self.shm is not None:
+            self.buf = None
+            self.shm.close()
+            self.shm = None
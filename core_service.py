@@ -0,0 +1,230 @@
+"""账户核心服务（不依赖界面库）
+
+账户文件读写、HOTP 计数器日志、验证码、扫码、导入导出都在这里，
+运行在独立线程的 asyncio 事件循环中；阻塞操作（读写文件、解码图片、重新同步、
+密钥派生）放进线程池，事件循环本身只做调度，界面线程永远不会等待它们。
+
+账户文件可能同时被其他进程写入：保存时按读取时的版本号做 compare-and-swap，
+版本已变则持锁把本进程的修改合并到文件中的最新内容上再写（见 vault_store.merge_vault_records）；
+vault_changed() 轮询其他进程的改写，只 stat 或读首行。
+
+界面只是客户端之一：
+    core = CoreService(config_dir).start()
+    core.submit(core.save_accounts(records), on_done)   # on_done(result, error) 在核心线程回调
+脚本和测试可以同步调用：
+    records = core.call(core.load_accounts())
+"""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from gauth_core.code_cache import CodeCache
+from gauth_core.exporters import export_accounts
+from gauth_core.hotp_store import HotpCounterJournal
+from gauth_core.importers import iter_file_records
+from gauth_core.otp_engine import resync_hotp
+from gauth_core.vault_store import (VAULT_FILE_NAME, VaultConflictError, VaultLock, VaultWatcher, build_vault_records,
+                                   merge_vault_records, read_vault_state, update_vault, write_vault)
+from perf_metrics import LatencyStats
+
+STOP_TIMEOUT = 5.0
+
+
+class CoreService:
+    """核心服务：协程 API + 独立事件循环线程"""
+
+    def __init__(self, config_dir, code_cache=None, max_workers=4):
+        self.code_cache = code_cache or CodeCache()
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="core")
+        self.loop = None
+        self.thread = None
+        self.write_lock = None  # 在事件循环中创建；账户文件与计数器日志的写入按提交顺序串行
+        self.pending = set()
+        self.stats = {}  # 操作名 -> LatencyStats
+        self._use_config_dir(config_dir)
+
+    def _use_config_dir(self, config_dir):
+        self.config_dir = config_dir
+        self.vault_file = os.path.join(config_dir, VAULT_FILE_NAME)
+        self.journal = HotpCounterJournal(config_dir)
+        self.watcher = VaultWatcher(self.vault_file)  # watcher.version 即本进程已知的账户文件版本
+        self.base_records = []  # 调用方上次读取/保存的内容（合并时的共同祖先）
+        self.in_sync = False  # 账户文件 watcher.version 版本的内容是否就是 base_records
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        ready = threading.Event()
+
+        def run():
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            self.write_lock = asyncio.Lock()
+            ready.set()
+            self.loop.run_forever()
+            self.loop.close()
+
+        self.thread = threading.Thread(target=run, name="core-loop", daemon=True)
+        self.thread.start()
+        ready.wait()
+        return self
+
+    def stop(self, timeout=STOP_TIMEOUT):
+        """等待进行中的操作（最多 timeout 秒，保证账户文件写完）后停止事件循环"""
+        if self.loop is None:
+            return
+        for future in list(self.pending):
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+        self.executor.shutdown(wait=False)
+        self.loop = None
+
+    def submit(self, coro, on_done=None):
+        """在核心线程执行协程，返回 concurrent.futures.Future；可选 on_done(result, error)"""
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        self.pending.add(future)
+
+        def done(f):
+            self.pending.discard(f)
+            if on_done is None:
+                return
+            error = f.exception()
+            on_done(None if error else f.result(), error)
+
+        future.add_done_callback(done)
+        return future
+
+    def call(self, coro, timeout=None):
+        """同步等待协程结果（脚本、测试用；不要在界面线程中调用耗时操作）"""
+        return self.submit(coro).result(timeout)
+
+    async def _blocking(self, name, fn, *args):
+        """在线程池中执行阻塞函数并记录耗时"""
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = LatencyStats(name)
+        with stats.time():
+            return await self.loop.run_in_executor(self.executor, fn, *args)
+
+    # ---------- 账户存储 ----------
+
+    async def set_config_dir(self, config_dir):
+        """切换账户目录（等已提交的写入完成）"""
+        async with self.write_lock:
+            self._use_config_dir(config_dir)
+
+    async def load_accounts(self):
+        """读取账户记录（见 build_vault_records），并记住版本号供保存时比较"""
+        def load():
+            version, items = read_vault_state(self.vault_file)
+            return version, build_vault_records(items, self.journal)
+
+        async with self.write_lock:
+            version, records = await self._blocking("读取账户", load)
+            self.watcher.mark(version)
+            self.base_records = [dict(r) for r in records]  # 调用方可能修改返回的列表
+            self.in_sync = True
+        return records
+
+    async def save_accounts(self, records):
+        """写入账户文件（加锁 + 比较版本号），成功后清空计数器日志
+
+        账户文件已被其他进程改写时，把 records 相对调用方上次读取/保存内容的修改合并到最新内容上再写；
+        合并后调用方的列表已过期，重新读取之前的每次保存都按合并处理，不会覆盖其他进程的修改。
+        返回 {count, version, merged}；merged 为 True 时文件内容与 records 不同，调用方应重新读取。
+        """
+        records = [dict(r) for r in records]
+
+        def save():
+            os.makedirs(self.config_dir, exist_ok=True)
+            if self.in_sync:
+                try:
+                    return write_vault(self.vault_file, records, self.watcher.version, self.journal), records, False
+                except VaultConflictError as e:
+                    print(f"🔀 账户文件已被其他程序修改（版本 {e.actual}），合并本次修改后保存")
+            version, content = update_vault(
+                self.vault_file, lambda remote: merge_vault_records(self.base_records, records, remote), self.journal
+            )
+            return version, content, True
+
+        async with self.write_lock:
+            version, content, merged = await self._blocking("保存账户", save)
+            self.watcher.mark(version)
+            self.base_records = records
+            self.in_sync = not merged
+        return {"count": len(content), "version": version, "merged": merged}
+
+    async def record_hotp_counter(self, account_id, counter):
+        """追加 HOTP 计数器日志（持有账户文件写锁，不会被本进程或其他进程随后的清空覆盖）"""
+        def record():
+            with VaultLock(self.vault_file):
+                self.journal.record(account_id, counter)
+
+        async with self.write_lock:
+            await self._blocking("记录计数器", record)
+
+    async def vault_changed(self):
+        """账户文件是否已被其他进程改写（文件状态不变时只 stat 一次）"""
+        async with self.write_lock:
+            return await self._blocking("检查账户文件", self.watcher.changed)
+
+    # ---------- 验证码 ----------
+
+    async def codes(self, accounts):
+        """账户当前验证码列表（来自当前窗口缓存）"""
+        return [self.code_cache.code(account) for account in accounts]
+
+    async def resync_hotp(self, key, code, counter, window):
+        """在 window 个计数器内查找验证码，返回匹配的计数器或 None"""
+        return await self._blocking("HOTP重新同步", resync_hotp, key, code, counter, window)
+
+    # ---------- 扫码 ----------
+
+    async def scan_image(self, path):
+        """解码一张图片中的二维码（qr_decode.scan_image_file 的结果）"""
+        from qr_decode import scan_image_file
+        return await self._blocking("解码图片", scan_image_file, path)
+
+    async def scan_images(self, paths):
+        """并行解码多张图片，返回 [(路径, 结果或异常), ...]（保持输入顺序）"""
+        results = await asyncio.gather(*(self.scan_image(path) for path in paths), return_exceptions=True)
+        return list(zip(paths, results))
+
+    # ---------- 导入导出 ----------
+
+    async def import_file(self, path, on_batch, batch_size=500):
+        """流式解析导入文件；每 batch_size 条调用 on_batch(records, errors)（在线程池线程中）"""
+        def parse():
+            batch, errors = [], []
+            for record in iter_file_records(path):
+                if "error" in record:
+                    errors.append(record["error"])
+                else:
+                    batch.append(record)
+                if len(batch) + len(errors) >= batch_size:
+                    on_batch(batch, errors)
+                    batch, errors = [], []
+            on_batch(batch, errors)
+
+        await self._blocking("导入文件", parse)
+
+    async def export(self, records, path, format_name=None, password=None, on_progress=None):
+        """导出账户（加密时包含密钥派生），返回 (条数, 秒数)"""
+        start = time.perf_counter()
+        count = await self._blocking("导出账户", export_accounts, records, path, format_name, password, on_progress)
+        return count, time.perf_counter() - start
+
+    async def export_migration_qr(self, accounts, folder, on_progress=None):
+        """生成迁移二维码（渲染仍由 migration_export 的进程池完成）"""
+        from migration_export import export_migration_qr
+        return await self._blocking("导出迁移二维码", export_migration_qr, accounts, folder, on_progress)
+
+    def report(self):
+        """各操作的耗时摘要"""
+        return [stats.report() for stats in self.stats.values()]
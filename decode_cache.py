@@ -0,0 +1,158 @@
+"""二维码解码结果缓存（按图片内容哈希索引）
+
+缓存内容是二维码中的链接字符串，其中包含密钥，因此条目用 AES-256-GCM 加密保存：
+条目ID和加密密钥都由图片内容派生，只有持有原图片的人才能找到并解开对应条目，
+缓存文件单独泄露不会暴露密钥。未安装 cryptography 时不持久化任何链接，
+只记录"图片中没有二维码"（不含密钥），下次跳过这些图片的解码。
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    ENCRYPTION_AVAILABLE = True
+except ImportError:
+    ENCRYPTION_AVAILABLE = False
+
+DEFAULT_MAX_ENTRIES = 2000
+DEFAULT_MAX_BYTES = 4 * 1024 * 1024
+# 缓存文件格式版本；旧版本（自制加密）的文件整体丢弃
+CACHE_VERSION = 2
+_CHUNK_SIZE = 1024 * 1024
+_NONCE_SIZE = 12
+_NO_QR = ""  # 条目内容：图片中没有二维码
+
+
+def content_keys(path):
+    """流式读取文件，返回 (条目ID, 加密密钥)"""
+    id_hash = hashlib.sha256(b"gauth-decode-cache:id:")
+    key_hash = hashlib.sha256(b"gauth-decode-cache:key:")
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            id_hash.update(chunk)
+            key_hash.update(chunk)
+    return id_hash.hexdigest(), key_hash.digest()
+
+
+def _seal(key, entry_id, payloads):
+    plain = json.dumps(payloads, ensure_ascii=False).encode("utf-8")
+    nonce = os.urandom(_NONCE_SIZE)
+    sealed = AESGCM(key).encrypt(nonce, plain, entry_id.encode("ascii"))
+    return base64.b64encode(nonce + sealed).decode("ascii")
+
+
+def _open(key, entry_id, sealed):
+    data = base64.b64decode(sealed)
+    try:
+        plain = AESGCM(key).decrypt(data[:_NONCE_SIZE], data[_NONCE_SIZE:], entry_id.encode("ascii"))
+    except InvalidTag:
+        return None
+    return json.loads(plain.decode("utf-8"))
+
+
+class DecodeCache:
+    """LRU 解码缓存，持久化到配置目录"""
+
+    def __init__(self, directory, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_file = os.path.join(directory, ".auth_decode_cache.json")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # 条目ID -> 密文或 _NO_QR（最近使用的在末尾）
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """读取缓存文件"""
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") != CACHE_VERSION:
+                    self.dirty = True  # 下次保存时覆盖旧格式的文件
+                    return
+                for entry_id, sealed in data.get("entries", []):
+                    self.entries[entry_id] = sealed
+                    self.total_bytes += len(sealed)
+                self._evict()
+        except Exception as e:
+            print(f"读取解码缓存失败: {e}")
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def save(self):
+        """有改动时写回缓存文件"""
+        with self.lock:
+            if not self.dirty:
+                return
+            entries = list(self.entries.items())
+            self.dirty = False
+        try:
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"保存解码缓存失败: {e}")
+
+    def get(self, keys):
+        """按 content_keys() 的结果查找：命中返回链接列表（没有二维码的图片为空列表），未命中返回 None"""
+        entry_id, key = keys
+        with self.lock:
+            sealed = self.entries.get(entry_id)
+            if sealed is not None:
+                self.entries.move_to_end(entry_id)
+                self.dirty = True
+        if sealed is None or (sealed != _NO_QR and not ENCRYPTION_AVAILABLE):
+            payloads = None
+        elif sealed == _NO_QR:
+            payloads = []
+        else:
+            payloads = _open(key, entry_id, sealed)
+        with self.lock:
+            if payloads is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return payloads
+
+    def put(self, keys, payloads):
+        """写入解码结果（payloads 为空表示图片中没有二维码）；没有加密模块时不保存链接"""
+        entry_id, key = keys
+        if not payloads:
+            sealed = _NO_QR
+        elif ENCRYPTION_AVAILABLE:
+            sealed = _seal(key, entry_id, payloads)
+        else:
+            return
+        with self.lock:
+            old = self.entries.pop(entry_id, None)
+            if old is not None:
+                self.total_bytes -= len(old)
+            self.entries[entry_id] = sealed
+            self.total_bytes += len(sealed)
+            self._evict()
+            self.dirty = True
+
+    def _evict(self):
+        while self.entries and (len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes):
+            _, sealed = self.entries.popitem(last=False)
+            self.total_bytes -= len(sealed)
+
+    def reset_counters(self):
+        """清零命中统计"""
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,84 @@
+"""验证器核心库：配置与账户文件读取、链接与迁移二维码解析、OTP 计算
+
+不依赖任何界面库，导入时不打印、不读文件、不初始化任何东西；
+protobuf（迁移二维码）和 cryptography（加密导出）只在用到时才导入，
+`import gauth_core` 不加载任何子模块（见 benchmarks/import_cost.py）。
+
+    import gauth_core
+    settings = gauth_core.load_settings()
+    for account in gauth_core.load_accounts():
+        print(account["issuer"], gauth_core.current_code(account))
+
+更底层的功能直接使用子模块：gauth_core.vault_store、otp_engine、code_cache、
+otpauth_uri、migration、importers、exporters、hotp_store。
+"""
+from __future__ import annotations
+
+import time
+
+# 注解不在运行时求值（见上面的 __future__ 导入），这里只用内置类型书写；
+# 精确的类型（AccountRecord、Any 等）在同名的 __init__.pyi 中声明，类型检查器读取它，运行时不导入 typing。
+# 子模块在函数内导入：base64/hashlib/json 等标准库模块要到第一次调用时才加载。
+
+__all__ = ["AccountRecord", "load_settings", "load_accounts", "current_code", "parse_uri"]
+
+TOTP_PERIOD = 30
+
+
+def __getattr__(name):
+    # 类型只在被用到时导入（from gauth_core import AccountRecord）
+    if name == "AccountRecord":
+        from .types import AccountRecord
+        return AccountRecord
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def load_settings(config_file: str | None = None) -> dict:
+    """读取 .auth_app_config.json（默认在用户主目录），不存在或损坏时返回空字典"""
+    from .vault_store import CONFIG_FILE, read_settings
+
+    return read_settings(CONFIG_FILE if config_file is None else config_file)
+
+
+def load_accounts(config_dir: str | None = None) -> list[dict]:
+    """读取账户文件（按账户ID去重，HOTP 计数器已合并计数器日志）
+
+    config_dir 为空时使用配置文件中的账户目录。账户文件不存在时返回空列表。
+    """
+    from .hotp_store import HotpCounterJournal
+    from .vault_store import load_vault_records, read_settings, resolve_config_dir, vault_path
+
+    if config_dir is None:
+        config_dir = resolve_config_dir(read_settings())
+    return load_vault_records(vault_path(config_dir), HotpCounterJournal(config_dir))
+
+
+def current_code(account: dict, now: float | None = None, digits: int | None = None) -> str:
+    """账户当前验证码：TOTP 按 now（默认当前时间）所在的30秒窗口，HOTP 按 counter；digits 默认 6 位"""
+    from .otp_engine import DEFAULT_DIGITS, decode_secret, hotp_code
+
+    if digits is None:
+        digits = DEFAULT_DIGITS
+    key = decode_secret(account["secret"])
+    if account.get("type", "totp") == "hotp":
+        return hotp_code(key, int(account.get("counter", 0)), digits)
+    return hotp_code(key, int((time.time() if now is None else now) // TOTP_PERIOD), digits)
+
+
+def parse_uri(data: str) -> list[dict]:
+    """解析 otpauth:// 或 otpauth-migration:// 链接，返回账户列表 [{issuer, name, secret, type, counter, ...}]
+
+    格式错误时抛出 ValueError；迁移链接需要 protobuf，缺少时抛出 Exception。
+    """
+    from .otpauth_uri import is_otpauth_uri, parse_otpauth_uri
+
+    if is_otpauth_uri(data.strip()):
+        return [parse_otpauth_uri(data)]
+    from .migration import MIGRATION_AVAILABLE, extract_migration_uri, parse_migration_uri
+
+    uri = extract_migration_uri(data)
+    if uri is None:
+        raise ValueError("未找到有效的Google Authenticator链接")
+    if not MIGRATION_AVAILABLE:
+        raise Exception("缺少迁移模块，请安装 protobuf")
+    return parse_migration_uri(uri)
@@ -0,0 +1,13 @@
+"""gauth_core 公共接口的类型声明（运行时模块不导入 typing，类型检查器读取本文件）"""
+from typing import Any, Dict, List, Optional
+
+from .types import AccountRecord as AccountRecord
+
+__all__ = ["AccountRecord", "load_settings", "load_accounts", "current_code", "parse_uri"]
+
+TOTP_PERIOD: int
+
+def load_settings(config_file: Optional[str] = ...) -> Dict[str, Any]: ...
+def load_accounts(config_dir: Optional[str] = ...) -> List[AccountRecord]: ...
+def current_code(account: Dict[str, Any], now: Optional[float] = ..., digits: Optional[int] = ...) -> str: ...
+def parse_uri(data: str) -> List[Dict[str, Any]]: ...
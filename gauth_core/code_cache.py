@@ -0,0 +1,53 @@
+"""按时间窗口缓存 TOTP 验证码
+
+同一个30秒窗口内每个账户只计算一次，界面刷新、IPC 命令和本地 API 共用。
+密钥首次使用时解码并保留。可在任意线程调用：窗口与验证码表作为一个元组整体替换，
+读者不会看到新窗口配旧验证码的中间状态。
+"""
+import time
+
+from .otp_engine import decode_secret, hotp_code
+
+TOTP_PERIOD = 30
+
+
+class CodeCache:
+    """账户ID -> 当前窗口验证码"""
+
+    def __init__(self, period=TOTP_PERIOD):
+        self.period = period
+        self.current = (-1, {})  # (窗口编号, {账户ID: 验证码})
+        self.keys = {}  # 账户ID -> 已解码的密钥
+        self.hits = 0
+        self.misses = 0
+
+    def code(self, account, now=None):
+        """账户当前验证码（HOTP 按计数器直接计算，不缓存）"""
+        if account.get("type") == "hotp":
+            return hotp_code(account["key"], account["counter"])
+        window = int((time.time() if now is None else now) // self.period)
+        current_window, codes = self.current
+        if window != current_window:
+            codes = {}
+            self.current = (window, codes)
+        account_id = account["id"]
+        code = codes.get(account_id)
+        if code is not None:
+            self.hits += 1
+            return code
+        self.misses += 1
+        key = self.keys.get(account_id)
+        if key is None:
+            key = self.keys[account_id] = decode_secret(account["secret"])
+        code = codes[account_id] = hotp_code(key, window)
+        return code
+
+    def remaining(self, now=None):
+        """当前窗口剩余秒数"""
+        now = time.time() if now is None else now
+        return self.period - int(now) % self.period
+
+    def forget(self, account_id):
+        """账户删除后释放密钥"""
+        self.keys.pop(account_id, None)
+        self.current[1].pop(account_id, None)
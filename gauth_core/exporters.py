@@ -0,0 +1,249 @@
+"""导出账户为 JSON、CSV 或 otpauth 链接列表（可选加密）
+
+逐条读取账户、逐条写出，不在内存中拼出完整列表；
+既可在界面的后台线程中调用（带进度回调），也可在命令行中直接导出账户文件：
+
+    python -m gauth_core.exporters 账户文件.json 导出.csv [--format csv] [--encrypt]
+    python -m gauth_core.exporters --decrypt 导出.csv.enc 导出.csv
+"""
+import csv
+import json
+import os
+import struct
+import time
+
+from .importers import iter_vault_items
+from .otpauth_uri import build_otpauth_uri
+from .vault_store import vault_item
+
+try:
+    from cryptography.exceptions import InvalidTag
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+
+    ENCRYPTION_AVAILABLE = True
+except ImportError:
+    ENCRYPTION_AVAILABLE = False
+
+# 加密文件格式：文件头（标识 + 版本 + 盐 + 随机数前缀），之后是若干帧
+# 每帧为 4 字节长度 + AES-256-GCM 密文；最后一帧带结束标记，截断的文件无法通过校验
+ENCRYPTED_MAGIC = b"GAEXPORT"
+ENCRYPTED_VERSION = 1
+ENCRYPTED_SUFFIX = ".enc"
+_FRAME_SIZE = 64 * 1024
+_SALT_SIZE = 16
+_NONCE_PREFIX_SIZE = 8
+_HEADER_SIZE = len(ENCRYPTED_MAGIC) + 1 + _SALT_SIZE + _NONCE_PREFIX_SIZE
+# 进度回调间隔（条）
+PROGRESS_EVERY = 1000
+
+EXPORTERS = {}
+
+
+def register_exporter(name, label, extension):
+    """注册导出格式；被装饰的函数接收 (文本输出流, 账户记录迭代器)"""
+    def decorator(func):
+        EXPORTERS[name] = {"label": label, "extension": extension, "write": func}
+        return func
+    return decorator
+
+
+def account_record(acc):
+    """账户字典 → 导出记录（只含核心数据）"""
+    otp_type = acc.get("type", "totp")
+    return {
+        "issuer": acc["issuer"],
+        "name": acc["name"],
+        "secret": acc["secret"],
+        "type": otp_type,
+        "counter": acc.get("counter", 0) if otp_type == "hotp" else 0
+    }
+
+
+def iter_vault_records(vault_path):
+    """流式读取账户文件，逐条产出导出记录"""
+    with open(vault_path, "r", encoding="utf-8") as f:
+        for item in iter_vault_items(f):
+            yield account_record(item)
+
+
+@register_exporter("json", "JSON", ".json")
+def write_json(out, records):
+    """与账户文件条目相同的 JSON 数组（不含版本头），可由本程序直接导入"""
+    out.write("[")
+    separator = "\n  "
+    for record in records:
+        out.write(separator)
+        out.write(json.dumps(vault_item(record), ensure_ascii=False))
+        separator = ",\n  "
+    out.write("\n]\n")
+
+
+@register_exporter("csv", "CSV", ".csv")
+def write_csv(out, records):
+    writer = csv.writer(out)
+    writer.writerow(("issuer", "name", "secret", "type", "counter"))
+    for record in records:
+        writer.writerow((record["issuer"], record["name"], record["secret"], record["type"], record["counter"]))
+
+
+@register_exporter("uri", "otpauth 链接列表", ".txt")
+def write_uri_list(out, records):
+    for record in records:
+        out.write(build_otpauth_uri(
+            record["issuer"], record["name"], record["secret"], record["type"], record["counter"]
+        ))
+        out.write("\n")
+
+
+def _derive_key(password, salt):
+    return Scrypt(salt=salt, length=32, n=2 ** 15, r=8, p=1).derive(password.encode("utf-8"))
+
+
+def _frame_nonce(prefix, index):
+    return prefix + struct.pack(">I", index)
+
+
+class _EncryptedWriter:
+    """文本输出流：按 64KB 分帧加密写入二进制文件"""
+
+    def __init__(self, raw, password):
+        salt = os.urandom(_SALT_SIZE)
+        self.prefix = os.urandom(_NONCE_PREFIX_SIZE)
+        self.header = ENCRYPTED_MAGIC + bytes([ENCRYPTED_VERSION]) + salt + self.prefix
+        self.aead = AESGCM(_derive_key(password, salt))
+        self.raw = raw
+        self.buffer = bytearray()
+        self.index = 0
+        raw.write(self.header)
+
+    def write(self, text):
+        self.buffer += text.encode("utf-8")
+        while len(self.buffer) >= _FRAME_SIZE:
+            self._frame(bytes(self.buffer[:_FRAME_SIZE]), final=False)
+            del self.buffer[:_FRAME_SIZE]
+        return len(text)
+
+    def _frame(self, data, final):
+        aad = self.header + (b"\x01" if final else b"\x00")
+        sealed = self.aead.encrypt(_frame_nonce(self.prefix, self.index), data, aad)
+        self.raw.write(struct.pack(">I", len(sealed)))
+        self.raw.write(sealed)
+        self.index += 1
+
+    def close(self):
+        self._frame(bytes(self.buffer), final=True)
+        self.buffer.clear()
+
+
+def export_accounts(records, path, format_name=None, password=None, on_progress=None):
+    """把 records（账户记录迭代器）写入 path，返回写出的条数
+
+    format_name 为空时按扩展名判断（忽略 .enc 后缀）；提供 password 时加密输出。
+    on_progress(count) 每写出 PROGRESS_EVERY 条调用一次（在调用线程中执行）。
+    先写临时文件，成功后再替换目标文件。
+    """
+    if format_name is None:
+        base = path[:-len(ENCRYPTED_SUFFIX)] if path.endswith(ENCRYPTED_SUFFIX) else path
+        extension = os.path.splitext(base)[1].lower()
+        format_name = next((name for name, e in EXPORTERS.items() if e["extension"] == extension), None)
+    if format_name not in EXPORTERS:
+        raise ValueError("不支持的导出格式")
+    if password and not ENCRYPTION_AVAILABLE:
+        raise Exception("缺少加密模块，请安装 cryptography")
+
+    count = 0
+
+    def counting():
+        nonlocal count
+        for record in records:
+            yield record
+            count += 1
+            if on_progress and count % PROGRESS_EVERY == 0:
+                on_progress(count)
+
+    tmp_path = path + ".tmp"
+    try:
+        if password:
+            with open(tmp_path, "wb") as raw:
+                out = _EncryptedWriter(raw, password)
+                EXPORTERS[format_name]["write"](out, counting())
+                out.close()
+        else:
+            with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+                EXPORTERS[format_name]["write"](out, counting())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def decrypt_export(src_path, dst_path, password):
+    """流式解密加密导出文件"""
+    if not ENCRYPTION_AVAILABLE:
+        raise Exception("缺少加密模块，请安装 cryptography")
+    tmp_path = dst_path + ".tmp"
+    try:
+        with open(src_path, "rb") as src, open(tmp_path, "wb") as dst:
+            header = src.read(_HEADER_SIZE)
+            if len(header) != _HEADER_SIZE or not header.startswith(ENCRYPTED_MAGIC) \
+                    or header[len(ENCRYPTED_MAGIC)] != ENCRYPTED_VERSION:
+                raise ValueError("不是本程序的加密导出文件")
+            salt = header[len(ENCRYPTED_MAGIC) + 1:len(ENCRYPTED_MAGIC) + 1 + _SALT_SIZE]
+            prefix = header[-_NONCE_PREFIX_SIZE:]
+            aead = AESGCM(_derive_key(password, salt))
+            index, finished = 0, False
+            while not finished:
+                length = src.read(4)
+                if len(length) != 4:
+                    raise ValueError("加密文件不完整")
+                sealed = src.read(struct.unpack(">I", length)[0])
+                nonce = _frame_nonce(prefix, index)
+                try:
+                    data = aead.decrypt(nonce, sealed, header + b"\x00")
+                except InvalidTag:
+                    try:
+                        data = aead.decrypt(nonce, sealed, header + b"\x01")
+                    except InvalidTag:
+                        raise ValueError("密码错误或文件已损坏")
+                    finished = True
+                dst.write(data)
+                index += 1
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        # 密码错误或文件损坏时不留下解密了一半的明文
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+    import getpass
+
+    parser = argparse.ArgumentParser(description="导出或解密账户文件")
+    parser.add_argument("source", help="账户文件（--decrypt 时为加密导出文件）")
+    parser.add_argument("output", help="输出文件")
+    parser.add_argument("--format", choices=sorted(EXPORTERS), help="导出格式，默认按扩展名判断")
+    parser.add_argument("--encrypt", action="store_true", help="加密导出（运行时输入密码）")
+    parser.add_argument("--decrypt", action="store_true", help="解密加密导出文件")
+    args = parser.parse_args()
+
+    if args.decrypt:
+        decrypt_export(args.source, args.output, getpass.getpass("密码: "))
+        print(f"✅ 已解密到 {args.output}")
+    else:
+        export_password = None
+        if args.encrypt:
+            export_password = getpass.getpass("设置导出密码: ")
+            if export_password != getpass.getpass("再次输入密码: "):
+                raise SystemExit("两次输入的密码不一致")
+        started = time.perf_counter()
+        exported = export_accounts(iter_vault_records(args.source), args.output, args.format, export_password)
+        print(f"✅ 已导出 {exported} 个账户到 {args.output}，耗时 {time.perf_counter() - started:.2f}秒")
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: google_auth_migration.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1bgoogle_auth_migration.proto\"\xbe\x01\n\x10MigrationPayload\x12\x35\n\x0eotp_parameters\x18\x01 \x03(\x0b\x32\x0e.OtpParametersR\rotpParameters\x12\x18\n\x07version\x18\x02 \x01(\x05R\x07version\x12\x1d\n\nbatch_size\x18\x03 \x01(\x05R\tbatchSize\x12\x1f\n\x0b\x62\x61tch_index\x18\x04 \x01(\x05R\nbatchIndex\x12\x19\n\x08\x62\x61tch_id\x18\x05 \x01(\x05R\x07\x62\x61tchId\"\xcf\x03\n\rOtpParameters\x12\x16\n\x06secret\x18\x01 \x01(\x0cR\x06secret\x12\x12\n\x04name\x18\x02 \x01(\tR\x04name\x12\x16\n\x06issuer\x18\x03 \x01(\tR\x06issuer\x12\x36\n\talgorithm\x18\x04 \x01(\x0e\x32\x18.OtpParameters.AlgorithmR\talgorithm\x12\x31\n\x06\x64igits\x18\x05 \x01(\x0e\x32\x19.OtpParameters.DigitCountR\x06\x64igits\x12*\n\x04type\x18\x06 \x01(\x0e\x32\x16.OtpParameters.OtpTypeR\x04type\x12\x18\n\x07\x63ounter\x18\x07 \x01(\x03R\x07\x63ounter\"Q\n\tAlgorithm\x12\x19\n\x15\x41LGORITHM_UNSPECIFIED\x10\x00\x12\x08\n\x04SHA1\x10\x01\x12\n\n\x06SHA256\x10\x02\x12\n\n\x06SHA512\x10\x03\x12\x07\n\x03MD5\x10\x04\"=\n\nDigitCount\x12\x1b\n\x17\x44IGIT_COUNT_UNSPECIFIED\x10\x00\x12\x07\n\x03SIX\x10\x01\x12\t\n\x05\x45IGHT\x10\x02\"7\n\x07OtpType\x12\x18\n\x14OTP_TYPE_UNSPECIFIED\x10\x00\x12\x08\n\x04HOTP\x10\x01\x12\x08\n\x04TOTP\x10\x02\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'google_auth_migration_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _MIGRATIONPAYLOAD._serialized_start=32
+  _MIGRATIONPAYLOAD._serialized_end=222
+  _OTPPARAMETERS._serialized_start=225
+  _OTPPARAMETERS._serialized_end=688
+  _OTPPARAMETERS_ALGORITHM._serialized_start=487
+  _OTPPARAMETERS_ALGORITHM._serialized_end=568
+  _OTPPARAMETERS_DIGITCOUNT._serialized_start=570
+  _OTPPARAMETERS_DIGITCOUNT._serialized_end=631
+  _OTPPARAMETERS_OTPTYPE._serialized_start=633
+  _OTPPARAMETERS_OTPTYPE._serialized_end=688
+# @@protoc_insertion_point(module_scope)
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""HOTP 计数器日志
+
+每次计数器变化只向日志追加一行并 fsync，不重写整个账户文件；
+加载时取账户文件与日志中的较大值。账户文件保存后日志即可清空。
+"""
+import os
+
+
+class HotpCounterJournal:
+    """追加写入的 HOTP 计数器日志（账户ID -> 计数器）"""
+
+    def __init__(self, directory):
+        self.journal_file = os.path.join(directory, ".auth_hotp_counters.log")
+
+    def load(self):
+        """读取日志，返回 {账户ID: 计数器}；崩溃留下的半行会被忽略"""
+        counters = {}
+        try:
+            with open(self.journal_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) != 2 or not parts[1].isdigit():
+                        continue
+                    counters[parts[0]] = max(counters.get(parts[0], 0), int(parts[1]))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"读取HOTP计数器日志失败: {e}")
+        return counters
+
+    def record(self, account_id, counter):
+        """持久化新的计数器值（写入后 fsync）"""
+        with open(self.journal_file, "a", encoding="utf-8") as f:
+            f.write(f"{account_id} {counter}\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def clear(self):
+        """账户文件已包含最新计数器后清空日志"""
+        try:
+            os.remove(self.journal_file)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,320 @@
+"""从其他验证器的导出文件导入账户
+
+支持 Aegis（未加密 JSON）、andOTP（未加密 JSON）、2FAS（未加密 .2fas）、
+本程序的账户文件/JSON 导出，以及每行一个 otpauth:// 链接的文本文件。文件按块读取、逐条解析，
+多兆字节的导出文件不会整体读入内存。
+
+每个导入器产出账户记录字典 {issuer, name, secret, type, counter}；
+无法导入的条目产出 {"error": 原因}，由调用方计入失败数。
+新格式用 register_importer 注册即可。
+"""
+import json
+import time
+
+from .otp_engine import decode_secret
+from .otpauth_uri import parse_otpauth_uri, is_otpauth_uri
+from .migration import extract_migration_uri, parse_migration_uri
+from .vault_store import VAULT_HEADER_PREFIX
+
+_CHUNK_SIZE = 64 * 1024
+# 本程序支持的参数（与 Google Authenticator 一致）
+SUPPORTED_ALGORITHMS = ("SHA1",)
+SUPPORTED_DIGITS = (6,)
+SUPPORTED_PERIODS = (30,)
+
+IMPORTERS = {}
+
+
+def register_importer(name, label, extensions, sniff):
+    """注册导入器
+
+    sniff(head) 接收文件开头（最多64KB文本），判断是否为该格式；
+    被装饰的函数接收文本文件对象，逐条产出账户记录。
+    """
+    def decorator(func):
+        IMPORTERS[name] = {"label": label, "extensions": extensions, "sniff": sniff, "iter_records": func}
+        return func
+    return decorator
+
+
+class _JsonStream:
+    """按块读取的 JSON 流，只在目标数组内逐个元素解码"""
+
+    def __init__(self, f):
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self):
+        """读入下一块；丢弃已消费的部分，缓冲区只保留当前元素"""
+        chunk = self.f.read(_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """跳过空白，返回下一个字符（结束时返回空串）"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"JSON 格式错误：位置附近应为 {char!r}")
+        self.pos += 1
+
+    def value(self):
+        """解码下一个完整的 JSON 值（不完整时继续读入）"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._fill():
+                    raise ValueError("JSON 格式错误：文件不完整")
+                continue
+            # 数字可能被块边界截断，文件未读完时再确认一次
+            if end == len(self.buffer) and not self.eof and isinstance(value, (int, float)):
+                if self._fill():
+                    continue
+            self.pos = end
+            return value
+
+    def iter_array(self, path):
+        """沿 path 中的键进入对象，逐个产出目标数组的元素
+
+        目标位置不是数组时产出该值本身（调用方据此报告格式问题）。
+        """
+        if not path:
+            if self.peek() != "[":
+                yield self.value()
+                return
+            self.pos += 1
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            while True:
+                yield self.value()
+                char = self.peek()
+                self.pos += 1
+                if char == "]":
+                    return
+                if char != ",":
+                    raise ValueError("JSON 格式错误：数组元素之间缺少逗号")
+
+        if self.peek() != "{":
+            raise ValueError(f"{path[0]} 字段的上级不是对象，导出文件可能已加密")
+        self.pos += 1
+        if self.peek() == "}":
+            raise ValueError(f"JSON 中缺少 {path[0]} 字段")
+        while True:
+            key = self.value()
+            self.expect(":")
+            if key == path[0]:
+                yield from self.iter_array(path[1:])
+                return
+            self.value()  # 跳过无关字段
+            char = self.peek()
+            self.pos += 1
+            if char == "}":
+                raise ValueError(f"JSON 中缺少 {path[0]} 字段")
+            if char != ",":
+                raise ValueError("JSON 格式错误：字段之间缺少逗号")
+
+
+def iter_json_array(f, path=()):
+    """逐个产出 JSON 文件中 path 所指数组的元素（path 为空表示顶层数组）"""
+    return _JsonStream(f).iter_array(path)
+
+
+def iter_vault_items(f):
+    """逐个产出本程序账户文件中的条目：带版本头的新格式或旧版纯数组"""
+    versioned = f.read(len(VAULT_HEADER_PREFIX)) == VAULT_HEADER_PREFIX
+    f.seek(0)
+    return iter_json_array(f, ("accounts",) if versioned else ())
+
+
+def make_record(issuer, name, secret, otp_type="totp", counter=0, algorithm="SHA1", digits=6, period=30):
+    """检查参数并生成账户记录；本程序不支持的参数返回 {"error": 原因}"""
+    otp_type = (otp_type or "totp").lower()
+    algorithm = (algorithm or "SHA1").upper()
+    if otp_type not in ("totp", "hotp"):
+        return {"error": f"{issuer} - {name}：不支持的类型 {otp_type}"}
+    if not secret:
+        return {"error": f"{issuer} - {name}：缺少密钥"}
+    try:
+        digits, period = int(digits), int(period)
+        counter = int(counter or 0) if otp_type == "hotp" else 0
+    except (TypeError, ValueError, OverflowError):
+        return {"error": f"{issuer} - {name}：参数格式错误 {digits}位/{period}秒/计数器{counter}"}
+    if algorithm not in SUPPORTED_ALGORITHMS or digits not in SUPPORTED_DIGITS \
+            or (otp_type == "totp" and period not in SUPPORTED_PERIODS):
+        return {"error": f"{issuer} - {name}：不支持的参数 {algorithm}/{digits}位/{period}秒"}
+    try:
+        secret = secret.replace(" ", "").upper()
+        valid = bool(decode_secret(secret))
+    except (AttributeError, ValueError):
+        valid = False
+    if not valid:
+        return {"error": f"{issuer} - {name}：密钥不是有效的Base32编码"}
+    return {
+        "issuer": issuer or "未知平台",
+        "name": name or "未知账户",
+        "secret": secret,
+        "type": otp_type,
+        "counter": counter
+    }
+
+
+def record_from_uri(data):
+    """解析单个 otpauth:// 链接并检查参数；格式错误时抛出 ValueError"""
+    uri = parse_otpauth_uri(data)
+    return make_record(
+        uri["issuer"], uri["name"], uri["secret"], uri["type"], uri["counter"],
+        uri["algorithm"], uri["digits"], uri["period"]
+    )
+
+
+def record_from_migration(acc):
+    """迁移二维码中的账户（parse_migration_uri 的结果）检查参数后生成账户记录"""
+    return make_record(
+        acc["issuer"], acc["name"], acc["secret"], acc["type"], acc["counter"],
+        acc["algorithm"], acc["digits"]
+    )
+
+
+def _sniff_json(head, marker):
+    # 本程序的账户文件也以 { 开头，账户名中可能恰好出现 marker
+    return head.lstrip().startswith("{") and marker in head and not head.startswith(VAULT_HEADER_PREFIX)
+
+
+@register_importer("aegis", "Aegis", (".json",), lambda head: _sniff_json(head, '"db"'))
+def iter_aegis(f):
+    """Aegis 导出：{"header": ..., "db": {"entries": [...]}}"""
+    for entry in iter_json_array(f, ("db", "entries")):
+        if not isinstance(entry, dict):
+            raise ValueError("Aegis 导出已加密，请先在 Aegis 中导出未加密的备份")
+        info = entry.get("info", {})
+        yield make_record(
+            entry.get("issuer", ""), entry.get("name", ""), info.get("secret", ""),
+            entry.get("type"), info.get("counter", 0),
+            info.get("algo"), info.get("digits", 6), info.get("period", 30)
+        )
+
+
+@register_importer("andotp", "andOTP", (".json",), lambda head: head.lstrip().startswith("[") and '"label"' in head)
+def iter_andotp(f):
+    """andOTP 导出：[{"secret", "issuer", "label", "type", ...}, ...]"""
+    for entry in iter_json_array(f):
+        if not isinstance(entry, dict):
+            raise ValueError("andOTP 导出格式错误")
+        issuer = entry.get("issuer", "")
+        name = entry.get("label", "")
+        if not issuer and ":" in name:
+            issuer, name = (part.strip() for part in name.split(":", 1))
+        yield make_record(
+            issuer, name, entry.get("secret", ""),
+            entry.get("type"), entry.get("counter", 0),
+            entry.get("algorithm"), entry.get("digits", 6), entry.get("period", 30)
+        )
+
+
+@register_importer("2fas", "2FAS", (".2fas", ".json"), lambda head: _sniff_json(head, '"services"'))
+def iter_2fas(f):
+    """2FAS 导出：{"services": [{"name", "secret", "otp": {...}}, ...]}"""
+    for entry in iter_json_array(f, ("services",)):
+        if not isinstance(entry, dict):
+            raise ValueError("2FAS 导出格式错误")
+        otp = entry.get("otp", {})
+        yield make_record(
+            otp.get("issuer") or entry.get("name", ""), otp.get("account") or otp.get("label", ""),
+            entry.get("secret", ""), otp.get("tokenType"), otp.get("counter", 0),
+            otp.get("algorithm"), otp.get("digits", 6), otp.get("period", 30)
+        )
+
+
+@register_importer("gauth", "本程序账户文件 / JSON 导出", (".json",),
+                   lambda head: head.lstrip().startswith("[") or head.startswith(VAULT_HEADER_PREFIX))
+def iter_gauth(f):
+    """本程序的账户文件和 JSON 导出：[{"issuer", "name", "secret", "type", "counter"}, ...]（账户文件另有版本头）"""
+    for entry in iter_vault_items(f):
+        if not isinstance(entry, dict):
+            raise ValueError("账户文件格式错误")
+        yield make_record(
+            entry.get("issuer", ""), entry.get("name", ""), entry.get("secret", ""),
+            entry.get("type"), entry.get("counter", 0)
+        )
+
+
+@register_importer("uri_list", "otpauth 链接列表", (".txt",), lambda head: "otpauth" in head)
+def iter_uri_list(f):
+    """文本文件，每行一个 otpauth:// 或 otpauth-migration:// 链接，空行和 # 注释行跳过"""
+    for line_no, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            if extract_migration_uri(line):
+                for acc in parse_migration_uri(line):
+                    yield record_from_migration(acc)
+            elif is_otpauth_uri(line):
+                yield record_from_uri(line)
+            else:
+                yield {"error": f"第{line_no}行：不是 otpauth 链接"}
+        except Exception as e:
+            yield {"error": f"第{line_no}行：{e}"}
+
+
+def detect_format(path):
+    """根据文件开头判断格式，无法识别时返回 None"""
+    with open(path, "r", encoding="utf-8-sig") as f:
+        head = f.read(_CHUNK_SIZE)
+    for name, importer in IMPORTERS.items():
+        if importer["sniff"](head):
+            return name
+    return None
+
+
+def iter_file_records(path, format_name=None):
+    """逐条产出文件中的账户记录；format_name 为空时自动识别"""
+    format_name = format_name or detect_format(path)
+    if format_name not in IMPORTERS:
+        raise ValueError("无法识别的导出文件格式")
+    with open(path, "r", encoding="utf-8-sig") as f:
+        yield from IMPORTERS[format_name]["iter_records"](f)
+
+
+def benchmark_import(path, format_name=None):
+    """解析整个文件并统计吞吐量，返回 {records, errors, seconds, per_second}"""
+    start = time.perf_counter()
+    records = errors = 0
+    for record in iter_file_records(path, format_name):
+        if "error" in record:
+            errors += 1
+        else:
+            records += 1
+    seconds = time.perf_counter() - start
+    return {
+        "records": records,
+        "errors": errors,
+        "seconds": seconds,
+        "per_second": (records + errors) / seconds if seconds else 0.0
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    for file_path in sys.argv[1:]:
+        result = benchmark_import(file_path)
+        print(f"{file_path}: {result['records']}条记录，{result['errors']}条失败，"
+              f"{result['seconds']:.2f}秒，{result['per_second']:.0f}条/秒")
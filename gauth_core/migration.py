@@ -0,0 +1,260 @@
+"""Google Authenticator 迁移二维码（otpauth-migration://）解析与生成"""
+import base64
+import os
+import re
+import urllib.parse
+
+from .otp_engine import decode_secret
+
+try:
+    from . import google_auth_migration_pb2 as migration_pb
+
+    MIGRATION_AVAILABLE = True
+except ImportError:
+    migration_pb = None
+    MIGRATION_AVAILABLE = False
+
+# 一次导出最多的批次数；超过时视为数据损坏，避免按伪造的批次总数分配或遍历
+MAX_BATCHES = 1000
+
+
+class MigrationMismatchError(ValueError):
+    """二维码与正在组装的导出不属于同一次导出"""
+
+
+def extract_migration_uri(qr_data):
+    """从二维码内容中提取迁移链接，找不到时返回 None"""
+    qr_data = qr_data.strip()
+    if qr_data.startswith("otpauth-migration://"):
+        return qr_data
+    match = re.search(r"otpauth-migration://[^\s]+", qr_data)
+    return match.group(0) if match else None
+
+
+def decode_migration_payload(qr_data):
+    """解码迁移链接中的 data 参数，返回 MigrationPayload"""
+    uri = extract_migration_uri(qr_data)
+    if not uri:
+        raise ValueError("不是有效的迁移二维码")
+
+    parsed = urllib.parse.urlparse(uri)
+    params = urllib.parse.parse_qs(parsed.query)
+    if "data" not in params:
+        raise ValueError("迁移链接中缺少data参数")
+
+    # 解码data参数
+    data_str = params["data"][0]
+    data_str = urllib.parse.unquote(data_str).replace('-', '+').replace('_', '/')
+    padding = 4 - (len(data_str) % 4)
+    if padding < 4:
+        data_str += '=' * padding
+    decoded_data = base64.b64decode(data_str)
+
+    # 解析protobuf数据
+    payload = migration_pb.MigrationPayload()
+    payload.ParseFromString(decoded_data)
+    return payload
+
+
+# 枚举值 -> 算法名称/位数；未指定时按官方默认 SHA1/6位
+_ALGORITHM_NAMES = {0: "SHA1", 1: "SHA1", 2: "SHA256", 3: "SHA512", 4: "MD5"}
+_DIGIT_COUNTS = {0: 6, 1: 6, 2: 8}
+
+
+def iter_payload_accounts(payload):
+    """逐个产出迁移数据中的账户 (issuer, name, secret, type, counter, algorithm, digits)
+
+    未指定类型的按 TOTP 处理；算法和位数原样返回，是否支持由调用方检查（importers.make_record）。
+    """
+    for param in payload.otp_parameters:
+        if param.type == migration_pb.OtpParameters.HOTP:
+            otp_type, counter = "hotp", param.counter
+        else:
+            otp_type, counter = "totp", 0
+        yield (
+            param.issuer or "未知平台",
+            param.name or "未知账户",
+            base64.b32encode(param.secret).decode().strip(),
+            otp_type,
+            counter,
+            _ALGORITHM_NAMES.get(param.algorithm, str(param.algorithm)),
+            _DIGIT_COUNTS.get(param.digits, param.digits)
+        )
+
+
+def _account_dict(entry):
+    issuer, name, secret, otp_type, counter, algorithm, digits = entry
+    return {"issuer": issuer, "name": name, "secret": secret, "type": otp_type, "counter": counter,
+            "algorithm": algorithm, "digits": digits}
+
+
+def parse_migration_uri(qr_data):
+    """解析迁移链接，返回账户列表 [{issuer, name, secret, type, counter, algorithm, digits}]"""
+    payload = decode_migration_payload(qr_data)
+    if not payload.otp_parameters:
+        raise ValueError("未找到账户数据")
+    return [_account_dict(entry) for entry in iter_payload_accounts(payload)]
+
+
+class MigrationAssembler:
+    """按 batch_index 组装一次导出的多个迁移二维码（batch_size 为批次总数，batch_id 区分不同导出）
+
+    每个二维码解析后只保留 iter_payload_accounts() 产出的元组，protobuf 对象随即释放，
+    数千个账户的导出也只占用与账户数成正比的少量内存。
+    """
+
+    def __init__(self):
+        self.total_batches = None
+        self.batch_id = None
+        self.batches = {}  # batch_index -> [(issuer, name, secret, type, counter, algorithm, digits), ...]
+
+    def add(self, qr_data):
+        """加入一个二维码内容；同一批次重复出现时忽略并返回 False"""
+        payload = decode_migration_payload(qr_data)
+        total = max(payload.batch_size, 1)
+        index = payload.batch_index
+        if total > MAX_BATCHES:
+            raise ValueError(f"批次总数无效：{total}")
+        if self.total_batches is None:
+            self.total_batches = total
+            self.batch_id = payload.batch_id
+        elif total != self.total_batches:
+            raise MigrationMismatchError(f"批次总数不一致（{total} ≠ {self.total_batches}），不是同一次导出")
+        elif payload.batch_id != self.batch_id:
+            raise MigrationMismatchError("批次ID不一致，不是同一次导出")
+        if not 0 <= index < total:
+            raise ValueError(f"批次序号无效：{index}")
+        if index in self.batches:
+            return False
+        self.batches[index] = list(iter_payload_accounts(payload))
+        return True
+
+    def received(self):
+        """已收到的批次序号（从0开始）"""
+        return sorted(self.batches)
+
+    def missing(self):
+        """缺少的批次序号（从0开始）"""
+        if self.total_batches is None:
+            return []
+        return [i for i in range(min(self.total_batches, MAX_BATCHES)) if i not in self.batches]
+
+    def account_count(self):
+        return sum(len(batch) for batch in self.batches.values())
+
+    def __iter__(self):
+        """按批次顺序产出账户字典"""
+        for index in sorted(self.batches):
+            for entry in self.batches[index]:
+                yield _account_dict(entry)
+
+
+# 二维码版本40、L级纠错时字节模式的最大容量
+QR_BYTE_CAPACITY = 2953
+MIGRATION_URI_PREFIX = "otpauth-migration://offline?data="
+# 批次头部字段（version/batch_size/batch_index/batch_id）最大字节数
+_HEADER_MAX_BYTES = 24
+# 头部追加在账户数据之后，最多改变末尾若干个 Base64 字符（按全部转义估算）
+_HEADER_MARGIN = 3 * 4 * ((_HEADER_MAX_BYTES + 2) // 3 + 1)
+
+
+def build_migration_uri(payload_bytes):
+    """把序列化后的 MigrationPayload 编码为迁移链接（标准 Base64 + URL 转义，与官方导出一致）"""
+    encoded = base64.b64encode(payload_bytes).decode("ascii")
+    return MIGRATION_URI_PREFIX + urllib.parse.quote(encoded, safe="")
+
+
+def _escaped_length(data):
+    """数据编码进链接后 data 部分的长度"""
+    return len(urllib.parse.quote(base64.b64encode(data).decode("ascii"), safe=""))
+
+
+def _append_bound(size):
+    """追加 size 字节后，链接 data 部分最多增加的长度（末尾分组重排 + 新字符全部转义）"""
+    return 3 * 4 * ((size + 2) // 3 + 1)
+
+
+def _otp_parameters(account):
+    param = migration_pb.OtpParameters()
+    param.secret = decode_secret(account["secret"])
+    param.name = account["name"]
+    param.issuer = account["issuer"]
+    # 本程序只支持 SHA1/6位，显式写出，不依赖扫描端对"未指定"的默认处理
+    param.algorithm = migration_pb.OtpParameters.SHA1
+    param.digits = migration_pb.OtpParameters.SIX
+    if account.get("type") == "hotp":
+        param.type = migration_pb.OtpParameters.HOTP
+        param.counter = account.get("counter", 0)
+    else:
+        param.type = migration_pb.OtpParameters.TOTP
+    return param
+
+
+def _serialize_batch(params, index, total, batch_id):
+    payload = migration_pb.MigrationPayload()
+    payload.version = 1
+    payload.batch_size = total
+    payload.batch_index = index
+    payload.batch_id = batch_id
+    payload.otp_parameters.extend(params)
+    return payload.SerializeToString()
+
+
+def _encode_varint(value):
+    out = bytearray()
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def encode_migration_batches(accounts, capacity=QR_BYTE_CAPACITY):
+    """把账户编码为尽量少的迁移链接，每个链接不超过二维码容量 capacity（字节）
+
+    按序列化大小做降序首次适应（First Fit Decreasing）装箱；
+    链接长度先用上下界快速判断，只有落在两者之间时才实际编码检查。
+    返回链接列表，batch_size（批次总数）/batch_index/batch_id 已正确设置。
+    """
+    params = [_otp_parameters(acc) for acc in accounts]
+    # 每个账户在 MigrationPayload 中的编码：字段标签 + 长度前缀 + 内容
+    chunks = []
+    for param in params:
+        body = param.SerializeToString()
+        chunks.append(b"\x0a" + _encode_varint(len(body)) + body)
+    budget = capacity - len(MIGRATION_URI_PREFIX) - _HEADER_MARGIN
+    for param, chunk in zip(params, chunks):
+        if _escaped_length(chunk) > budget:
+            raise ValueError(f"账户 {param.issuer} - {param.name} 超出单个二维码容量")
+
+    bins = []  # [数据部分长度, 已用字节, [参数下标...]]
+    for i in sorted(range(len(params)), key=lambda k: len(chunks[k]), reverse=True):
+        size = len(chunks[i])
+        for entry in bins:
+            # 下界：当前长度减去末尾分组（最多4个字符，均按转义计），加上新数据不转义的长度
+            if entry[0] - 12 + 4 * (size // 3) > budget:
+                continue
+            # 上界放得下则直接接受，否则实际编码检查
+            if entry[0] + _append_bound(size) > budget:
+                data = b"".join(chunks[k] for k in entry[2]) + chunks[i]
+                if _escaped_length(data) > budget:
+                    continue
+            entry[2].append(i)
+            entry[1] += size
+            entry[0] = _escaped_length(b"".join(chunks[k] for k in entry[2]))
+            break
+        else:
+            bins.append([_escaped_length(chunks[i]), size, [i]])
+
+    # 批次内保持原有账户顺序，批次按首个账户的位置排序
+    groups = sorted((sorted(entry[2]) for entry in bins), key=lambda g: g[0])
+    total = len(groups)
+    # 同一次导出的批次共用一个随机ID；取非负数，varint 编码最多5字节
+    batch_id = int.from_bytes(os.urandom(4), "big") & 0x7FFFFFFF
+    uris = []
+    for index, group in enumerate(groups):
+        uri = build_migration_uri(_serialize_batch([params[k] for k in group], index, total, batch_id))
+        if len(uri) > capacity:
+            raise ValueError("迁移批次超出二维码容量")
+        uris.append(uri)
+    return uris
@@ -0,0 +1,62 @@
+"""OTP 计算（HOTP/TOTP 共用），密钥预先解码，避免每次计算都做 Base32 解码"""
+import base64
+import hashlib
+import hmac
+import struct
+
+DEFAULT_DIGITS = 6
+# HOTP 计数器重新同步的默认前向搜索窗口
+DEFAULT_RESYNC_WINDOW = 1000
+# 重新同步时每批计算的计数器数量（批次之间可回调进度/取消）
+RESYNC_BATCH = 512
+
+_COUNTER = struct.Struct(">Q")
+_TRUNCATE = struct.Struct(">I")
+
+
+def decode_secret(secret):
+    """Base32 密钥解码（忽略空格、大小写，自动补齐填充）"""
+    normalized = secret.replace(" ", "").upper()
+    normalized += "=" * (-len(normalized) % 8)
+    return base64.b32decode(normalized)
+
+
+def _truncate(digest, digits):
+    offset = digest[-1] & 0x0F
+    value = _TRUNCATE.unpack_from(digest, offset)[0] & 0x7FFFFFFF
+    return str(value % (10 ** digits)).zfill(digits)
+
+
+def hotp_code(key, counter, digits=DEFAULT_DIGITS):
+    """计算 HOTP 验证码（key 为已解码的密钥字节）"""
+    digest = hmac.new(key, _COUNTER.pack(counter), hashlib.sha1).digest()
+    return _truncate(digest, digits)
+
+
+def resync_hotp(key, code, counter, window=DEFAULT_RESYNC_WINDOW, digits=DEFAULT_DIGITS, on_batch=None):
+    """在 [counter, counter + window) 内查找与 code 匹配的计数器
+
+    HMAC 内部状态只按密钥初始化一次，每个计数器复制后更新，循环内不做字符串处理。
+    on_batch(已检查数量) 每批调用一次，返回 False 时中止搜索。
+    返回匹配的计数器，未找到返回 None。
+    """
+    code = code.strip()
+    if not code.isdigit() or len(code) != digits:
+        return None
+    target = int(code)
+    modulus = 10 ** digits
+    base = hmac.new(key, digestmod=hashlib.sha1)
+    pack = _COUNTER.pack
+    unpack_from = _TRUNCATE.unpack_from
+    end = counter + window
+
+    for batch_start in range(counter, end, RESYNC_BATCH):
+        for candidate in range(batch_start, min(batch_start + RESYNC_BATCH, end)):
+            mac = base.copy()
+            mac.update(pack(candidate))
+            digest = mac.digest()
+            if (unpack_from(digest, digest[-1] & 0x0F)[0] & 0x7FFFFFFF) % modulus == target:
+                return candidate
+        if on_batch is not None and on_batch(min(batch_start + RESYNC_BATCH, end) - counter) is False:
+            break
+    return None
@@ -0,0 +1,190 @@
+"""标准 otpauth:// 链接解析与生成
+
+所有导入途径（扫码、批量导入、导出文件）共用同一个解析器。
+解析保留平台和账户名的原始大小写，按百分号编码正确解码标签，
+并读取 digits/period/algorithm/counter 参数。
+"""
+import random
+import time
+import urllib.parse
+
+OTPAUTH_SCHEME = "otpauth://"
+OTP_TYPES = ("totp", "hotp")
+ALGORITHMS = ("SHA1", "SHA256", "SHA512")
+DEFAULT_DIGITS = 6
+DEFAULT_PERIOD = 30
+
+_unquote = urllib.parse.unquote
+_unquote_plus = urllib.parse.unquote_plus
+
+
+def is_otpauth_uri(data):
+    """是否为 otpauth:// 链接（协议名不区分大小写）"""
+    return data[:10].lower() == OTPAUTH_SCHEME
+
+
+def _int_param(params, key, default, minimum, maximum):
+    value = params.get(key)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{key} 参数不是整数：{value}")
+    if not minimum <= number <= maximum:
+        raise ValueError(f"{key} 参数超出范围：{number}")
+    return number
+
+
+def parse_otpauth_uri(qr_data):
+    """解析 otpauth://totp/ 或 otpauth://hotp/ 链接
+
+    返回 {type, issuer, name, secret, algorithm, digits, period, counter}；
+    格式错误时抛出 ValueError。平台优先取 issuer 参数，其次取标签中的前缀。
+    """
+    data = qr_data.strip()
+    if not is_otpauth_uri(data):
+        raise ValueError("未找到有效的Google Authenticator链接")
+
+    slash = data.find("/", 10)
+    if slash < 0:
+        raise ValueError("链接中缺少账户标签")
+    otp_type = data[10:slash].lower()
+    if otp_type not in OTP_TYPES:
+        raise ValueError(f"不支持的类型：{data[10:slash]}")
+
+    question = data.find("?", slash)
+    if question < 0:
+        raise ValueError("链接中缺少secret参数")
+    fragment = data.find("#", question)
+    query = data[question + 1:fragment] if fragment >= 0 else data[question + 1:]
+
+    # 参数名不区分大小写，参数值保留原样；重复出现时以第一个为准（与 parse_qs 取 [0] 一致）
+    params = {}
+    for item in query.split("&"):
+        key, _, value = item.partition("=")
+        key = key.lower()
+        if key and key not in params:
+            params[key] = _unquote_plus(value) if "%" in value or "+" in value else value
+
+    secret = params.get("secret", "").replace(" ", "").replace("=", "").upper()
+    if not secret:
+        raise ValueError("链接中缺少secret参数")
+
+    # 标签：平台:账户名。先按未解码的分隔符拆分（优先字面冒号，其次 %3A），
+    # 平台或账户名内部被编码的冒号因此不会被误当作分隔符
+    label = data[slash + 1:question]
+    separator = label.find(":")
+    if separator < 0:
+        separator = label.upper().find("%3A")
+        width = 3
+    else:
+        width = 1
+    if separator >= 0:
+        label_issuer, name = _unquote(label[:separator]), _unquote(label[separator + width:])
+    else:
+        label_issuer, name = "", _unquote(label)
+    issuer = params.get("issuer") or label_issuer
+
+    algorithm = params.get("algorithm", "SHA1").upper()
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"不支持的算法：{algorithm}")
+
+    return {
+        "type": otp_type,
+        "issuer": issuer.strip() or "未知平台",
+        "name": name.strip() or "未知账户",
+        "secret": secret,
+        "algorithm": algorithm,
+        "digits": _int_param(params, "digits", DEFAULT_DIGITS, 6, 10),
+        "period": _int_param(params, "period", DEFAULT_PERIOD, 1, 86400),
+        "counter": _int_param(params, "counter", 0, 0, 2 ** 63 - 1) if otp_type == "hotp" else 0
+    }
+
+
+def build_otpauth_uri(issuer, name, secret, otp_type="totp", counter=0):
+    """生成标准 otpauth:// 链接（平台和账户名按 RFC 3986 转义）"""
+    label = urllib.parse.quote(issuer, safe="@") + ":" + urllib.parse.quote(name, safe="@")
+    query = f"secret={secret}&issuer={urllib.parse.quote(issuer, safe='')}"
+    if otp_type == "hotp":
+        query += f"&counter={counter}"
+    return f"otpauth://{otp_type}/{label}?{query}"
+
+
+def benchmark_parse(uris, rounds=5):
+    """对 uris 反复解析，返回每秒解析条数（取最快一轮）"""
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for uri in uris:
+            try:
+                parse_otpauth_uri(uri)
+            except ValueError:
+                pass
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(uris) / best if best else 0.0
+
+
+def _mutate(rng, data):
+    """随机变异一条链接：删除、重复、替换或插入特殊字符"""
+    specials = "%:/?&=#+ \x00é中"
+    for _ in range(rng.randint(1, 4)):
+        if not data:
+            data = rng.choice(specials)
+        pos = rng.randrange(len(data))
+        action = rng.randrange(4)
+        if action == 0:
+            data = data[:pos] + data[pos + 1:]
+        elif action == 1:
+            end = min(len(data), pos + rng.randint(1, 8))
+            data = data[:end] + data[pos:end] + data[end:]
+        elif action == 2:
+            data = data[:pos] + rng.choice(specials) + data[pos + 1:]
+        else:
+            data = data[:pos] + rng.choice(specials) * rng.randint(1, 3) + data[pos:]
+    return data
+
+
+def fuzz_parse(corpus, iterations=100000, seed=0):
+    """变异测试：解析器只允许返回记录或抛出 ValueError
+
+    返回触发其他异常的输入列表 [(输入, 异常), ...]。
+    """
+    rng = random.Random(seed)
+    failures = []
+    for _ in range(iterations):
+        data = _mutate(rng, rng.choice(corpus))
+        try:
+            record = parse_otpauth_uri(data)
+        except ValueError:
+            continue
+        except Exception as e:
+            failures.append((data, e))
+            continue
+        if not record["secret"] or record["type"] not in OTP_TYPES:
+            failures.append((data, "记录字段无效"))
+    return failures
+
+
+def load_corpus(path):
+    """读取语料文件：每行一条，空行和 # 注释行跳过"""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip() and not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    corpus_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fuzz", "otpauth_uri_corpus.txt")
+    corpus = load_corpus(corpus_path)
+    sample = [corpus[i % len(corpus)] for i in range(100000)]
+    print(f"解析吞吐量：{benchmark_parse(sample):.0f}条/秒（{len(corpus)}条语料循环，共{len(sample)}条）")
+    start = time.perf_counter()
+    found = fuzz_parse(corpus)
+    print(f"变异测试：100000次，{len(found)}个异常输入，耗时 {time.perf_counter() - start:.1f}秒")
+    for bad_input, error in found[:20]:
+        print(f"  {bad_input!r}: {error!r}")
+    sys.exit(1 if found else 0)
@@ -0,0 +1,12 @@
+"""核心库的公共类型（只在需要时导入，import gauth_core 不加载 typing）"""
+from typing import TypedDict
+
+
+class AccountRecord(TypedDict):
+    """load_accounts 返回的账户记录"""
+    id: str
+    issuer: str
+    name: str
+    secret: str
+    type: str  # "totp" 或 "hotp"
+    counter: int
@@ -0,0 +1,371 @@
+"""配置与账户文件的读写（不依赖界面模块，命令行和界面共用）
+
+账户文件格式（首行是版本头，其余每行一个账户）：
+
+    {"vault_version": 12, "accounts": [
+      {"issuer": "...", "name": "...", "secret": "..."},
+      ...
+    ]}
+
+版本号每次写入加一。多个进程（界面、命令行、共享目录的其他电脑）写同一个账户文件时，
+写入方在旁边的 .lock 文件上加建议锁，并比较版本号（compare-and-swap），
+版本号已变说明文件被别人改过，抛出 VaultConflictError 而不是覆盖。
+轮询的读者（VaultWatcher）文件状态不变时只做一次 stat，变了也只读首行比较版本号。
+旧版的纯数组格式视为版本 0，仍可读取，第一次写入后升级为新格式。
+"""
+import hashlib
+import json
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".auth_app_config.json")
+VAULT_FILE_NAME = ".ubisoft_authenticator.json"
+VAULT_HEADER_PREFIX = '{"vault_version": '
+# 等待其他进程释放写锁的最长时间（秒）
+LOCK_TIMEOUT = 10.0
+
+
+def stable_account_id(secret):
+    """稳定的账户ID（跨进程不变，用于使用频率等持久化数据）"""
+    normalized = secret.replace(" ", "").upper().encode("utf-8")
+    return hashlib.sha256(normalized).hexdigest()[:16]
+
+
+def read_settings(config_file=CONFIG_FILE):
+    """读取配置文件，不存在或损坏时返回空字典"""
+    try:
+        with open(config_file, "r", encoding="utf-8") as f:
+            settings = json.load(f)
+        return settings if isinstance(settings, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"加载配置失败: {e}")
+        return {}
+
+
+def resolve_config_dir(settings):
+    """配置中的账户目录；不存在或不可写时回退到用户主目录"""
+    default_dir = os.path.expanduser("~")
+    config_dir = settings.get("config_dir", default_dir)
+    if os.path.exists(config_dir) and os.access(config_dir, os.W_OK):
+        return config_dir
+    return default_dir
+
+
+def vault_path(config_dir):
+    return os.path.join(config_dir, VAULT_FILE_NAME)
+
+
+class VaultConflictError(Exception):
+    """账户文件已被其他进程改写（版本号与预期不一致），本次写入未执行"""
+
+    def __init__(self, expected, actual):
+        super().__init__(f"账户文件已被其他程序修改（预期版本 {expected}，实际版本 {actual}）")
+        self.expected = expected
+        self.actual = actual
+
+
+class VaultLock:
+    """跨进程写锁（建议锁）：with VaultLock(账户文件路径): ...
+
+    锁在旁边的 .lock 文件上，因为账户文件本身每次写入都会被整体替换。
+    超过 timeout 秒仍未拿到锁时抛出 Exception。
+    """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT):
+        self.lock_path = path + ".lock"
+        self.timeout = timeout
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.lock_path, "a+b")
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self.file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    self.file.seek(0)
+                    msvcrt.locking(self.file.fileno(), msvcrt.LK_NBLCK, 1)
+                return self
+            except OSError:
+                if time.monotonic() >= deadline:
+                    self.file.close()
+                    self.file = None
+                    raise Exception("账户文件正被其他程序写入，请稍后重试")
+                time.sleep(0.01)
+
+    def __exit__(self, *exc_info):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+            else:
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self.file.close()
+            self.file = None
+
+
+def _parse_vault(data):
+    """解析后的账户文件 → (版本号, 账户列表)；旧版纯数组格式为版本 0"""
+    if isinstance(data, dict):
+        return int(data.get("vault_version", 0)), data.get("accounts", [])
+    return 0, data
+
+
+def read_vault_version(path):
+    """只读首行取账户文件版本号；文件不存在或旧版格式返回 0"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            line = f.readline()
+            if line.startswith(VAULT_HEADER_PREFIX):
+                end = line.find(",", len(VAULT_HEADER_PREFIX))
+                if end > 0 and line[len(VAULT_HEADER_PREFIX):end].isdigit():
+                    return int(line[len(VAULT_HEADER_PREFIX):end])
+            if not line.lstrip().startswith("{"):
+                return 0
+            # 首行不是本程序写出的版本头（例如被手工重新排版），整体解析
+            f.seek(0)
+            return _parse_vault(json.load(f))[0]
+    except FileNotFoundError:
+        return 0
+
+
+def read_vault_state(path):
+    """读取账户文件，返回 (版本号, 核心数据字典列表)；版本号与内容来自同一次读取"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return _parse_vault(json.load(f))
+    except FileNotFoundError:
+        return 0, []
+
+
+def read_vault(path):
+    """读取账户文件，返回核心数据字典列表 [{issuer, name, secret, type?, counter?}, ...]"""
+    return read_vault_state(path)[1]
+
+
+def build_vault_records(items, journal):
+    """账户文件条目 → 记录：按账户ID去重，HOTP 计数器取账户文件与日志中的较大值
+
+    返回 [{id, issuer, name, secret, type, counter}, ...]。
+    """
+    counters = None
+    seen = set()
+    records = []
+    for item in items:
+        account_id = stable_account_id(item["secret"])
+        if account_id in seen:
+            continue
+        seen.add(account_id)
+        record = {
+            "id": account_id,
+            "issuer": item["issuer"],
+            "name": item["name"],
+            "secret": item["secret"],
+            "type": item.get("type", "totp"),
+            "counter": int(item.get("counter", 0))
+        }
+        if record["type"] == "hotp":
+            if counters is None:
+                counters = journal.load()
+            record["counter"] = max(record["counter"], counters.get(account_id, 0))
+        records.append(record)
+    return records
+
+
+def load_vault_records(vault_file, journal):
+    """读取账户文件（见 build_vault_records）"""
+    return build_vault_records(read_vault(vault_file), journal)
+
+
+def vault_item(record):
+    """记录 → 账户文件/JSON 导出中的一项（TOTP 不写类型和计数器）"""
+    item = {"issuer": record["issuer"], "name": record["name"], "secret": record["secret"]}
+    if record.get("type", "totp") == "hotp":
+        item["type"] = "hotp"
+        item["counter"] = int(record.get("counter", 0))
+    return item
+
+
+def _write_vault_file(path, records, version, journal):
+    """写入 version 版本的账户文件（调用方已持有写锁）"""
+    counters = journal.load() if journal is not None else {}
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8", newline="") as out:
+            out.write(f'{VAULT_HEADER_PREFIX}{version}, "accounts": [')
+            separator = "\n  "
+            for record in records:
+                item = vault_item(record)
+                if counters and "counter" in item:
+                    item["counter"] = max(item["counter"], counters.get(stable_account_id(item["secret"]), 0))
+                out.write(separator)
+                out.write(json.dumps(item, ensure_ascii=False))
+                separator = ",\n  "
+            out.write("\n]}\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    if journal is not None:
+        journal.clear()
+
+
+def write_vault(path, records, expected_version=None, journal=None, timeout=LOCK_TIMEOUT):
+    """加写锁、比较版本号后写入账户文件（临时文件 + fsync + 替换），返回新版本号
+
+    expected_version 为 None 时不比较（强制写入）；文件当前版本与之不同时抛出 VaultConflictError，文件不变。
+    提供 journal 时在锁内把日志中更大的 HOTP 计数器并入记录，写入后清空日志，
+    其他进程刚追加的计数器不会因清空而丢失（追加日志同样要持有这把锁）。
+    """
+    with VaultLock(path, timeout):
+        current = read_vault_version(path)
+        if expected_version is not None and current != expected_version:
+            raise VaultConflictError(expected_version, current)
+        _write_vault_file(path, records, current + 1, journal)
+        return current + 1
+
+
+def update_vault(path, update, journal=None, timeout=LOCK_TIMEOUT):
+    """持有写锁完成 读取 → update(当前条目列表) → 写入，返回 (新版本号, 写入的记录)
+
+    读取与写入之间其他进程无法写入，不会冲突（用于冲突后的合并）。
+    """
+    with VaultLock(path, timeout):
+        current, items = read_vault_state(path)
+        records = update(items)
+        _write_vault_file(path, records, current + 1, journal)
+        return current + 1, records
+
+
+def _merge_fields(record):
+    otp_type = record.get("type", "totp")
+    return (record["issuer"], record["name"], otp_type, int(record.get("counter", 0)) if otp_type == "hotp" else 0)
+
+
+def merge_vault_records(base, local, remote):
+    """三方合并：把 local 相对 base（上次读取/写入时的内容）的修改应用到 remote（文件中的最新内容）上
+
+    按账户ID对应。本进程删除的账户删除；本进程改过的账户用本进程的版本（HOTP 计数器取较大值）；
+    本进程新增的账户追加在末尾；其余保持 remote 的内容和顺序。
+    """
+    base_by_id = {stable_account_id(r["secret"]): r for r in base}
+    local_by_id = {stable_account_id(r["secret"]): r for r in local}
+    merged = []
+    seen = set()
+    for item in remote:
+        account_id = stable_account_id(item["secret"])
+        if account_id in seen:
+            continue
+        seen.add(account_id)
+        mine = local_by_id.get(account_id)
+        if mine is None:
+            if account_id in base_by_id:
+                continue  # 本进程删除
+            merged.append(item)
+            continue
+        theirs = base_by_id.get(account_id)
+        if theirs is not None and _merge_fields(mine) == _merge_fields(theirs):
+            merged.append(item)  # 本进程未修改
+            continue
+        chosen = dict(mine)
+        if chosen.get("type", "totp") == "hotp":
+            chosen["counter"] = max(int(chosen.get("counter", 0)), int(item.get("counter", 0)))
+        merged.append(chosen)
+    for account_id, record in local_by_id.items():
+        if account_id not in seen and account_id not in base_by_id:
+            merged.append(record)  # 本进程新增
+    return merged
+
+
+class VaultWatcher:
+    """轮询账户文件是否被其他进程改写
+
+    文件状态（inode、大小、修改时间）不变时只做一次 stat；变了再读首行比较版本号，
+    版本号不变（例如只是被 touch）不算改写。只有真正改写时调用方才需要整体解析。
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.version = None  # 调用方已知的版本号（读取或写入后由 mark 设置）
+        self.signature = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def mark(self, version):
+        """调用方读取或写入了 version 版本；下一次 changed() 会重新读一次首行确认"""
+        self.version = version
+        self.signature = None
+
+    def changed(self):
+        """账户文件版本是否与已知版本不同"""
+        signature = self._stat()  # 先 stat 再读首行：两者之间的改写会在下一次轮询时发现
+        if signature is not None and signature == self.signature:
+            return False
+        if read_vault_version(self.path) != self.version:
+            return True  # 调用方重新读取并 mark 之前，每次轮询都读首行
+        self.signature = signature
+        return False
+
+
+def read_vault_candidates(path, query):
+    """只解析可能匹配关键词的账户（用于命令行快速查找）
+
+    账户文件按每行一个账户保存时，先按关键词过滤文本行，只解码命中的行；
+    其他格式（旧版缩进格式）或关键词可能是账户ID时解析整个文件。
+    返回的列表仍需经 find_accounts 精确匹配。
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return []
+    needle = query.strip().lower()
+    line_per_account = text.startswith(('[\n  {"', VAULT_HEADER_PREFIX))
+    if not needle or len(needle) == 16 or '"' in needle or "\\" in needle or not line_per_account:
+        return _parse_vault(json.loads(text))[1]
+    # 小写化后与原文长度不同（少数特殊字符）时位置无法对应，同样整体解析
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        return _parse_vault(json.loads(text))[1]
+    candidates = []
+    pos = lowered.find(needle)
+    while pos >= 0:
+        start = text.rfind("\n", 0, pos) + 1
+        end = text.find("\n", pos)
+        end = len(text) if end < 0 else end
+        line = text[start:end].rstrip(",")
+        if line.startswith('  {"'):
+            candidates.append(json.loads(line))
+        pos = lowered.find(needle, end + 1)
+    return candidates
+
+
+def find_accounts(accounts, query):
+    """按关键词查找账户：平台名完全一致或账户ID一致的优先，否则按平台/账户名包含关键词匹配"""
+    query = query.strip().lower()
+    matches = [acc for acc in accounts if acc["issuer"].lower() == query]
+    if not matches and len(query) == 16:
+        matches = [acc for acc in accounts if (acc.get("id") or stable_account_id(acc["secret"])) == query]
+    if not matches:
+        matches = [acc for acc in accounts if query in acc["issuer"].lower() or query in acc["name"].lower()]
+    return matches
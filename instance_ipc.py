@@ -0,0 +1,225 @@
+"""单实例锁与本地进程间通信
+
+运行中的程序监听本地 IPC 端点（Linux/macOS 为 Unix 域套接字，Windows 为命名管道），
+能绑定该端点即为唯一实例。再次启动时命令行（auth_cli）先把命令转发给运行中的实例，
+转发端只导入本模块和标准库中的轻量模块，不加载界面库，也不读取账户文件。
+协议：每个连接发送一行 JSON 请求 {"cmd", "args"}，收到一行 JSON 响应 {"ok", "result"/"error"}。
+"""
+import json
+import os
+import sys
+import time
+
+IPC_NAME = "GoogleAuthenticator_SingleInstance_8f2d7c9e"
+CONNECT_TIMEOUT = 0.5
+REPLY_TIMEOUT = 5.0
+MAX_MESSAGE = 64 * 1024
+
+_IS_WINDOWS = sys.platform.startswith("win")
+_ERROR_ACCESS_DENIED = 5
+_ERROR_PIPE_BUSY = 231
+_ERROR_PIPE_CONNECTED = 535
+
+
+def ipc_address():
+    """本用户的 IPC 端点地址"""
+    if _IS_WINDOWS:
+        return "\\\\.\\pipe\\" + IPC_NAME + "_" + os.environ.get("USERNAME", "user")
+    # 套接字放在仅本用户可访问的目录中，其他用户无法连接
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if not runtime_dir or not os.path.isdir(runtime_dir):
+        runtime_dir = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"gauth-{os.getuid()}")
+        os.makedirs(runtime_dir, mode=0o700, exist_ok=True)
+        st = os.stat(runtime_dir)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise PermissionError(f"IPC 目录权限不安全：{runtime_dir}")
+    return os.path.join(runtime_dir, IPC_NAME + ".sock")
+
+
+def _read_line(recv):
+    """从 recv(n) 读取一行（不含换行符）"""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk = recv(4096)
+        if not chunk:
+            break
+        data += chunk
+        if len(data) > MAX_MESSAGE:
+            raise ValueError("IPC 消息过长")
+    return data.rstrip(b"\n")
+
+
+def _encode(message):
+    return json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+# ---------- 客户端 ----------
+
+def send_command(cmd, args=()):
+    """把命令发给运行中的实例，返回响应字典；没有运行中的实例时返回 None"""
+    request = _encode({"cmd": cmd, "args": list(args)})
+    if _IS_WINDOWS:
+        pipe = None
+        for _ in range(50):
+            try:
+                pipe = open(ipc_address(), "r+b", buffering=0)
+                break
+            except FileNotFoundError:
+                return None
+            except OSError as e:
+                if getattr(e, "winerror", None) != _ERROR_PIPE_BUSY:
+                    raise
+                time.sleep(0.01)  # 服务端正在创建下一个管道实例
+        if pipe is None:
+            raise TimeoutError("运行中的实例没有响应")
+        with pipe:
+            pipe.write(request)
+            return json.loads(_read_line(pipe.read))
+
+    address = ipc_address()
+    if not os.path.exists(address):
+        return None  # 没有套接字文件就没有运行中的实例，不必加载 socket 模块
+    import socket
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(address)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        sock.settimeout(REPLY_TIMEOUT)
+        sock.sendall(request)
+        return json.loads(_read_line(sock.recv))
+
+
+# ---------- 服务端 ----------
+
+class InstanceServer:
+    """单实例 IPC 服务端；handler(cmd, args) 在连接线程中执行，返回可 JSON 序列化的结果"""
+
+    def __init__(self, handler=None):
+        self.handler = handler
+        self.address = None
+        self.sock = None
+        self.running = False
+
+    def start(self):
+        """绑定 IPC 端点；已有实例在运行时返回 False"""
+        import threading
+        self.address = ipc_address()
+        if _IS_WINDOWS:
+            try:
+                handle = self._new_pipe(first=True)
+            except OSError as e:
+                if getattr(e, "winerror", None) == _ERROR_ACCESS_DENIED:
+                    return False
+                raise
+            target, args = self._serve_pipes, (handle,)
+        else:
+            if not self._bind_socket():
+                return False
+            target, args = self._serve_socket, ()
+        self.running = True
+        threading.Thread(target=target, args=args, daemon=True).start()
+        return True
+
+    def _bind_socket(self):
+        import socket
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.address)
+        except OSError:
+            # 套接字文件已存在：能连上说明实例在运行，否则（包括连接超时）是上次异常退出留下的
+            try:
+                alive = send_command("ping") is not None
+            except socket.timeout:
+                alive = False
+            if alive:
+                sock.close()
+                return False
+            os.unlink(self.address)
+            sock.bind(self.address)
+        sock.listen(16)
+        self.sock = sock
+        return True
+
+    def _serve_socket(self):
+        import threading
+        while self.running:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._handle_socket, args=(conn,), daemon=True).start()
+
+    def _handle_socket(self, conn):
+        with conn:
+            try:
+                conn.settimeout(REPLY_TIMEOUT)
+                conn.sendall(self._respond(_read_line(conn.recv)))
+            except OSError:
+                pass
+
+    def _new_pipe(self, first=False):
+        import _winapi
+        flags = _winapi.PIPE_ACCESS_DUPLEX
+        if first:
+            flags |= _winapi.FILE_FLAG_FIRST_PIPE_INSTANCE
+        return _winapi.CreateNamedPipe(
+            self.address, flags,
+            _winapi.PIPE_TYPE_BYTE | _winapi.PIPE_READMODE_BYTE | _winapi.PIPE_WAIT,
+            _winapi.PIPE_UNLIMITED_INSTANCES, MAX_MESSAGE, MAX_MESSAGE,
+            _winapi.NMPWAIT_WAIT_FOREVER, _winapi.NULL
+        )
+
+    def _serve_pipes(self, handle):
+        import _winapi
+        import threading
+        while self.running:
+            try:
+                _winapi.ConnectNamedPipe(handle, False)
+            except OSError as e:
+                if getattr(e, "winerror", None) != _ERROR_PIPE_CONNECTED:
+                    _winapi.CloseHandle(handle)
+                    break
+            # 先创建下一个管道实例再处理当前连接，后续客户端无需等待
+            connected, handle = handle, self._new_pipe()
+            threading.Thread(target=self._handle_pipe, args=(connected,), daemon=True).start()
+
+    def _handle_pipe(self, handle):
+        import _winapi
+        try:
+            def recv(size):
+                data, _ = _winapi.ReadFile(handle, size)
+                return data
+            _winapi.WriteFile(handle, self._respond(_read_line(recv)))
+            # 等客户端读完响应并关闭管道，过早关闭句柄会丢弃未读数据
+            while recv(1):
+                pass
+        except OSError:
+            pass
+        finally:
+            _winapi.CloseHandle(handle)
+
+    def _respond(self, line):
+        """解析请求并调用 handler，返回编码后的响应"""
+        try:
+            request = json.loads(line)
+            cmd, args = request["cmd"], request.get("args", [])
+            if cmd == "ping":
+                return _encode({"ok": True, "result": "pong"})
+            if self.handler is None:
+                raise RuntimeError("程序正在启动，请稍后重试")
+            return _encode({"ok": True, "result": self.handler(cmd, args)})
+        except Exception as e:
+            return _encode({"ok": False, "error": str(e)})
+
+    def stop(self):
+        """停止监听并删除套接字文件"""
+        self.running = False
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
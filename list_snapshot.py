@@ -0,0 +1,61 @@
+"""账户列表快照
+
+退出时保存已渲染列表的顺序、平台/账户名、窗口布局和滚动位置（不含密钥），
+下次启动时先按快照绘制列表骨架，账户文件解码完成后再填充验证码。
+快照记录账户文件的修改时间和大小，账户文件变化后快照自动失效。
+"""
+import json
+import os
+
+SNAPSHOT_VERSION = 1
+
+
+def vault_fingerprint(vault_path):
+    """账户文件指纹（修改时间 + 大小）"""
+    try:
+        st = os.stat(vault_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def save_snapshot(snapshot_path, vault_path, accounts, geometry=None, scroll=0.0):
+    """保存快照；accounts 为按显示顺序排列的账户字典"""
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "vault": vault_fingerprint(vault_path),
+        "geometry": geometry,
+        "scroll": scroll,
+        "accounts": [
+            {"id": acc["id"], "issuer": acc["issuer"], "name": acc["name"], "type": acc.get("type", "totp")}
+            for acc in accounts
+        ]
+    }
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_snapshot(snapshot_path, vault_path):
+    """读取快照；不存在、格式不符或账户文件已变化时返回 None"""
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != SNAPSHOT_VERSION:
+        return None
+    if data.get("vault") is None or data.get("vault") != vault_fingerprint(vault_path):
+        return None
+    if not data.get("accounts"):
+        return None
+    return data
+
+
+def discard_snapshot(snapshot_path):
+    """删除快照"""
+    try:
+        os.remove(snapshot_path)
+    except OSError:
+        pass
@@ -0,0 +1,290 @@
+"""本地 JSON-RPC 接口（默认关闭，在帮助页开启）
+
+供脚本和其他本地程序批量获取验证码。只监听回环地址或 Unix 域套接字，
+每个请求都要带 Authorization: Bearer <令牌>，令牌保存在账户目录的 .auth_api_token（仅本用户可读）。
+使用 HTTP/1.1 持久连接，一个连接可连续发送请求；支持 JSON-RPC 批量请求，
+get_codes 一次返回多个账户的验证码。请求在连接线程中直接读取验证码缓存，不经过界面线程。
+
+方法：
+    list_accounts()            -> [{id, issuer, name, type}, ...]
+    get_code(id)               -> {id, code, remaining}
+    get_codes(ids)             -> [{id, code, remaining} 或 {id, error}, ...]
+"""
+import hmac
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_API_ADDRESS = "127.0.0.1:8765"
+TOKEN_FILE_NAME = ".auth_api_token"
+RPC_PATH = "/rpc"
+MAX_BODY = 1024 * 1024
+LOOPBACK_HOSTS = ("127.0.0.1", "::1", "localhost")
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+ACCOUNT_NOT_FOUND = -32001
+
+
+def load_api_token(config_dir):
+    """读取接口令牌，不存在时生成（文件权限 0600）"""
+    path = os.path.join(config_dir, TOKEN_FILE_NAME)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+        if token:
+            return token
+    except FileNotFoundError:
+        pass
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token + "\n")
+    return token
+
+
+def parse_api_address(address):
+    """"127.0.0.1:8765" -> ("tcp", (host, port))；"unix:/路径" -> ("unix", 路径)
+
+    只允许回环地址，避免把验证码暴露到网络上。
+    """
+    if address.startswith("unix:"):
+        path = address[5:]
+        if not path:
+            raise ValueError("Unix 套接字路径为空")
+        return "unix", os.path.expanduser(path)
+    host, sep, port = address.rpartition(":")
+    host = host.strip("[]")
+    if not sep or host not in LOOPBACK_HOSTS:
+        raise ValueError(f"接口只能监听回环地址：{address}")
+    try:
+        port = int(port)
+    except ValueError:
+        raise ValueError(f"端口不是整数：{port}")
+    if not 0 <= port <= 65535:
+        raise ValueError(f"端口超出范围：{port}")
+    return "tcp", (host, port)
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class _RpcHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 持久连接
+    server_version = "GoogleAuthenticatorAPI/1.0"
+    wbufsize = 64 * 1024  # 响应头和正文合并发送，每个请求处理完后统一 flush
+
+    def setup(self):
+        # TCP 连接关闭 Nagle 算法，小响应立即发出，避免持久连接上的 40ms 延迟
+        self.disable_nagle_algorithm = self.server.address_family != socket.AF_UNIX
+        super().setup()
+
+    def address_string(self):
+        # Unix 套接字的客户端地址是空字符串
+        return self.client_address[0] if self.client_address else "unix"
+
+    def log_message(self, format, *args):
+        pass  # 高频请求不逐条打印
+
+    def _reply(self, status, body=None):
+        data = b"" if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        api = self.server.api
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            self.close_connection = True
+            self._reply(413, {"error": "请求过大"})
+            return
+        body = self.rfile.read(length)
+        if self.path != RPC_PATH:
+            self._reply(404, {"error": "未知路径"})
+            return
+        if not api.check_token(self.headers.get("Authorization", "")):
+            self._reply(401, {"error": "令牌无效"})
+            return
+        response = api.handle_body(body)
+        if response is None:
+            self._reply(204)  # 只有通知，没有响应
+        else:
+            self._reply(200, response)
+
+    def do_GET(self):
+        self._reply(405, {"error": "请使用 POST " + RPC_PATH})
+
+
+def _handle_error(request, client_address):
+    """客户端提前断开是正常情况，其他错误打印一行日志"""
+    error = sys.exc_info()[1]
+    if not isinstance(error, (BrokenPipeError, ConnectionResetError)):
+        print(f"❌ 本地接口请求出错: {error!r}")
+
+
+class _TcpHTTPServer(ThreadingHTTPServer):
+    handle_error = staticmethod(_handle_error)
+
+
+class _Tcp6HTTPServer(_TcpHTTPServer):
+    address_family = socket.AF_INET6
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    handle_error = staticmethod(_handle_error)
+
+    def server_bind(self):
+        # 上次异常退出留下的套接字文件
+        try:
+            os.unlink(self.server_address)
+        except FileNotFoundError:
+            pass
+        super().server_bind()
+        os.chmod(self.server_address, 0o600)
+
+
+class LocalApiServer:
+    """本地 JSON-RPC 服务
+
+    accounts() 返回账户ID到账户的字典（可在任意线程调用）；
+    code_of(account) 返回账户当前验证码（无法计算时为 None），remaining() 返回当前窗口剩余秒数。
+    """
+
+    def __init__(self, address, token, accounts, code_of, remaining):
+        self.kind, self.address = parse_api_address(address)
+        self.token = token
+        self.accounts = accounts
+        self.code_of = code_of
+        self.remaining = remaining
+        self.httpd = None
+        self.methods = {
+            "list_accounts": self.list_accounts,
+            "get_code": self.get_code,
+            "get_codes": self.get_codes
+        }
+
+    # ---------- 生命周期 ----------
+
+    def start(self):
+        """开始监听（后台线程）；端口被占用等错误抛出 OSError"""
+        if self.kind == "unix":
+            httpd = _UnixHTTPServer(self.address, _RpcHandler)
+        elif ":" in self.address[0]:
+            httpd = _Tcp6HTTPServer(self.address, _RpcHandler)
+        else:
+            httpd = _TcpHTTPServer(self.address, _RpcHandler)
+        httpd.api = self
+        self.httpd = httpd
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return self
+
+    def bound_address(self):
+        """实际监听的地址（端口为 0 时由系统分配）"""
+        if self.kind == "unix":
+            return "unix:" + self.address
+        host, port = self.httpd.server_address[:2]
+        return f"{host}:{port}"
+
+    def stop(self):
+        if self.httpd is None:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None
+        if self.kind == "unix":
+            try:
+                os.unlink(self.address)
+            except OSError:
+                pass
+
+    # ---------- 请求处理 ----------
+
+    def check_token(self, header):
+        scheme, _, token = header.partition(" ")
+        return scheme == "Bearer" and hmac.compare_digest(token.strip().encode(), self.token.encode())
+
+    def handle_body(self, body):
+        """处理单个或批量 JSON-RPC 请求，返回响应对象/列表（全是通知时返回 None）"""
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return _error_response(None, PARSE_ERROR, "JSON 解析失败")
+        if isinstance(request, list):
+            if not request:
+                return _error_response(None, INVALID_REQUEST, "空的批量请求")
+            responses = [r for r in (self.handle_request(item) for item in request) if r is not None]
+            return responses or None
+        return self.handle_request(request)
+
+    def handle_request(self, request):
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return _error_response(None, INVALID_REQUEST, "无效的请求")
+        request_id = request.get("id")
+        is_notification = "id" not in request
+        method = self.methods.get(request["method"])
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"未知方法：{request['method']}")
+            params = request.get("params", [])
+            if isinstance(params, dict):
+                result = method(**params)
+            elif isinstance(params, list):
+                result = method(*params)
+            else:
+                raise RpcError(INVALID_PARAMS, "params 必须是数组或对象")
+        except RpcError as e:
+            return None if is_notification else _error_response(request_id, e.code, str(e))
+        except TypeError as e:
+            return None if is_notification else _error_response(request_id, INVALID_PARAMS, str(e))
+        except Exception as e:
+            return None if is_notification else _error_response(request_id, INTERNAL_ERROR, str(e))
+        return None if is_notification else {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    # ---------- 方法 ----------
+
+    def list_accounts(self):
+        return [{"id": acc["id"], "issuer": acc["issuer"], "name": acc["name"], "type": acc.get("type", "totp")}
+                for acc in list(self.accounts().values())]
+
+    def _code_entry(self, index, account_id, remaining):
+        account = index.get(account_id)
+        if account is None or not account.get("secret"):
+            return None
+        code = self.code_of(account)
+        if code is None:
+            return None
+        hotp = account.get("type") == "hotp"
+        return {"id": account_id, "code": code, "remaining": None if hotp else remaining}
+
+    def get_code(self, id):
+        entry = self._code_entry(self.accounts(), id, self.remaining())
+        if entry is None:
+            raise RpcError(ACCOUNT_NOT_FOUND, f"未找到账户：{id}")
+        return entry
+
+    def get_codes(self, ids):
+        if not isinstance(ids, list):
+            raise RpcError(INVALID_PARAMS, "ids 必须是数组")
+        index, remaining = self.accounts(), self.remaining()
+        return [self._code_entry(index, account_id, remaining) or {"id": account_id, "error": "未找到账户"}
+                for account_id in ids]
+
+
+def _error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
@@ -1,8 +1,25 @@
 import os
 import sys
 import tempfile
+import time
 from pathlib import Path
 
+# 进程启动时刻（用于统计启动到可交互的耗时）
+PROCESS_START = time.perf_counter()
+
+# 命令行：get/list/export 转发给运行中的实例或直接读取账户文件，不加载界面库
+if __name__ == "__main__":
+    if "--multiprocessing-fork" in sys.argv:
+        # 打包环境下进程池子进程：在解析命令行之前交给 multiprocessing 执行任务并退出
+        import multiprocessing
+        multiprocessing.freeze_support()
+
+    from auth_cli import main as run_command_line
+
+    _exit_code = run_command_line(sys.argv[1:])
+    if _exit_code is not None:
+        sys.exit(_exit_code)
+
 
 # === 字体预处理 - 必须在其他导入之前 ===
 def setup_fonts():
@@ -130,43 +147,57 @@ def register_windows_font(font_path, font_name):
         return False
 
 
-# 执行字体设置
-setup_fonts()
+# 执行字体设置（只在作为程序运行时；被其他模块导入时不打印、不注册字体）
+if __name__ == "__main__":
+    setup_fonts()
 
 # === 现在导入其他模块 ===
 import customtkinter as ctk
-from tkinter import filedialog, messagebox, Toplevel, Text, font as tkFont, Tk
-import pyotp
-import pyzbar.pyzbar as pyzbar
-import base64
-import urllib.parse
+from tkinter import filedialog, messagebox, simpledialog, Toplevel, Text, font as tkFont, Tk
 import time
 import json
 import threading
 import subprocess
 from pathlib import Path
-import re
 from PIL import Image
 import pystray
 from pystray import MenuItem as item
 import atexit
-import ctypes
-from ctypes import wintypes
+from usage_store import UsageStore, RankedOrder
+from list_snapshot import save_snapshot, load_snapshot, discard_snapshot
+from perf_metrics import LatencyStats
+
+from qr_decode import (BatchDecoder, collect_image_files, IMAGE_EXTENSIONS,
+                       format_timings, PREVIEW_SIZE)
+from gauth_core.otpauth_uri import is_otpauth_uri
+from decode_cache import DecodeCache
+from gauth_core.otp_engine import decode_secret, DEFAULT_RESYNC_WINDOW
+from instance_ipc import InstanceServer, send_command
+from gauth_core.code_cache import CodeCache
+from local_api import LocalApiServer, load_api_token, DEFAULT_API_ADDRESS
+from code_table import CodeTablePublisher
+from ui_dispatch import UiDispatcher
+from gauth_core.vault_store import (CONFIG_FILE, VAULT_FILE_NAME, stable_account_id, read_settings,
+                                   resolve_config_dir, find_accounts)
 
 # 迁移模块支持
-try:
-    import google_auth_migration_pb2 as migration_pb
-
-    MIGRATION_AVAILABLE = True
-    print("✅ 迁移模块已加载")
-except ImportError:
-    migration_pb = None
-    MIGRATION_AVAILABLE = False
-    print("⚠️ 迁移模块不可用")
+from gauth_core.migration import (MIGRATION_AVAILABLE, MigrationAssembler, MigrationMismatchError,
+                                  parse_migration_uri, extract_migration_uri)
+from migration_export import QR_EXPORT_AVAILABLE
+from gauth_core.importers import IMPORTERS, record_from_uri, record_from_migration
+from gauth_core.exporters import EXPORTERS, ENCRYPTION_AVAILABLE, ENCRYPTED_SUFFIX, account_record
+from core_service import CoreService
+
+
+def init_appearance():
+    """报告迁移模块状态并初始化主题（深色模式）；启动程序时调用"""
+    if MIGRATION_AVAILABLE:
+        print("✅ 迁移模块已加载")
+    else:
+        print("⚠️ 迁移模块不可用")
+    ctk.set_appearance_mode("Dark")
+    ctk.set_default_color_theme("dark-blue")
 
-# 初始化主题（深色模式）
-ctk.set_appearance_mode("Dark")
-ctk.set_default_color_theme("dark-blue")
 
 # 颜色常量
 DARK_CARD = "#3d3d3d"
@@ -175,55 +206,81 @@ TEXT_WHITE = "#ffffff"
 TEXT_LIGHT_GRAY = "#bbbbbb"
 TEXT_MEDIUM_GRAY = "#999999"
 
+# 滚轮事件按帧合并（约60Hz）
+SCROLL_FRAME_MS = 16
+# 惯性滚动每帧保留的速度比例
+SCROLL_FRICTION = 0.8
+# X11 下滚轮每格的 delta
+X11_WHEEL_DELTA = 120
+# 导入导出文件时每批送回界面线程的账户数
+IMPORT_BATCH_SIZE = 500
+# 托盘快捷复制菜单最多列出的账户数（固定的账户优先，其余按使用频率）
+TRAY_QUICK_COPY = 10
+# 检查账户文件是否被其他进程改写的间隔（秒，窗口可见时）
+VAULT_POLL_SECONDS = 3
+
+
+def build_account(issuer, name, secret, otp_type="totp", counter=0):
+    """创建内存中的账户记录；HOTP 账户预先解码密钥并记录计数器
+
+    密钥不是有效的 Base32 编码时抛出 ValueError。
+    """
+    try:
+        key = decode_secret(secret)
+    except ValueError:
+        raise ValueError("密钥不是有效的Base32编码")
+    account = {
+        "id": stable_account_id(secret),
+        "issuer": issuer,
+        "name": name,
+        "secret": secret,
+        "type": otp_type,
+        "card_elements": None
+    }
+    if otp_type == "hotp":
+        account["key"] = key
+        account["counter"] = int(counter)
+    return account
+
+
+def account_from_record(record):
+    """从账户文件记录创建账户；无法解析的账户保留原记录（保存时原样写回），卡片显示为错误状态"""
+    try:
+        return build_account(record["issuer"], record["name"], record["secret"], record["type"], record["counter"])
+    except Exception as e:
+        print(f"⚠️ 账户 {record['issuer']} - {record['name']} 无法加载: {e}")
+        return {
+            "id": stable_account_id(record["secret"]),
+            "issuer": record["issuer"],
+            "name": record["name"],
+            "secret": record["secret"],
+            "type": record["type"],
+            "counter": record["counter"],
+            "card_elements": None,
+            "error": str(e)
+        }
+
 
-# 基于系统互斥体的单例类（无文件生成）
-class SystemMutexSingleInstance:
-    def __init__(self):
-        self.mutex_handle = None  # Windows互斥体句柄
-        self.pipe_handle = None  # Linux/macOS管道句柄
-        self.is_single = False  # 是否为单例
+# 当前窗口验证码缓存（界面线程、IPC 和本地接口线程共用）
+code_cache = CodeCache()
+INVALID_CODE = "密钥无效"
 
-    def check(self):
-        """跨平台单例检查：Windows用互斥体，Linux/macOS用管道锁"""
-        try:
-            if sys.platform.startswith('win'):
-                # Windows：创建全局互斥体（确保多用户环境生效）
-                mutex_name = "Global\\GoogleAuthenticator_SingleInstance_8f2d7c9e"
-                kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-                # 创建互斥体：无安全描述符、非初始拥有、唯一名称
-                self.mutex_handle = kernel32.CreateMutexW(None, False, mutex_name)
-                error_code = ctypes.get_last_error()
-
-                if error_code == 183:  # 互斥体已存在（已有程序实例）
-                    return False
-                atexit.register(self.release)  # 退出时释放资源
-                self.is_single = True
-                return True
 
-            else:
-                # Linux/macOS：匿名管道加锁（进程退出自动释放）
-                import fcntl  # 仅Linux/macOS需要，避免Windows报错
-                pipe_r, pipe_w = os.pipe()
-                self.pipe_handle = pipe_w
-                # 非阻塞排他锁：已被锁则抛BlockingIOError
-                fcntl.flock(self.pipe_handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
-                atexit.register(self.release)
-                self.is_single = True
-                return True
+def current_code(account):
+    """账户当前验证码（TOTP 按时间，HOTP 按计数器）；无法计算时标记账户并返回 INVALID_CODE"""
+    if account.get("error"):
+        return INVALID_CODE
+    try:
+        return code_cache.code(account)
+    except Exception as e:
+        account["error"] = str(e)
+        return INVALID_CODE
 
-        except Exception as e:
-            print(f"单例检查错误: {e}")
-            return False
 
-    def release(self):
-        """释放系统资源"""
-        if sys.platform.startswith('win') and self.mutex_handle:
-            kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
-            kernel32.CloseHandle(self.mutex_handle)
-            self.mutex_handle = None
-        elif self.pipe_handle:
-            os.close(self.pipe_handle)
-            self.pipe_handle = None
+def valid_code(account):
+    """账户当前验证码，无法计算时返回 None（命令行、本地接口和验证码表使用）"""
+    code = current_code(account)
+    return None if account.get("error") else code
 
 
 class GoogleAuthenticator:
@@ -238,24 +295,57 @@ class GoogleAuthenticator:
         self.root.withdraw()
 
         # 配置文件路径
-        self.config_file = os.path.join(str(Path.home()), ".auth_app_config.json")
+        self.config_file = CONFIG_FILE
         self.load_settings()  # 加载配置目录
         self.old_save_file = os.path.join(str(Path.home()), ".ubisoft_authenticator.json")
-        self.save_file = os.path.join(self.config_dir, ".ubisoft_authenticator.json")
+        self.save_file = os.path.join(self.config_dir, VAULT_FILE_NAME)
+        self.snapshot_file = os.path.join(self.config_dir, ".auth_list_snapshot.json")
 
         # 配置迁移（旧→新目录）
         self.migrate_from_old_location()
 
+        # 使用频率（复制次数）存储
+        self.usage_store = UsageStore(self.config_dir)
+        self.usage_order = RankedOrder(self.usage_store)
+        self.account_index = {}
+
+        # 核心服务：账户读写、计数器日志、扫码、导入导出在独立的事件循环线程中执行
+        self.core = CoreService(self.config_dir, code_cache).start()
+
         # 渲染状态
         self.render_complete = False
-        self.render_step = 0
-        self.total_render_steps = 5
+        self.startup_metrics = {}
+        self.snapshot_accounts = None  # 快照骨架卡片（id -> 账户字典）
+        self.snapshot_scroll = 0.0
 
         # 托盘相关
         self.tray_icon = None
         self.tray_thread = None
         self.is_running = True
 
+        # 后台线程（托盘、IPC、解码/导入导出）交给界面线程的任务都经过这个队列
+        self.dispatcher = UiDispatcher(self.root)
+        self.dispatcher.start()
+
+        # 隐藏/最小化时停止界面刷新（功耗模式）
+        self.ui_hidden = False
+        self.ui_window = None  # 卡片上验证码所属的窗口编号
+        self.timer_wakeups = 0  # 定时器唤醒次数（含隐藏时的验证码表刷新）
+        self.vault_poll_at = 0.0  # 下次检查账户文件版本的时刻
+        self.vault_edits = 0  # 提交给核心服务的保存/计数器修改次数（判断读取结果是否已过期）
+        self.hidden_since = None
+        self.hidden_wakeups_start = 0
+        self.hidden_publish_job = None
+
+        # 本地 JSON-RPC 接口（默认关闭）
+        self.api_server = None
+        if self.api_enabled:
+            self.start_local_api()
+
+        # 共享内存验证码表（默认关闭，由定时器在每个窗口开始时刷新）
+        self.code_table = CodeTablePublisher() if self.code_table_enabled else None
+        self.code_table_window = None  # 已发布的窗口编号；账户变化时置空，下一次定时器触发时重写
+
         # 窗口关闭拦截（最小化到托盘）
         self.root.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
 
@@ -265,33 +355,114 @@ class GoogleAuthenticator:
 
         # 数据存储
         self.accounts = []
+        self.accounts_loaded = False  # 启动读取完成前不写账户文件
+        self.save_pending = False
         self.timer_id = None
-        self.migrate_accounts = []
+        self.migration_assembler = None  # 多批次迁移二维码组装
         self.current_editing_account = None
 
         # 复制功能优化
         self.copy_hint = None
         self.copy_lock = False
         self.copy_hint_timer = None
-        self.last_copy_time = 0
+        self.last_copy_times = {}  # 按账户防抖
+        self.clipboard_clear_timer = None
+        self.clipboard_content = None  # 最近一次写入剪贴板的验证码
+        self.copy_latency_stats = LatencyStats("复制到剪贴板延迟", report_every=20)
+
+        # 滚轮合并状态
+        self.scroll_pending = 0.0
+        self.scroll_velocity = 0.0
+        self.scroll_remainder = 0.0
+        self.scroll_job = None
+        self.scroll_frame_start = 0.0
+        self.scroll_frame_stats = LatencyStats("滚动帧耗时", report_every=600)
 
         # 卡片渲染跟踪
         self.current_card_ids = set()
         self.pages_created = {
             "account": False, "scan": False, "manual": False,
-            "migrate_scan": False, "migration_help": False, "edit": False
+            "migrate_scan": False, "migration_help": False, "edit": False,
+            "batch_import": False
+        }
+        # 页面按需构建（首次 show_page 时创建）
+        self.page_builders = {
+            "account": self.create_account_page,
+            "scan": self.create_scan_page,
+            "manual": self.create_manual_page,
+            "migrate_scan": self.create_migrate_scan_page,
+            "migration_help": self.create_migration_help_page,
+            "edit": self.create_edit_page,
+            "batch_import": self.create_batch_import_page
         }
 
-        # 分步骤创建UI
-        self.root.after(10, self.create_ui_step1)
+        # 批量导入
+        self.batch_decoder = None
+        self.batch_state = None
+
+        # 事件循环启动后立即构建UI
+        self.root.after_idle(self.build_ui)
+
+    def mark_startup(self, stage):
+        """记录启动阶段耗时（毫秒，自进程启动起）"""
+        self.startup_metrics[stage] = (time.perf_counter() - PROCESS_START) * 1000
+
+    def build_ui(self):
+        """构建界面并加载账户，完成后显示窗口（由完成事件驱动，无固定延时）"""
+        self.mark_startup("mainloop")
+        try:
+            self.create_ui_step1()
+            self.create_ui_step2()
+            self.create_ui_step3()
+            self.create_ui_step4()
+            self.create_ui_step5()
+            self.mark_startup("ui_built")
+            if self.paint_snapshot():
+                # 先显示快照骨架，窗口可交互后再解码账户文件
+                self.mark_startup("snapshot_painted")
+            else:
+                self.preload_accounts()
+        except Exception as e:
+            # 无论如何都要显示窗口，否则进程在后台运行却没有窗口和托盘
+            print(f"❌ 界面构建失败: {e}")
+
+        # 窗口映射后的第一个空闲回调即视为可交互
+        self.root.bind("<Map>", self.on_first_map, add="+")
+        self.root.bind("<Map>", self.on_root_map, add="+")
+        self.root.bind("<Unmap>", self.on_root_unmap, add="+")
+        self.root.attributes("-alpha", 1.0)
+        self.root.deiconify()
+
+    def on_first_map(self, event):
+        """窗口首次显示"""
+        if event.widget is not self.root or self.render_complete:
+            return
+        self.render_complete = True
+        self.mark_startup("first_map")
+        self.root.after_idle(self.on_interactive)
+
+    def on_interactive(self):
+        """启动完成：报告耗时并启动后台功能"""
+        self.mark_startup("interactive")
+        if self.snapshot_accounts is not None:
+            try:
+                self.scrollable_frame._parent_canvas.yview_moveto(self.snapshot_scroll)
+                self.preload_accounts()
+            except Exception as e:
+                print(f"❌ 加载账户失败: {e}")
+        report = "，".join(f"{stage} {ms:.0f}ms" for stage, ms in self.startup_metrics.items())
+        print(f"⏱ 启动耗时：{report}")
+        self.start_tray()  # 启动托盘
+        self.start_timer()  # 启动验证码定时器
+        # 提示迁移模块状态
+        if not MIGRATION_AVAILABLE:
+            self.show_migration_setup_guide()
 
     def create_ui_step1(self):
         """UI步骤1：顶部标题栏"""
         self.header = ctk.CTkFrame(self.root, height=50, fg_color="#1e1e1e")
         self.header.pack(fill="x", side="top")
         self.header.pack_propagate(False)
-        self.render_step += 1
-        self.root.after(10, self.create_ui_step2)
 
     def create_ui_step2(self):
         """UI步骤2：标题与账户计数"""
@@ -313,8 +484,6 @@ class GoogleAuthenticator:
             text_color=TEXT_MEDIUM_GRAY
         )
         self.account_count.pack(side="right", padx=20, pady=15)
-        self.render_step += 1
-        self.root.after(10, self.create_ui_step3)
 
     def create_ui_step3(self):
         """UI步骤3：主内容区容器"""
@@ -322,20 +491,10 @@ class GoogleAuthenticator:
         self.content.pack(fill="x", side="top")
         self.content.pack_propagate(False)
         self.pages = {}  # 页面容器
-        self.render_step += 1
-        self.root.after(10, self.create_ui_step4)
 
     def create_ui_step4(self):
-        """UI步骤4：所有页面内容"""
-        self.create_account_page()
-        self.create_scan_page()
-        self.create_manual_page()
-        self.create_migrate_scan_page()
-        self.create_migration_help_page()
-        self.create_edit_page()
+        """UI步骤4：默认页面（其余页面首次切换时再构建）"""
         self.show_page("account")  # 默认显示账户页
-        self.render_step += 1
-        self.root.after(10, self.create_ui_step5)
 
     def create_ui_step5(self):
         """UI步骤5：底部导航栏"""
@@ -368,10 +527,6 @@ class GoogleAuthenticator:
                 width=76
             ).pack(side="left", fill="both", expand=True)
 
-        self.render_step += 1
-        self.preload_accounts()  # 预加载账户
-        self.root.after(50, self.check_render_complete)
-
     def _get_font(self, size=14, weight="normal"):
         """获取字体，直接使用得意黑，如果不可用则使用默认字体"""
         try:
@@ -389,52 +544,96 @@ class GoogleAuthenticator:
             print(f"❌ 字体获取失败: {e}，使用默认字体")
             return ctk.CTkFont(size=size, weight=weight)
 
-    def check_render_complete(self):
-        """检查渲染完成，淡入窗口"""
-        self.root.update_idletasks()
-        if self.render_step >= self.total_render_steps and hasattr(self, 'accounts'):
-            self.render_complete = True
-            self.root.after(10, self.fade_in_window)
-            self.start_tray()  # 启动托盘
-            self.start_timer()  # 启动验证码定时器
-        else:
-            self.root.after(20, self.check_render_complete)
-
-    def fade_in_window(self, alpha=0.0):
-        """窗口淡入效果"""
-        alpha += 0.1
-        self.root.attributes("-alpha", alpha)
-        if alpha < 1.0:
-            self.root.after(10, self.fade_in_window, alpha)
-        else:
-            self.root.deiconify()
-            self.root.attributes("-alpha", 1.0)
-            # 提示迁移模块状态
-            if not MIGRATION_AVAILABLE:
-                self.show_migration_setup_guide()
-
     def preload_accounts(self):
-        """预加载账户数据"""
+        """启动时读取账户（核心服务在后台读取，界面不等待），完成后填充快照骨架或创建卡片"""
+        # 经核心服务读取：记住账户文件版本，保存时据此检测其他进程的改写
+        self.run_in_core(self.core.load_accounts(), self.on_accounts_preloaded)
+
+    def on_accounts_preloaded(self, records, error):
+        early = self.accounts  # 读取完成前已添加的账户（窗口刚显示时，极少出现）
+        self.accounts_loaded = True
         try:
-            if os.path.exists(self.save_file):
-                with open(self.save_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self.accounts = []
-                for item in data:
-                    if not any(a["secret"] == item["secret"] for a in self.accounts):
-                        self.accounts.append({
-                            "id": hash(item["secret"]),
-                            "issuer": item["issuer"],
-                            "name": item["name"],
-                            "secret": item["secret"],
-                            "totp": pyotp.TOTP(item["secret"]),
-                            "card_elements": None
-                        })
-            print(f"预加载完成，账户数量: {len(self.accounts)}")
-            self.root.after(10, self.refresh_accounts)
+            if error is not None:
+                raise error
+            self.accounts = [account_from_record(r) for r in records]
+            known = {acc["id"] for acc in self.accounts}
+            self.accounts.extend(acc for acc in early if acc["id"] not in known)
+            self.rebuild_usage_order()
+            self.mark_startup("accounts_loaded")
+            print(f"预加载完成，账户数量: {len(self.accounts)}"
+                  f"（启动后 {self.startup_metrics['accounts_loaded']:.0f}ms）")
         except Exception as e:
             print(f"预加载失败: {str(e)}")
-            self.root.after(10, self.refresh_accounts)
+        if self.snapshot_accounts is not None:
+            self.adopt_snapshot()
+        else:
+            self.refresh_accounts()
+        if self.save_pending:
+            self.save_pending = False
+            self.save_accounts()
+
+    def paint_snapshot(self):
+        """按上次退出时的快照绘制账户列表骨架"""
+        snapshot = load_snapshot(self.snapshot_file, self.save_file)
+        if not snapshot:
+            return False
+        try:
+            if snapshot.get("geometry"):
+                self.root.geometry(snapshot["geometry"])
+            self.snapshot_scroll = float(snapshot.get("scroll") or 0.0)
+            self.snapshot_accounts = {}
+            self.empty_hint.pack_forget()
+            for entry in snapshot["accounts"]:
+                skeleton = {
+                    "id": entry["id"],
+                    "issuer": entry["issuer"],
+                    "name": entry["name"],
+                    "type": entry.get("type", "totp"),
+                    "card_elements": None
+                }
+                self.snapshot_accounts[entry["id"]] = skeleton
+                self.create_account_card(skeleton)
+                self.current_card_ids.add(entry["id"])
+            self.account_count.configure(text=f"{len(self.snapshot_accounts)}个账户")
+            print(f"已按快照绘制 {len(self.snapshot_accounts)} 个账户")
+            return True
+        except Exception as e:
+            print(f"快照绘制失败: {e}")
+            self.snapshot_accounts = None
+            return False
+
+    def adopt_snapshot(self):
+        """用解码后的账户填充快照骨架；顺序不一致时整体重建"""
+        skeletons = self.snapshot_accounts
+        self.snapshot_accounts = None
+        if [acc["id"] for acc in self.display_accounts()] != list(skeletons):
+            self.refresh_accounts()
+            return
+        for i, acc in enumerate(self.accounts):
+            skeleton = skeletons[acc["id"]]
+            skeleton.update({k: v for k, v in acc.items() if k != "card_elements"})
+            self.accounts[i] = skeleton
+        self.rebuild_usage_order()
+        for acc in self.accounts:
+            card_elements = acc.get("card_elements")
+            if card_elements and self.is_widget_valid(card_elements.get("otp_label")):
+                card_elements["otp_label"].configure(text=current_code(acc))
+
+    def save_list_snapshot(self):
+        """退出时保存列表快照"""
+        try:
+            if not self.accounts or self.snapshot_accounts is not None:
+                discard_snapshot(self.snapshot_file)
+                return
+            save_snapshot(
+                self.snapshot_file,
+                self.save_file,
+                self.display_accounts(),
+                geometry=self.root.geometry(),
+                scroll=self.scrollable_frame._parent_canvas.yview()[0]
+            )
+        except Exception as e:
+            print(f"保存列表快照失败: {e}")
 
     def load_deyihei_font(self):
         """加载得意黑字体 - 简化版本"""
@@ -505,10 +704,14 @@ class GoogleAuthenticator:
         self.scrollbar = self.scrollable_frame._scrollbar
         self.scrollbar.grid_remove()
 
-        # 滚轮绑定
-        self.scrollable_frame.bind("<MouseWheel>", self.on_scroll)
-        self.scrollable_frame.bind("<Button-4>", self.on_scroll)
-        self.scrollable_frame.bind("<Button-5>", self.on_scroll)
+        # 滚轮绑定：替换 CTkScrollableFrame 逐事件滚动的全局绑定，改为按帧合并。
+        # 判断事件是否落在列表内的方法在 customtkinter 6.x / 5.2.x 中名字不同，都没有时保留默认绑定
+        self.scroll_target_check = (getattr(self.scrollable_frame, "_check_if_valid_scroll", None)
+                                    or getattr(self.scrollable_frame, "check_if_master_is_canvas", None))
+        if self.scroll_target_check is not None:
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.root.unbind_all(sequence)
+                self.root.bind_all(sequence, self.on_scroll, add="+")
 
         # 账户卡片容器
         self.account_frame = ctk.CTkFrame(self.scrollable_frame, fg_color="transparent")
@@ -525,11 +728,53 @@ class GoogleAuthenticator:
         )
 
     def on_scroll(self, event):
-        """滚轮滚动处理"""
-        if event.delta > 0 or event.num == 4:
-            self.scrollable_frame._parent_canvas.yview_scroll(-1, "units")
+        """滚轮滚动处理：只累计滚动量，每帧最多滚动一次"""
+        if not self.scroll_target_check(event.widget):
+            return
+        if event.num == 4:
+            units = -1
+        elif event.num == 5:
+            units = 1
+        elif sys.platform.startswith("win"):
+            units = -event.delta / 6
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            # X11 上 Tk 8.7/9 的 <MouseWheel> 每格 delta 为 ±120，换算为一格一单位（与 Button-4/5 一致）
+            units = -event.delta / X11_WHEEL_DELTA
+        self.scroll_pending += units
+        if self.scroll_job is None:
+            self.scroll_frame_start = time.perf_counter()
+            self.scroll_job = self.root.after(SCROLL_FRAME_MS, self.flush_scroll)
+
+    def flush_scroll(self):
+        """应用本帧累计的滚动量"""
+        self.scroll_job = None
+        canvas = self.scrollable_frame._parent_canvas
+
+        if self.smooth_scroll:
+            # 惯性滚动：累计量转为速度，逐帧衰减
+            self.scroll_velocity += self.scroll_pending
+            step = self.scroll_velocity if abs(self.scroll_velocity) < 1 else self.scroll_velocity * (1 - SCROLL_FRICTION)
+            self.scroll_velocity -= step
         else:
-            self.scrollable_frame._parent_canvas.yview_scroll(1, "units")
+            step = self.scroll_pending
+        self.scroll_pending = 0.0
+
+        self.scroll_remainder += step
+        units = int(self.scroll_remainder)
+        self.scroll_remainder -= units
+        if units and canvas.yview() != (0.0, 1.0):
+            canvas.yview_scroll(units, "units")
+            canvas.update_idletasks()  # 本帧内完成重绘，统计真实帧耗时
+
+        self.scroll_frame_stats.record((time.perf_counter() - self.scroll_frame_start) * 1000)
+
+        if self.smooth_scroll and abs(self.scroll_velocity) >= 0.05:
+            self.scroll_frame_start = time.perf_counter()
+            self.scroll_job = self.root.after(SCROLL_FRAME_MS, self.flush_scroll)
+        elif self.smooth_scroll:
+            self.scroll_velocity = 0.0
 
     def create_edit_page(self):
         """账户编辑页"""
@@ -614,6 +859,47 @@ class GoogleAuthenticator:
         )
         self.edit_secret.pack(anchor="w", pady=(0, 30))
 
+        # HOTP 计数器重新同步（仅 HOTP 账户显示）
+        self.edit_hotp_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        self.edit_hotp_label = ctk.CTkLabel(
+            self.edit_hotp_frame,
+            text="",
+            font=label_font,
+            text_color=TEXT_MEDIUM_GRAY
+        )
+        self.edit_hotp_label.pack(anchor="w", pady=(0, 5))
+        resync_row = ctk.CTkFrame(self.edit_hotp_frame, fg_color="transparent")
+        resync_row.pack(fill="x")
+        self.edit_resync_entry = ctk.CTkEntry(
+            resync_row,
+            font=entry_font,
+            placeholder_text="输入服务端当前接受的验证码",
+            text_color=TEXT_WHITE,
+            fg_color="#444444",
+            border_color="#555555"
+        )
+        self.edit_resync_entry.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.edit_resync_btn = ctk.CTkButton(
+            resync_row,
+            text="同步计数器",
+            command=self.resync_editing_hotp,
+            font=label_font,
+            fg_color="#1a73e8",
+            width=90
+        )
+        self.edit_resync_btn.pack(side="left")
+
+        # 固定到托盘菜单
+        self.edit_pin_btn = ctk.CTkButton(
+            frame,
+            text="",
+            command=self.toggle_editing_pin,
+            font=label_font,
+            fg_color="#555555",
+            height=35
+        )
+        self.edit_pin_btn.pack(fill="x", padx=20, pady=(0, 10))
+
         # 保存按钮
         btn_font = self._get_font(size=14, weight="bold")
         ctk.CTkButton(
@@ -724,8 +1010,353 @@ class GoogleAuthenticator:
         )
         self.add_scan_btn.pack(side="left", fill="x", expand=True)
 
+        # 批量导入入口
+        link_font = self._get_font(size=12)
+        ctk.CTkButton(
+            frame,
+            text="批量导入（多张图片/文件夹）→",
+            command=lambda: self.show_page("batch_import"),
+            font=link_font,
+            fg_color="transparent",
+            text_color="#87cefa",
+            width=10
+        ).pack(anchor="e", padx=20, pady=(0, 10))
+
         self.scanned_data = None
 
+    def create_batch_import_page(self):
+        """批量扫码导入页"""
+        if self.pages_created["batch_import"]:
+            return
+        frame = ctk.CTkFrame(self.content, fg_color="#2d2d2d")
+        self.pages["batch_import"] = frame
+        self.pages_created["batch_import"] = True
+
+        # 返回按钮
+        back_font = self._get_font(size=12)
+        ctk.CTkButton(
+            frame,
+            text="← 返回扫码添加",
+            command=lambda: self.show_page("scan"),
+            font=back_font,
+            fg_color="transparent",
+            text_color="#87cefa",
+            width=10
+        ).pack(anchor="w", padx=20, pady=10)
+
+        # 标题
+        title_font = self._get_font(size=16, weight="bold")
+        desc_font = self._get_font(size=12)
+        ctk.CTkLabel(
+            frame,
+            text="批量扫码导入",
+            font=title_font,
+            text_color=TEXT_WHITE
+        ).pack(pady=(0, 10), padx=20, anchor="w")
+        ctk.CTkLabel(
+            frame,
+            text="支持标准二维码和迁移二维码，重复账户自动跳过",
+            font=desc_font,
+            text_color=TEXT_MEDIUM_GRAY
+        ).pack(padx=20, anchor="w", pady=(0, 15))
+
+        # 按钮区
+        btn_frame = ctk.CTkFrame(frame, fg_color="transparent")
+        btn_frame.pack(fill="x", padx=20, pady=(0, 15))
+        btn_font = self._get_font(size=14, weight="bold")
+        self.batch_files_btn = ctk.CTkButton(
+            btn_frame,
+            text="选择图片",
+            command=self.batch_import_files,
+            font=btn_font,
+            fg_color="#1a73e8",
+            height=45
+        )
+        self.batch_files_btn.pack(side="left", fill="x", expand=True, padx=(0, 10))
+        self.batch_folder_btn = ctk.CTkButton(
+            btn_frame,
+            text="选择文件夹",
+            command=self.batch_import_folder,
+            font=btn_font,
+            fg_color="#1a73e8",
+            height=45
+        )
+        self.batch_folder_btn.pack(side="left", fill="x", expand=True)
+        self.batch_export_file_btn = ctk.CTkButton(
+            frame,
+            text="从其他验证器的导出文件导入（Aegis / andOTP / 2FAS / 链接列表）",
+            command=self.import_export_file,
+            font=self._get_font(size=12),
+            fg_color="#555555",
+            height=36
+        )
+        self.batch_export_file_btn.pack(fill="x", padx=20, pady=(0, 15))
+
+        # 进度
+        self.batch_progress = ctk.CTkProgressBar(frame, height=6, fg_color="#555555")
+        self.batch_progress.pack(fill="x", padx=20, pady=(0, 5))
+        self.batch_progress.set(0)
+        self.batch_status = ctk.CTkLabel(
+            frame,
+            text="",
+            font=desc_font,
+            wraplength=320,
+            text_color=TEXT_MEDIUM_GRAY
+        )
+        self.batch_status.pack(padx=20, anchor="w", pady=(0, 5))
+
+        # 逐个文件的结果
+        text_font = self._get_font(size=11)
+        self.batch_log = Text(
+            frame,
+            wrap="none",
+            height=14,
+            width=45,
+            bg="#2d2d2d",
+            fg=TEXT_LIGHT_GRAY,
+            font=(text_font.cget("family"), text_font.cget("size"))
+        )
+        self.batch_log.pack(padx=20, pady=5, fill="both", expand=True)
+        self.batch_log.config(state="disabled")
+
+    def batch_import_files(self):
+        """多选图片批量导入"""
+        paths = filedialog.askopenfilenames(
+            title="选择二维码图片（可多选）",
+            filetypes=[("图片文件", ";".join("*" + ext for ext in IMAGE_EXTENSIONS))]
+        )
+        if paths:
+            self.start_batch_import(list(paths))
+
+    def batch_import_folder(self):
+        """选择文件夹批量导入"""
+        folder = filedialog.askdirectory(title="选择包含二维码图片的文件夹")
+        if not folder:
+            return
+        try:
+            paths = collect_image_files(folder)
+        except Exception as e:
+            messagebox.showerror("错误", f"读取文件夹失败：{str(e)}")
+            return
+        if not paths:
+            messagebox.showinfo("提示", "文件夹中没有图片文件")
+            return
+        self.start_batch_import(paths)
+
+    def start_batch_import(self, paths):
+        """在进程池中解码图片，结果逐个回传界面线程"""
+        if self.batch_state is not None:
+            return
+        self.batch_state = {
+            "total": len(paths),
+            "done": 0,
+            "failed": 0,
+            "duplicate": 0,
+            "pending": [],  # 待导入的新账户
+            "seen": set(),  # 本批次已出现的账户ID
+            "start": time.perf_counter()
+        }
+        self.set_batch_buttons("disabled")
+        self.batch_progress.set(0)
+        self.batch_log.config(state="normal")
+        self.batch_log.delete("1.0", "end")
+        self.batch_log.config(state="disabled")
+        self.batch_status.configure(text=f"正在解码 0/{len(paths)}…", text_color=TEXT_MEDIUM_GRAY)
+
+        if self.batch_decoder is None:
+            self.batch_decoder = BatchDecoder(cache=DecodeCache(self.config_dir))
+        self.batch_decoder.start(
+            paths,
+            on_result=lambda result: self.dispatcher.post(self.on_batch_result, result),
+            on_done=lambda: self.dispatcher.post(self.finish_batch_import)
+        )
+
+    def set_batch_buttons(self, state):
+        self.batch_files_btn.configure(state=state)
+        self.batch_folder_btn.configure(state=state)
+        self.batch_export_file_btn.configure(state=state)
+
+    def import_export_file(self):
+        """从其他验证器的导出文件导入：后台逐条解析，分批送回界面线程去重"""
+        if self.batch_state is not None:
+            return
+        extensions = sorted({ext for importer in IMPORTERS.values() for ext in importer["extensions"]})
+        path = filedialog.askopenfilename(
+            title="选择验证器导出文件",
+            filetypes=[("验证器导出文件", ";".join("*" + ext for ext in extensions)), ("所有文件", "*.*")]
+        )
+        if not path:
+            return
+
+        self.batch_state = {
+            "total": 0,
+            "done": 0,
+            "failed": 0,
+            "duplicate": 0,
+            "added": 0,
+            "seen": set(),
+            "start": time.perf_counter()
+        }
+        self.set_batch_buttons("disabled")
+        self.batch_progress.set(0)
+        self.batch_log.config(state="normal")
+        self.batch_log.delete("1.0", "end")
+        self.batch_log.config(state="disabled")
+        self.batch_status.configure(text="正在解析…", text_color=TEXT_MEDIUM_GRAY)
+
+        def on_batch(records, errors):
+            # 在核心服务的线程池中执行：创建账户后整批交给界面线程
+            batch = []
+            for record in records:
+                try:
+                    batch.append(build_account(
+                        record["issuer"], record["name"], record["secret"],
+                        record["type"], record["counter"]
+                    ))
+                except Exception as e:
+                    errors.append(f"{record['issuer']} - {record['name']}：{e}")
+            self.dispatcher.post(self.on_file_import_batch, batch, errors)
+
+        self.run_in_core(
+            self.core.import_file(path, on_batch, IMPORT_BATCH_SIZE),
+            lambda result, error: self.finish_file_import(path, error)
+        )
+
+    def on_file_import_batch(self, batch, errors):
+        """一批已解析的账户：按账户ID去重后加入索引（暂不保存、不重绘）"""
+        state = self.batch_state
+        if state is None:
+            return
+        for account in batch:
+            account_id = account["id"]
+            if account_id in self.account_index or account_id in state["seen"]:
+                state["duplicate"] += 1
+                continue
+            state["seen"].add(account_id)
+            self.register_account(account)
+            state["added"] += 1
+        state["done"] += len(batch) + len(errors)
+        state["failed"] += len(errors)
+        if errors:
+            self.batch_log.config(state="normal")
+            self.batch_log.insert("end", "".join(f"❌ {error}\n" for error in errors))
+            self.batch_log.see("end")
+            self.batch_log.config(state="disabled")
+        self.batch_status.configure(text=f"已解析 {state['done']} 条，新增 {state['added']} 个…")
+
+    def finish_file_import(self, path, error):
+        """导出文件解析结束：一次保存并刷新"""
+        state = self.batch_state
+        self.batch_state = None
+        if state is None:
+            return
+        if state["added"]:
+            self.save_accounts()
+            self.refresh_accounts()
+
+        elapsed = time.perf_counter() - state["start"]
+        rate = state["done"] / elapsed if elapsed else 0.0
+        summary = (f"完成：{os.path.basename(path)} 共{state['done']}条，新增{state['added']}个账户，"
+                   f"重复{state['duplicate']}个，失败{state['failed']}个，"
+                   f"耗时{elapsed:.1f}秒（{rate:.0f}条/秒）")
+        if error is not None:
+            summary += f"\n❌ 解析中断：{error}"
+        print(f"文件导入{summary}")
+        self.batch_progress.set(1)
+        self.batch_status.configure(
+            text=summary,
+            text_color="#ff6b6b" if error is not None else "#4ECDC4" if state["added"] else TEXT_MEDIUM_GRAY
+        )
+        self.set_batch_buttons("normal")
+
+    def accounts_from_payload(self, payload):
+        """把二维码内容解析为账户列表（标准链接或迁移链接）；迁移链接中不支持的账户为 {"error": 原因}"""
+        if extract_migration_uri(payload):
+            if not MIGRATION_AVAILABLE:
+                raise Exception("缺少迁移模块")
+            return [record_from_migration(acc) for acc in parse_migration_uri(payload)]
+        if is_otpauth_uri(payload):
+            record = record_from_uri(payload)
+            if "error" in record:
+                raise Exception(record["error"])
+            return [record]
+        raise Exception("不是有效的验证器二维码")
+
+    def on_batch_result(self, result):
+        """处理单个文件的解码结果"""
+        state = self.batch_state
+        if state is None:
+            return
+        state["done"] += 1
+        file_name = os.path.basename(result["path"])
+
+        added = duplicate = 0
+        errors = [result["error"]] if result["error"] else []
+        for payload in result["payloads"]:
+            try:
+                parsed_accounts = self.accounts_from_payload(payload)
+            except Exception as e:
+                errors.append(str(e))
+                continue
+            for acc in parsed_accounts:
+                if "error" in acc:
+                    errors.append(acc["error"])
+                    continue
+                account_id = stable_account_id(acc["secret"])
+                if account_id in self.account_index or account_id in state["seen"]:
+                    duplicate += 1
+                    continue
+                state["seen"].add(account_id)
+                state["pending"].append(acc)
+                added += 1
+        state["duplicate"] += duplicate
+
+        if added or duplicate:
+            line = f"✅ {file_name}：新增{added}个，重复{duplicate}个（{result['stage']}，{result['ms']:.0f}ms）\n"
+        else:
+            state["failed"] += 1
+            line = f"❌ {file_name}：{'；'.join(errors) or '无有效账户'}\n"
+        self.batch_log.config(state="normal")
+        self.batch_log.insert("end", line)
+        self.batch_log.see("end")
+        self.batch_log.config(state="disabled")
+
+        self.batch_progress.set(state["done"] / state["total"])
+        self.batch_status.configure(text=f"正在解码 {state['done']}/{state['total']}…")
+
+    def finish_batch_import(self):
+        """全部解码完成：一次性导入、保存并刷新"""
+        state = self.batch_state
+        self.batch_state = None
+        if state is None:
+            return
+
+        added = 0
+        for acc in state["pending"]:
+            try:
+                self.register_account(build_account(
+                    acc["issuer"], acc["name"], acc["secret"],
+                    acc.get("type", "totp"), acc.get("counter", 0)
+                ))
+                added += 1
+            except Exception as e:
+                print(f"导入账户 {acc['name']} 失败: {e}")
+                state["failed"] += 1
+
+        if added:
+            self.save_accounts()
+            self.refresh_accounts()
+
+        elapsed = time.perf_counter() - state["start"]
+        cache = self.batch_decoder.cache
+        summary = (f"完成：{state['total']}个文件，新增{added}个账户，"
+                   f"重复{state['duplicate']}个，失败{state['failed']}个，耗时{elapsed:.1f}秒\n"
+                   f"解码缓存：命中{cache.hits}个，未命中{cache.misses}个")
+        print(f"批量导入{summary}")
+        self.batch_progress.set(1)
+        self.batch_status.configure(text=summary, text_color="#4ECDC4" if added else TEXT_MEDIUM_GRAY)
+        self.set_batch_buttons("normal")
+
     def create_manual_page(self):
         """手动添加页"""
         if self.pages_created["manual"]:
@@ -900,6 +1531,17 @@ class GoogleAuthenticator:
         )
         self.migrate_scan_import_btn.pack(side="left", fill="x", expand=True)
 
+        self.migrate_export_btn = ctk.CTkButton(
+            frame,
+            text="导出为迁移二维码",
+            command=self.export_migration_qr,
+            font=btn_font,
+            fg_color="#555555",
+            height=40,
+            state="normal" if MIGRATION_AVAILABLE and QR_EXPORT_AVAILABLE else "disabled"
+        )
+        self.migrate_export_btn.pack(fill="x", padx=20, pady=(0, 20))
+
     def create_migration_help_page(self):
         """帮助与配置页"""
         if self.pages_created["migration_help"]:
@@ -999,9 +1641,115 @@ class GoogleAuthenticator:
             height=35
         ).pack(side="left", fill="x", expand=True)
 
+        # 账户排序方式
+        self.sort_mode_btn = ctk.CTkButton(
+            frame,
+            text=self.sort_mode_text(),
+            command=self.toggle_sort_mode,
+            font=btn_font,
+            fg_color="#555555",
+            height=35
+        )
+        self.sort_mode_btn.pack(fill="x", padx=20, pady=(10, 5))
+
+        # 本地接口开关
+        self.api_btn = ctk.CTkButton(
+            frame,
+            text=self.local_api_text(),
+            command=self.toggle_local_api,
+            font=btn_font,
+            fg_color="#555555",
+            height=35
+        )
+        self.api_btn.pack(fill="x", padx=20, pady=5)
+
+        # 共享内存验证码表开关
+        self.code_table_btn = ctk.CTkButton(
+            frame,
+            text=self.code_table_text(),
+            command=self.toggle_code_table,
+            font=btn_font,
+            fg_color="#555555",
+            height=35
+        )
+        self.code_table_btn.pack(fill="x", padx=20, pady=5)
+
+        # 导出账户
+        self.export_accounts_btn = ctk.CTkButton(
+            frame,
+            text="导出账户（JSON / CSV / 链接列表）",
+            command=self.export_accounts_to_file,
+            font=btn_font,
+            fg_color="#555555",
+            height=35
+        )
+        self.export_accounts_btn.pack(fill="x", padx=20, pady=5)
+        self.export_status = ctk.CTkLabel(
+            frame,
+            text="",
+            font=self._get_font(size=11),
+            wraplength=320,
+            text_color=TEXT_MEDIUM_GRAY
+        )
+        self.export_status.pack(padx=20, anchor="w")
+
+    def export_accounts_to_file(self):
+        """导出账户到文件；可选加密，后台线程逐条写出"""
+        if not self.accounts:
+            messagebox.showwarning("提示", "没有可导出的账户")
+            return
+        path = filedialog.asksaveasfilename(
+            title="导出账户",
+            defaultextension=".json",
+            filetypes=[(f"{e['label']}", "*" + e["extension"]) for e in EXPORTERS.values()]
+        )
+        if not path:
+            return
+
+        password = None
+        if ENCRYPTION_AVAILABLE and messagebox.askyesno("导出账户", "导出文件包含全部密钥，是否加密？"):
+            password = simpledialog.askstring("加密导出", "设置导出密码：", show="*", parent=self.root)
+            if not password:
+                return
+            if password != simpledialog.askstring("加密导出", "再次输入密码：", show="*", parent=self.root):
+                messagebox.showerror("错误", "两次输入的密码不一致")
+                return
+            path += ENCRYPTED_SUFFIX
+
+        # 只复制账户引用列表，记录在后台线程中逐条生成
+        accounts = list(self.accounts)
+        total = len(accounts)
+        self.export_accounts_btn.configure(state="disabled")
+        self.export_status.configure(text=f"正在导出 0/{total}…", text_color=TEXT_MEDIUM_GRAY)
+        self.run_in_core(
+            self.core.export(
+                (account_record(acc) for acc in accounts), path, None, password,
+                on_progress=lambda count: self.dispatcher.post(
+                    lambda: self.export_status.configure(text=f"正在导出 {count}/{total}…")
+                )
+            ),
+            lambda result, error: self.finish_export_accounts(path, *(result or (0, 0.0)), error)
+        )
+
+    def finish_export_accounts(self, path, count, seconds, error):
+        self.export_accounts_btn.configure(state="normal")
+        if error is not None:
+            self.export_status.configure(text=f"❌ 导出失败：{error}", text_color="#ff6b6b")
+            return
+        print(f"导出{count}个账户到 {path}，耗时 {seconds:.2f}秒")
+        self.export_status.configure(text=f"✅ 已导出 {count} 个账户到 {path}", text_color="#4ECDC4")
+
+    def ensure_page(self, page_name):
+        """页面首次使用时构建"""
+        if not self.pages_created[page_name]:
+            start = time.perf_counter()
+            self.page_builders[page_name]()
+            print(f"页面 {page_name} 构建耗时: {(time.perf_counter() - start) * 1000:.1f}ms")
+
     def show_page(self, page_name):
         """切换页面"""
-        if hasattr(self, 'pages') and page_name in self.pages:
+        if hasattr(self, 'pages') and page_name in self.page_builders:
+            self.ensure_page(page_name)
             for page in self.pages.values():
                 page.pack_forget()
             self.pages[page_name].pack(fill="both", expand=True)
@@ -1029,12 +1777,130 @@ class GoogleAuthenticator:
         else:
             self.empty_hint.pack_forget()
 
-        # 创建账户卡片
-        for account in self.accounts:
+        # 创建账户卡片（单个卡片出错不影响其他卡片）
+        for account in self.display_accounts():
             if account["id"] not in self.current_card_ids:
-                self.create_account_card(account)
+                try:
+                    self.create_account_card(account)
+                except Exception as e:
+                    print(f"❌ 账户卡片创建失败（{account['issuer']} - {account['name']}）: {e}")
                 self.current_card_ids.add(account["id"])
 
+    def display_accounts(self):
+        """按当前排序方式返回账户列表"""
+        if self.sort_mode == "frecency":
+            return [self.account_index[account_id] for account_id in self.usage_order.ids()]
+        return self.accounts
+
+    def rebuild_usage_order(self):
+        """重建账户索引与使用频率排序"""
+        self.account_index = {acc["id"]: acc for acc in self.accounts}
+        self.usage_store.prune(self.account_index)
+        self.usage_order = RankedOrder(self.usage_store, [acc["id"] for acc in self.accounts])
+        self.code_table_window = None
+
+    def register_account(self, account):
+        """添加账户并同步索引"""
+        self.accounts.append(account)
+        self.account_index[account["id"]] = account
+        self.usage_order.add(account["id"])
+        self.code_table_window = None
+
+    def unregister_account(self, account):
+        """移除账户并同步索引"""
+        self.accounts.remove(account)
+        self.account_index.pop(account["id"], None)
+        self.usage_order.remove(account["id"])
+        code_cache.forget(account["id"])
+        self.code_table_window = None
+
+    def record_account_usage(self, account):
+        """记录复制事件；按使用频率排序时只移动该账户的卡片"""
+        old_pos, new_pos = self.usage_order.touch(account["id"])
+        if self.sort_mode != "frecency" or old_pos == new_pos:
+            return
+        card_elements = account.get("card_elements")
+        if not card_elements or not self.is_widget_valid(card_elements.get("card")):
+            return
+        ordered_ids = self.usage_order.ids()
+        if new_pos + 1 < len(ordered_ids):
+            neighbour = self.account_index[ordered_ids[new_pos + 1]].get("card_elements")
+            if neighbour and self.is_widget_valid(neighbour.get("card")):
+                card_elements["card"].pack_configure(before=neighbour["card"])
+        elif new_pos > 0:
+            neighbour = self.account_index[ordered_ids[new_pos - 1]].get("card_elements")
+            if neighbour and self.is_widget_valid(neighbour.get("card")):
+                card_elements["card"].pack_configure(after=neighbour["card"])
+
+    def toggle_sort_mode(self):
+        """切换排序方式（添加顺序/使用频率）"""
+        self.sort_mode = "insertion" if self.sort_mode == "frecency" else "frecency"
+        self.save_settings()
+        self.sort_mode_btn.configure(text=self.sort_mode_text())
+        self.refresh_accounts()
+
+    def sort_mode_text(self):
+        return "排序：使用频率" if self.sort_mode == "frecency" else "排序：添加顺序"
+
+    # 本地 JSON-RPC 接口
+    def start_local_api(self):
+        """按配置启动本地接口；失败时只打印日志"""
+        try:
+            self.api_server = LocalApiServer(
+                self.api_address, load_api_token(self.config_dir),
+                accounts=lambda: self.account_index,
+                code_of=valid_code,
+                remaining=code_cache.remaining
+            ).start()
+            print(f"🔌 本地接口已启动: {self.api_server.bound_address()}")
+            return True
+        except (OSError, ValueError) as e:
+            print(f"❌ 本地接口启动失败: {e}")
+            self.api_server = None
+            return False
+
+    def stop_local_api(self):
+        if self.api_server is not None:
+            self.api_server.stop()
+            self.api_server = None
+
+    def toggle_local_api(self):
+        """开启/关闭本地接口"""
+        if self.api_server is not None:
+            self.stop_local_api()
+            self.api_enabled = False
+        elif self.start_local_api():
+            self.api_enabled = True
+            messagebox.showinfo(
+                "本地接口",
+                f"已在 {self.api_server.bound_address()} 开启 JSON-RPC 接口\n"
+                f"请求需携带令牌（Authorization: Bearer），令牌文件：\n"
+                f"{os.path.join(self.config_dir, '.auth_api_token')}"
+            )
+        else:
+            messagebox.showerror("错误", f"本地接口启动失败：{self.api_address}")
+            return
+        self.save_settings()
+        self.api_btn.configure(text=self.local_api_text())
+
+    def local_api_text(self):
+        return "本地接口：已开启" if self.api_enabled else "本地接口：已关闭"
+
+    def toggle_code_table(self):
+        """开启/关闭共享内存验证码表"""
+        if self.code_table is not None:
+            self.code_table.close()
+            self.code_table = None
+        else:
+            self.code_table = CodeTablePublisher()
+            self.code_table_window = None  # 下一次定时器触发时写入
+        self.code_table_enabled = self.code_table is not None
+        self.save_settings()
+        self.code_table_btn.configure(text=self.code_table_text())
+
+    def code_table_text(self):
+        return "共享内存验证码表：已开启" if self.code_table_enabled else "共享内存验证码表：已关闭"
+
     def create_account_card(self, account):
         """创建单个账户卡片"""
         card = ctk.CTkFrame(
@@ -1115,33 +1981,49 @@ class GoogleAuthenticator:
 
         # 验证码
         otp_font = self._get_font(size=20, weight="bold")
+        otp_text = current_code(account) if account.get("secret") else "------"
         otp_label = ctk.CTkLabel(
             right_frame,
-            text=account["totp"].now(),
-            font=otp_font,
-            text_color="#1a73e8",
+            text=otp_text,
+            font=otp_font if otp_text != INVALID_CODE else self._get_font(size=12),
+            text_color="#1a73e8" if otp_text != INVALID_CODE else "#ff6b6b",
             width=80
         )
         otp_label.grid(row=1, column=0, sticky="e", pady=(5, 0))
         otp_label.bind("<Button-1>", lambda e: on_card_click())
         otp_label.configure(cursor="hand2")
 
-        # 倒计时进度条
-        progress = ctk.CTkProgressBar(
-            right_frame,
-            width=80,
-            height=4,
-            fg_color="#555555"
-        )
-        progress.grid(row=2, column=0, sticky="e", pady=3)
-        progress.set(0.5)
-        progress.bind("<Button-1>", lambda e: on_card_click())
-        progress.configure(cursor="hand2")
+        if account.get("type") == "hotp":
+            # HOTP：生成下一个验证码按钮（替代倒计时进度条）
+            progress = ctk.CTkButton(
+                right_frame,
+                text="⟳ 下一个",
+                width=80,
+                height=16,
+                font=edit_font,
+                fg_color="transparent",
+                text_color=TEXT_LIGHT_GRAY,
+                hover_color="#444444",
+                command=lambda: self.advance_hotp(account)
+            )
+            progress.grid(row=2, column=0, sticky="e")
+        else:
+            # 倒计时进度条
+            progress = ctk.CTkProgressBar(
+                right_frame,
+                width=80,
+                height=4,
+                fg_color="#555555"
+            )
+            progress.grid(row=2, column=0, sticky="e", pady=3)
+            progress.set(0.5)
+            progress.bind("<Button-1>", lambda e: on_card_click())
+            progress.configure(cursor="hand2")
 
-        # 存储卡片元素（用于定时器更新）
+        # 存储卡片元素（用于定时器更新，HOTP 无进度条）
         account["card_elements"] = {
             "otp_label": otp_label,
-            "progress": progress,
+            "progress": progress if account.get("type") != "hotp" else None,
             "card": card
         }
 
@@ -1162,7 +2044,10 @@ class GoogleAuthenticator:
 
     def enter_edit_page(self, account):
         """进入编辑页并加载数据"""
+        if not account.get("secret"):
+            return  # 快照骨架，账户尚未加载
         self.current_editing_account = account
+        self.ensure_page("edit")
         # 填充表单
         self.edit_issuer_entry.delete(0, "end")
         self.edit_issuer_entry.insert(0, account["issuer"])
@@ -1171,9 +2056,63 @@ class GoogleAuthenticator:
         # 隐藏密钥中间部分
         hidden_secret = account["secret"][:4] + "****" + account["secret"][-4:]
         self.edit_secret.configure(text=hidden_secret)
+        # HOTP 重新同步
+        if account.get("type") == "hotp":
+            self.edit_hotp_label.configure(text=f"HOTP 计数器：{account['counter']}")
+            self.edit_resync_entry.delete(0, "end")
+            self.edit_hotp_frame.pack(fill="x", padx=20, pady=(0, 10), after=self.edit_info_frame)
+        else:
+            self.edit_hotp_frame.pack_forget()
+        self.edit_pin_btn.configure(text=self.pin_text(account))
         # 切换页面
         self.show_page("edit")
 
+    def toggle_editing_pin(self):
+        """固定/取消固定到托盘快捷复制菜单"""
+        account = self.current_editing_account
+        if not account:
+            return
+        if account["id"] in self.tray_pinned:
+            self.tray_pinned.remove(account["id"])
+        else:
+            self.tray_pinned.append(account["id"])
+        self.save_settings()
+        self.edit_pin_btn.configure(text=self.pin_text(account))
+
+    def pin_text(self, account):
+        return "已固定到托盘菜单（点击取消）" if account["id"] in self.tray_pinned else "固定到托盘菜单"
+
+    def resync_editing_hotp(self):
+        """在前向窗口内查找用户输入的验证码，找到后把计数器移到其后一位"""
+        account = self.current_editing_account
+        if not account or account.get("type") != "hotp" or account.get("error"):
+            return
+        code = self.edit_resync_entry.get().strip()
+        if not code.isdigit():
+            messagebox.showwarning("提示", "请输入数字验证码")
+            return
+        self.edit_resync_btn.configure(state="disabled")
+        start = time.perf_counter()
+        self.run_in_core(
+            self.core.resync_hotp(account["key"], code, account["counter"], self.hotp_resync_window),
+            lambda match, error: self.on_hotp_resync(account, match, error, (time.perf_counter() - start) * 1000)
+        )
+
+    def on_hotp_resync(self, account, match, error, elapsed):
+        """重新同步完成"""
+        self.edit_resync_btn.configure(state="normal")
+        if error is not None:
+            messagebox.showerror("错误", f"同步失败: {str(error)}")
+            return
+        print(f"HOTP重新同步：窗口{self.hotp_resync_window}，耗时{elapsed:.1f}ms，结果{match}")
+        if match is None:
+            messagebox.showwarning("同步失败", f"在后续 {self.hotp_resync_window} 个计数器内未找到该验证码")
+            return
+        self.set_hotp_counter(account, match + 1)
+        if account is self.current_editing_account:
+            self.edit_hotp_label.configure(text=f"HOTP 计数器：{account['counter']}")
+        messagebox.showinfo("同步成功", f"计数器已同步到 {account['counter']}")
+
     def confirm_delete(self):
         """确认删除账户"""
         if not self.current_editing_account:
@@ -1183,28 +2122,58 @@ class GoogleAuthenticator:
                 f"确定删除 {self.current_editing_account['issuer']} - {self.current_editing_account['name']}？\n此操作不可恢复"
         ):
             self.current_editing_account["card_elements"] = None
-            self.accounts.remove(self.current_editing_account)
+            self.unregister_account(self.current_editing_account)
             self.save_accounts()
             self.refresh_accounts()
             self.show_page("account")
 
     def copy_otp(self, account):
         """复制验证码"""
-        current_time = time.time()
-        if current_time - self.last_copy_time < 0.5:
+        if not account.get("secret"):
+            return  # 快照骨架，账户尚未加载
+        if account.get("error"):
+            self.show_copy_hint(f"密钥无效，无法复制：{account['error']}")
             return
-        self.last_copy_time = current_time
+        start = time.perf_counter()
+        # 同一账户0.5秒内重复点击视为一次，不同账户互不影响
+        if start - self.last_copy_times.get(account["id"], 0) < 0.5:
+            return
+        self.last_copy_times[account["id"]] = start
 
         try:
-            otp = account["totp"].now()
+            otp = current_code(account)
+            # 直接写入剪贴板，无需 update() 强制刷新整个事件循环
             self.root.clipboard_clear()
             self.root.clipboard_append(otp)
-            self.root.update()
+            self.clipboard_content = otp
+            self.schedule_clipboard_clear()
             self.show_copy_hint(f"已复制: {otp}")
+            self.copy_latency_stats.record((time.perf_counter() - start) * 1000)
+            self.record_account_usage(account)
         except Exception as e:
             print(f"复制失败: {e}")
             self.show_copy_hint("复制失败")
 
+    def schedule_clipboard_clear(self):
+        """按配置的超时自动清空剪贴板"""
+        if self.clipboard_clear_timer:
+            self.root.after_cancel(self.clipboard_clear_timer)
+            self.clipboard_clear_timer = None
+        if self.clipboard_clear_seconds > 0:
+            self.clipboard_clear_timer = self.root.after(
+                int(self.clipboard_clear_seconds * 1000), self.clear_clipboard_if_ours
+            )
+
+    def clear_clipboard_if_ours(self):
+        """仅当剪贴板内容仍是本程序复制的验证码时才清空"""
+        self.clipboard_clear_timer = None
+        try:
+            if self.clipboard_content and self.root.clipboard_get() == self.clipboard_content:
+                self.root.clipboard_clear()
+        except Exception:
+            pass  # 剪贴板为空或已被其他程序占用
+        self.clipboard_content = None
+
     def show_copy_hint(self, text):
         """显示复制提示"""
         if self.copy_hint_timer:
@@ -1245,47 +2214,43 @@ class GoogleAuthenticator:
         if not file_path:
             return
 
+        self.add_scan_btn.configure(state="disabled")
+        self.scan_result.configure(text="识别中…", text_color=TEXT_MEDIUM_GRAY)
+        self.run_scan_in_background(file_path, self.on_standard_scan)
+
+    def run_scan_in_background(self, file_path, callback):
+        """由核心服务读取并解码图片，完成后回到界面线程调用 callback(result)"""
+        self.run_in_core(
+            self.core.scan_image(file_path),
+            lambda result, error: callback(result if error is None else {"error": str(error)})
+        )
+
+    def on_standard_scan(self, result):
+        """普通二维码解码完成"""
         try:
-            # 处理图片
-            image = Image.open(file_path).resize((280, 280), Image.Resampling.LANCZOS)
-            ctk_img = ctk.CTkImage(image, size=(280, 280))
+            if result.get("error"):
+                raise Exception(result["error"])
+
+            # 预览（缩略图已在后台线程生成）
+            ctk_img = ctk.CTkImage(result["preview"], size=PREVIEW_SIZE)
             self.scan_preview.configure(image=ctk_img, text="")
 
-            # 解析二维码
-            decoded_objects = pyzbar.decode(image)
-            if not decoded_objects:
+            # 解析二维码（原始分辨率分阶段解码）
+            decoded = result
+            print(f"二维码解码阶段: {decoded['stage']}，总耗时 {decoded['ms']:.0f}ms（{format_timings(decoded)}）")
+            if not decoded["payloads"]:
                 raise Exception("未识别到二维码，请确保图片清晰")
 
-            # 提取TOTP链接
-            qr_data = None
-            for obj in decoded_objects:
-                data = obj.data.decode().strip().lower()
-                if data.startswith("otpauth://totp/"):
-                    qr_data = data
-                    break
+            # 提取 otpauth 链接
+            qr_data = next((data for data in decoded["payloads"] if is_otpauth_uri(data)), None)
             if not qr_data:
                 raise Exception("未找到有效的Google Authenticator链接")
 
             # 解析链接参数
-            parsed = urllib.parse.urlparse(qr_data)
-            params = urllib.parse.parse_qs(parsed.query)
-            if "secret" not in params:
-                raise Exception("链接中缺少secret参数")
-
-            # 提取平台和账户名
-            path = parsed.path[1:].split(":")
-            if len(path) >= 2:
-                issuer = path[0]
-                name = ":".join(path[1:])
-            else:
-                issuer = params.get("issuer", ["未知平台"])[0]
-                name = path[0] if path else "未知账户"
-
-            self.scanned_data = {
-                "issuer": issuer.strip(),
-                "name": name.strip(),
-                "secret": params["secret"][0].strip()
-            }
+            record = record_from_uri(qr_data)
+            if "error" in record:
+                raise Exception(record["error"])
+            self.scanned_data = record
 
             # 更新UI
             self.add_scan_btn.configure(state="normal")
@@ -1307,20 +2272,19 @@ class GoogleAuthenticator:
             return
         try:
             # 检查重复
-            if any(a["secret"] == self.scanned_data["secret"] for a in self.accounts):
+            if stable_account_id(self.scanned_data["secret"]) in self.account_index:
                 messagebox.showinfo("提示", "该账户已存在")
                 return
 
             # 添加账户
-            new_account = {
-                "id": hash(self.scanned_data["secret"]),
-                "issuer": self.scanned_data["issuer"],
-                "name": self.scanned_data["name"],
-                "secret": self.scanned_data["secret"],
-                "totp": pyotp.TOTP(self.scanned_data["secret"]),
-                "card_elements": None
-            }
-            self.accounts.append(new_account)
+            new_account = build_account(
+                self.scanned_data["issuer"],
+                self.scanned_data["name"],
+                self.scanned_data["secret"],
+                self.scanned_data["type"],
+                self.scanned_data["counter"]
+            )
+            self.register_account(new_account)
             print(f"添加新账户: {new_account['name']}, 总数量: {len(self.accounts)}")
 
             # 保存刷新
@@ -1338,117 +2302,187 @@ class GoogleAuthenticator:
             messagebox.showerror("错误", "缺少迁移模块，请安装google_auth_migration_pb2.py")
             return
 
-        file_path = filedialog.askopenfilename(
-            title="选择迁移二维码",
+        file_paths = filedialog.askopenfilenames(
+            title="选择迁移二维码（一次导出有多个二维码时可多选）",
             filetypes=[("图片文件", "*.png;*.jpg;*.jpeg")]
         )
-        if not file_path:
+        if not file_paths:
             return
 
+        self.migrate_scan_import_btn.configure(state="disabled")
+        self.migrate_scan_result.configure(text="解析中…", text_color=TEXT_MEDIUM_GRAY)
+
+        self.run_in_core(self.core.scan_images(file_paths), self.on_migration_images)
+
+    def on_migration_images(self, scanned_list, error):
+        """收集每张图片中的全部二维码（保持选择顺序）"""
+        result = {"payloads": [], "errors": [], "preview": None, "ms": 0.0}
+        if error is not None:
+            result["errors"].append(str(error))
+        for path, scanned in scanned_list or ():
+            if isinstance(scanned, Exception):
+                result["errors"].append(f"{os.path.basename(path)}：{scanned}")
+                continue
+            print(f"迁移二维码解码阶段: {scanned['stage']}，总耗时 {scanned['ms']:.0f}ms（{format_timings(scanned)}）")
+            result["preview"] = scanned["preview"]
+            result["ms"] += scanned["ms"]
+            if scanned["payloads"]:
+                result["payloads"].extend(scanned["payloads"])
+            else:
+                result["errors"].append(f"{os.path.basename(path)}：未识别到二维码")
+        self.on_migration_scan(result)
+
+    def on_migration_scan(self, result):
+        """迁移二维码解码完成"""
         try:
-            # 处理图片
-            image = Image.open(file_path).convert("L").resize((300, 300), Image.Resampling.LANCZOS)
-            preview = Image.open(file_path).resize((280, 280), Image.Resampling.LANCZOS)
-            ctk_img = ctk.CTkImage(preview, size=(280, 280))
-            self.migrate_scan_preview.configure(image=ctk_img, text="")
-
-            # 解析二维码
-            decoded = pyzbar.decode(image)
-            if not decoded:
-                raise Exception("未识别到二维码")
-
-            # 提取迁移链接
-            qr_data = decoded[0].data.decode().strip()
-            if not qr_data.startswith("otpauth-migration://"):
-                match = re.search(r"otpauth-migration://[^\s]+", qr_data)
-                if match:
-                    qr_data = match.group(0)
-                else:
-                    raise Exception("不是有效的迁移二维码")
-
-            # 解析迁移参数
-            parsed = urllib.parse.urlparse(qr_data)
-            params = urllib.parse.parse_qs(parsed.query)
-            if "data" not in params:
-                raise Exception("迁移链接中缺少data参数")
-
-            # 解码data参数
-            data_str = params["data"][0]
-            data_str = urllib.parse.unquote(data_str).replace('-', '+').replace('_', '/')
-            padding = 4 - (len(data_str) % 4)
-            if padding < 4:
-                data_str += '=' * padding
-            decoded_data = base64.b64decode(data_str)
-
-            # 解析protobuf数据
-            payload = migration_pb.MigrationPayload()
-            payload.ParseFromString(decoded_data)
-            if not payload.otp_parameters:
-                raise Exception("未找到账户数据")
-
-            # 提取TOTP账户
-            self.migrate_accounts = []
-            for param in payload.otp_parameters:
-                if param.type != migration_pb.OtpParameters.TOTP:
-                    continue
-                secret = base64.b32encode(param.secret).decode().strip()
-                self.migrate_accounts.append({
-                    "id": hash(secret),
-                    "issuer": param.issuer or "未知平台",
-                    "name": param.name or "未知账户",
-                    "secret": secret
-                })
+            # 预览（缩略图已在后台线程生成）
+            if result["preview"] is not None:
+                ctk_img = ctk.CTkImage(result["preview"], size=PREVIEW_SIZE)
+                self.migrate_scan_preview.configure(image=ctk_img, text="")
+
+            payloads = [p for p in result["payloads"] if extract_migration_uri(p)]
+            if not payloads:
+                raise Exception("；".join(result["errors"]) or "不是有效的迁移二维码")
+
+            # 按批次组装：多次选择的图片累积到同一次导出中
+            errors = list(result["errors"])
+            for qr_data in payloads:
+                if self.migration_assembler is None:
+                    self.migration_assembler = MigrationAssembler()
+                try:
+                    try:
+                        self.migration_assembler.add(qr_data)
+                    except MigrationMismatchError:
+                        # 换了一次导出，新二维码有效时重新开始组装
+                        assembler = MigrationAssembler()
+                        assembler.add(qr_data)
+                        self.migration_assembler = assembler
+                except ValueError as e:
+                    errors.append(str(e))
 
             # 更新UI
+            assembler = self.migration_assembler
+            if assembler is None or not assembler.batches:
+                raise Exception("；".join(errors) or "未找到账户数据")
+            received = "、".join(str(i + 1) for i in assembler.received())
+            text = (f"✅ 已接收第 {received} 批（共 {assembler.total_batches} 批），"
+                    f"解析到 {assembler.account_count()} 个账户")
+            missing = assembler.missing()
+            if missing:
+                text += f"\n⚠️ 缺少第 {'、'.join(str(i + 1) for i in missing)} 批，可继续选择图片补充"
+            if errors:
+                text += f"\n❌ {'；'.join(errors)}"
             self.migrate_scan_import_btn.configure(state="normal")
             self.migrate_scan_result.configure(
-                text=f"✅ 成功解析到 {len(self.migrate_accounts)} 个账户",
-                text_color="#4ECDC4"
+                text=text,
+                text_color="#4ECDC4" if not missing else "#f0ad4e"
             )
 
         except Exception as e:
             error_msg = f"❌ 解析失败：{str(e)}"
+            assembler = self.migration_assembler
+            if assembler is not None and assembler.batches:
+                # 之前已组装的批次仍然有效，可以继续导入
+                error_msg += f"\n已解析的 {assembler.account_count()} 个账户仍可导入"
+                self.migrate_scan_import_btn.configure(state="normal")
+            else:
+                self.migrate_scan_import_btn.configure(state="disabled")
             self.migrate_scan_result.configure(
                 text=error_msg,
                 text_color="#ff6b6b"
             )
-            self.migrate_scan_import_btn.configure(state="disabled")
+
+    def export_migration_qr(self):
+        """把当前全部账户导出为迁移二维码图片（可用手机 Google Authenticator 扫描导入）"""
+        if not self.accounts:
+            messagebox.showwarning("提示", "没有可导出的账户")
+            return
+        folder = filedialog.askdirectory(title="选择迁移二维码的保存目录")
+        if not folder:
+            return
+
+        accounts = [
+            {
+                "issuer": acc["issuer"],
+                "name": acc["name"],
+                "secret": acc["secret"],
+                "type": acc.get("type", "totp"),
+                "counter": acc.get("counter", 0)
+            }
+            for acc in self.accounts
+        ]
+        self.migrate_export_btn.configure(state="disabled")
+        self.migrate_scan_result.configure(text="正在生成迁移二维码…", text_color=TEXT_MEDIUM_GRAY)
+        self.run_in_core(
+            self.core.export_migration_qr(
+                accounts, folder,
+                on_progress=lambda done, total: self.dispatcher.post(self.on_migration_export_progress, done, total)
+            ),
+            lambda result, error: self.finish_migration_export(folder, result, error)
+        )
+
+    def on_migration_export_progress(self, done, total):
+        self.migrate_scan_result.configure(text=f"正在生成迁移二维码… {done}/{total}")
+
+    def finish_migration_export(self, folder, result, error):
+        """迁移二维码导出完成"""
+        self.migrate_export_btn.configure(state="normal")
+        if error is not None:
+            self.migrate_scan_result.configure(text=f"❌ 导出失败：{error}", text_color="#ff6b6b")
+            return
+        print(f"迁移导出：{len(self.accounts)}个账户分为{result['batches']}个二维码，"
+              f"编码 {result['encode_ms']:.0f}ms，渲染 {result['render_ms']:.0f}ms")
+        self.migrate_scan_result.configure(
+            text=f"✅ 已导出 {result['batches']} 张迁移二维码到 {folder}\n请在手机上按顺序逐张扫描",
+            text_color="#4ECDC4"
+        )
 
     def import_migrated(self):
-        """导入迁移账户"""
-        if not self.migrate_accounts:
+        """导入迁移账户（所有批次一次保存）"""
+        assembler = self.migration_assembler
+        if assembler is None or not assembler.account_count():
             messagebox.showwarning("提示", "没有可导入的账户")
             return
+        missing = assembler.missing()
+        if missing and not messagebox.askyesno(
+                "批次不完整",
+                f"缺少第 {'、'.join(str(i + 1) for i in missing)} 批迁移二维码，是否仅导入已接收的账户？"
+        ):
+            return
 
         added = 0
         duplicate = 0
-        for acc in self.migrate_accounts:
+        errors = []
+        for acc in assembler:
+            acc = record_from_migration(acc)
+            if "error" in acc:
+                errors.append(acc["error"])
+                continue
             # 检查重复
-            if any(a["secret"] == acc["secret"] for a in self.accounts):
+            account_id = stable_account_id(acc["secret"])
+            if account_id in self.account_index:
                 duplicate += 1
                 continue
             try:
                 # 添加账户
-                self.accounts.append({
-                    "id": acc["id"],
-                    "issuer": acc["issuer"],
-                    "name": acc["name"],
-                    "secret": acc["secret"],
-                    "totp": pyotp.TOTP(acc["secret"]),
-                    "card_elements": None
-                })
+                self.register_account(build_account(
+                    acc["issuer"], acc["name"], acc["secret"],
+                    acc["type"], acc["counter"]
+                ))
                 added += 1
             except Exception as e:
                 messagebox.showerror("错误", f"添加账户 {acc['name']} 失败：{str(e)}")
 
         # 结果提示
-        print(f"导入完成：新增{added}个，重复{duplicate}个，总数量{len(self.accounts)}")
+        self.migration_assembler = None
+        self.migrate_scan_import_btn.configure(state="disabled")
+        print(f"导入完成：新增{added}个，重复{duplicate}个，不支持{len(errors)}个，总数量{len(self.accounts)}")
         self.save_accounts()
         self.refresh_accounts()
-        messagebox.showinfo(
-            "导入完成",
-            f"成功添加：{added}个\n已存在：{duplicate}个"
-        )
+        message = f"成功添加：{added}个\n已存在：{duplicate}个"
+        if errors:
+            message += f"\n未导入：{len(errors)}个\n" + "\n".join(errors[:10])
+        messagebox.showinfo("导入完成", message)
         self.show_page("account")
 
     def add_manual(self):
@@ -1463,7 +2497,7 @@ class GoogleAuthenticator:
 
         try:
             # 验证密钥
-            totp = pyotp.TOTP(secret)
+            decode_secret(secret)
 
             # 检查重复
             if any(a["secret"] == secret for a in self.accounts):
@@ -1471,15 +2505,8 @@ class GoogleAuthenticator:
                 return
 
             # 添加账户
-            new_account = {
-                "id": hash(secret),
-                "issuer": platform,
-                "name": account,
-                "secret": secret,
-                "totp": totp,
-                "card_elements": None
-            }
-            self.accounts.append(new_account)
+            new_account = build_account(platform, account, secret)
+            self.register_account(new_account)
             print(f"手动添加账户: {new_account['name']}, 总数量: {len(self.accounts)}")
 
             # 清空表单
@@ -1529,7 +2556,7 @@ class GoogleAuthenticator:
 迁移功能需要 google_auth_migration_pb2.py 文件，获取方法：
 
 1. 从可信来源下载该文件
-2. 放置在与本程序相同的目录下
+2. 放置在程序目录下的 gauth_core 文件夹中
 3. 重启程序即可启用迁移功能
 
 提示：该文件是Google Authenticator迁移协议的
@@ -1548,17 +2575,24 @@ Protobuf定义文件，需确保来源安全。
         ).pack(pady=10)
 
     def start_timer(self):
-        """验证码定时器（30秒刷新）"""
+        """验证码定时器（每秒刷新进度条，进入新窗口时刷新验证码；窗口隐藏时停止）"""
         if self.timer_id:
             self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+        if self.ui_hidden:
+            return
+        self.timer_wakeups += 1
 
         try:
             current_time = time.time()
             remaining = 30 - (int(current_time) % 30)
+            window = int(current_time) // 30
+            refresh_codes = window != self.ui_window
+            self.ui_window = window
 
             # 更新所有账户的进度条和验证码
             for acc in self.accounts:
-                if not acc.get("card_elements"):
+                if not acc.get("card_elements") or acc.get("type") == "hotp":
                     continue
                 card_elements = acc["card_elements"]
 
@@ -1575,10 +2609,15 @@ Protobuf定义文件，需确保来源安全。
                     else:
                         card_elements["progress"].configure(progress_color="#1a73e8")
 
-                # 每30秒刷新验证码
-                if int(current_time) % 30 == 0:
+                # 进入新窗口（或从隐藏恢复）时刷新验证码
+                if refresh_codes:
                     if self.is_widget_valid(card_elements.get("otp_label")):
-                        card_elements["otp_label"].configure(text=acc["totp"].now())
+                        card_elements["otp_label"].configure(text=current_code(acc))
+
+            if self.code_table is not None and self.code_table_window != int(current_time) // 30:
+                self.publish_code_table(current_time)
+
+            self.poll_vault(current_time)
 
         except Exception as e:
             print(f"定时器错误: {e}")
@@ -1587,53 +2626,149 @@ Protobuf定义文件，需确保来源安全。
         if self.is_running:
             self.timer_id = self.root.after(1000, self.start_timer)
 
-    def save_accounts(self):
-        """保存账户数据"""
-        try:
-            # 确保目录存在
-            if not os.path.exists(self.config_dir):
-                os.makedirs(self.config_dir)
+    # 隐藏/最小化功耗模式
+    def on_root_map(self, event):
+        if event.widget is self.root:
+            self.set_ui_hidden(False)
 
-            # 排除UI元素，仅保存核心数据
-            data = [{
-                "issuer": acc["issuer"],
-                "name": acc["name"],
-                "secret": acc["secret"]
-            } for acc in self.accounts]
+    def on_root_unmap(self, event):
+        # 最小化（iconic）和隐藏到托盘（withdrawn）都会触发
+        if event.widget is self.root:
+            self.set_ui_hidden(True)
 
-            # 写入文件
-            with open(self.save_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            messagebox.showerror("错误", f"保存失败: {str(e)}")
+    def set_ui_hidden(self, hidden):
+        """窗口不可见时停止界面定时器（任务队列空闲时本就不唤醒）；重新显示时一次性同步所有卡片"""
+        if hidden == self.ui_hidden or not self.is_running:
+            return
+        self.ui_hidden = hidden
+        if hidden:
+            if self.timer_id:
+                self.root.after_cancel(self.timer_id)
+                self.timer_id = None
+            self.hidden_since = time.monotonic()
+            self.hidden_wakeups_start = self.timer_wakeups + self.dispatcher.wakeups
+            self.schedule_hidden_publish()
+            return
+        if self.hidden_publish_job:
+            self.root.after_cancel(self.hidden_publish_job)
+            self.hidden_publish_job = None
+        if self.hidden_since is not None:
+            seconds = time.monotonic() - self.hidden_since
+            wakeups = self.timer_wakeups + self.dispatcher.wakeups - self.hidden_wakeups_start
+            print(f"💤 隐藏 {seconds:.0f} 秒，唤醒 {wakeups} 次"
+                  f"（每分钟 {wakeups * 60 / max(seconds, 1):.1f} 次）")
+            self.hidden_since = None
+        if self.render_complete:
+            self.start_timer()  # 立即同步进度条和验证码
+
+    def schedule_hidden_publish(self):
+        """隐藏时只在每个窗口开始时唤醒一次，用于刷新共享内存验证码表"""
+        if self.code_table is None:
+            return
+        delay = 30 - time.time() % 30
+        self.hidden_publish_job = self.root.after(int(delay * 1000) + 1, self.on_hidden_publish)
+
+    def on_hidden_publish(self):
+        self.hidden_publish_job = None
+        self.timer_wakeups += 1
+        if self.code_table is not None:
+            try:
+                self.publish_code_table(time.time())
+            except Exception as e:
+                print(f"验证码表刷新失败: {e}")
+        if self.ui_hidden:
+            self.schedule_hidden_publish()
+
+    def publish_code_table(self, current_time):
+        """把当前窗口的全部验证码写入共享内存"""
+        window = int(current_time) // 30
+        entries = []
+        for acc in self.accounts:
+            code = valid_code(acc) if acc.get("secret") else None
+            if code is not None:
+                entries.append((acc["id"], code, acc.get("type") == "hotp"))
+        self.code_table.publish(entries, window, (window + 1) * 30)
+        self.code_table_window = window
+
+    def set_hotp_counter(self, account, counter):
+        """更新 HOTP 计数器：只追加日志，不重写账户文件"""
+        account["counter"] = counter
+        self.code_table_window = None
+        self.vault_edits += 1
+        self.run_in_core(self.core.record_hotp_counter(account["id"], counter), self.on_counter_recorded)
+        card_elements = account.get("card_elements")
+        if card_elements and self.is_widget_valid(card_elements.get("otp_label")):
+            card_elements["otp_label"].configure(text=current_code(account))
+
+    def advance_hotp(self, account):
+        """HOTP 生成下一个验证码"""
+        if not account.get("secret") or account.get("error"):
+            return  # 快照骨架（账户尚未加载）或密钥无效
+        self.set_hotp_counter(account, account["counter"] + 1)
+
+    def save_accounts(self):
+        """保存账户数据（核心服务在后台写入，界面不等待）"""
+        if not self.accounts_loaded:
+            # 启动读取尚未完成，现在保存会用不完整的列表覆盖账户文件；读取完成后再保存
+            self.save_pending = True
+            return
+        # 排除UI元素，仅保存核心数据；在界面线程生成快照，避免后台写入时账户被修改
+        records = [account_record(acc) for acc in self.accounts]
+        self.vault_edits += 1
+        self.run_in_core(self.core.save_accounts(records), self.on_accounts_saved)
+
+    def on_accounts_saved(self, result, error):
+        if error is not None:
+            messagebox.showerror("错误", f"保存失败: {str(error)}")
+        elif result["merged"]:
+            # 其他程序同时修改了账户文件，已合并；重新读取以显示合并后的账户
+            print(f"🔀 账户文件已与其他程序的修改合并（版本 {result['version']}）")
+            self.load_accounts()
+
+    def on_counter_recorded(self, result, error):
+        if error is not None:
+            messagebox.showerror("错误", f"保存计数器失败: {str(error)}")
+
+    def run_in_core(self, coro, on_done):
+        """把协程交给核心服务，完成后在界面线程调用 on_done(result, error)"""
+        return self.core.submit(coro, lambda result, error: self.dispatcher.post(on_done, result, error))
 
     def load_accounts(self):
-        """加载账户数据"""
-        try:
-            if os.path.exists(self.save_file):
-                with open(self.save_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+        """加载账户数据（核心服务在后台读取，完成后刷新列表）"""
+        edits = self.vault_edits
+        self.run_in_core(self.core.load_accounts(), lambda records, error: self.on_accounts_loaded(records, error, edits))
 
-                self.accounts = []
-                for item in data:
-                    try:
-                        # 避免重复添加
-                        if not any(a["secret"] == item["secret"] for a in self.accounts):
-                            self.accounts.append({
-                                "id": hash(item["secret"]),
-                                "issuer": item["issuer"],
-                                "name": item["name"],
-                                "secret": item["secret"],
-                                "totp": pyotp.TOTP(item["secret"]),
-                                "card_elements": None
-                            })
-                    except Exception as e:
-                        messagebox.showwarning("警告", f"加载账户 {item['name']} 失败: {str(e)}")
+    def on_accounts_loaded(self, records, error, edits):
+        if error is not None:
+            messagebox.showerror("错误", f"加载失败: {str(error)}")
+            return
+        if edits != self.vault_edits:
+            # 读取期间界面又提交了修改，结果不含这些修改，重新读取
+            self.load_accounts()
+            return
+        try:
+            self.accounts = [account_from_record(r) for r in records]
 
+            self.rebuild_usage_order()
             self.refresh_accounts()
         except Exception as e:
             messagebox.showerror("错误", f"加载失败: {str(e)}")
 
+    def poll_vault(self, now):
+        """定时检查账户文件是否被其他程序（命令行、另一台电脑）改写"""
+        if now < self.vault_poll_at:
+            return
+        self.vault_poll_at = now + VAULT_POLL_SECONDS
+        self.run_in_core(self.core.vault_changed(), self.on_vault_polled)
+
+    def on_vault_polled(self, changed, error):
+        if error is not None:
+            print(f"检查账户文件失败: {error}")
+        elif changed and not (self.pages.get("edit") and self.pages["edit"].winfo_ismapped()):
+            # 编辑页打开时先不重新加载（编辑中的账户对象会被替换），下次轮询再检查
+            print("🔄 账户文件已被其他程序修改，重新加载")
+            self.load_accounts()
+
     # 托盘功能
     def start_tray(self):
         """启动托盘线程"""
@@ -1660,9 +2795,10 @@ Protobuf定义文件，需确保来源安全。
                 tray_image = Image.new("RGBA", (64, 64), (30, 30, 46, 255))
                 print("⚠️ 未找到托盘图标，使用默认图标")
 
-            # 托盘菜单
+            # 托盘菜单（快捷复制子菜单在构建菜单时才生成）
             tray_menu = pystray.Menu(
                 item("显示Google Authenticator", self.show_main_window, default=True),
+                item("复制验证码", pystray.Menu(self.tray_quick_copy_items)),
                 item("退出程序", self.quit_app)
             )
 
@@ -1678,50 +2814,156 @@ Protobuf定义文件，需确保来源安全。
         except Exception as e:
             print(f"托盘创建失败：{e}")
 
+    def tray_quick_copy_items(self):
+        """快捷复制菜单项（托盘线程调用）：固定的账户在前，其余按使用频率
+
+        只读取账户索引和排序，不计算验证码；点击时由界面线程从验证码缓存取值复制。
+        """
+        index = self.account_index
+        ids = [account_id for account_id in self.tray_pinned if account_id in index]
+        for account_id in self.usage_order.top(TRAY_QUICK_COPY + len(ids)):
+            if len(ids) >= TRAY_QUICK_COPY:
+                break
+            if account_id not in ids:
+                ids.append(account_id)
+        if not ids:
+            return [item("（暂无常用账户）", None, enabled=False)]
+        items = []
+        for account_id in ids[:TRAY_QUICK_COPY]:
+            account = index[account_id]
+            pin = "★ " if account_id in self.tray_pinned else ""
+            items.append(item(f"{pin}{account['issuer']} - {account['name']}", self.tray_copy_action(account_id)))
+        return items
+
+    def tray_copy_action(self, account_id):
+        # pystray 按参数个数调用菜单动作，这里返回无参闭包
+        return lambda: self.dispatcher.post(self.copy_from_tray, account_id)
+
+    def copy_from_tray(self, account_id):
+        """托盘快捷复制（界面线程）"""
+        account = self.account_index.get(account_id)
+        if account is None:
+            return
+        self.copy_otp(account)
+        self.update_tray_menu()
+
+    def update_tray_menu(self):
+        """账户顺序或固定状态变化后重建托盘菜单（只在窗口隐藏时需要）"""
+        if self.tray_icon:
+            try:
+                self.tray_icon.update_menu()
+            except Exception as e:
+                print(f"托盘菜单更新失败：{e}")
+
     def minimize_to_tray(self):
         """最小化到托盘"""
         self.root.withdraw()
+        self.set_ui_hidden(True)
         if self.tray_icon:
             self.tray_icon.visible = True
+            self.update_tray_menu()
 
     def show_main_window(self):
-        """从托盘显示窗口"""
-        self.root.after(0, self._show_main_window_ui)
+        """从托盘显示窗口（托盘/IPC 线程调用）"""
+        self.dispatcher.post(self._show_main_window_ui)
 
     def _show_main_window_ui(self):
         """主线程显示窗口"""
         self.root.deiconify()
         self.root.lift()
         self.root.focus_force()
+        self.set_ui_hidden(False)
+
+    # 单实例 IPC 命令（在 IPC 连接线程中执行，不访问界面组件）
+    def handle_ipc_command(self, cmd, args):
+        """处理第二个进程转发来的命令"""
+        if cmd == "show":
+            self.show_main_window()
+            return "ok"
+        accounts = list(self.accounts)
+        if cmd == "list":
+            return [{"id": acc["id"], "issuer": acc["issuer"], "name": acc["name"]} for acc in accounts]
+        if cmd == "get":
+            query = " ".join(args)
+            matches = find_accounts(accounts, query)
+            if not matches:
+                raise ValueError(f"未找到匹配的账户：{query}")
+            remaining = code_cache.remaining()
+            entries = []
+            for acc in matches:
+                code = valid_code(acc)
+                if code is not None:
+                    entries.append({
+                        "id": acc["id"],
+                        "issuer": acc["issuer"],
+                        "name": acc["name"],
+                        "code": code,
+                        "remaining": None if acc.get("type") == "hotp" else remaining
+                    })
+            if not entries:
+                raise ValueError(f"匹配的账户密钥无效：{query}")
+            return entries
+        raise ValueError(f"未知命令：{cmd}")
 
     def quit_app(self):
-        """退出程序"""
+        """退出程序（托盘线程调用）：清理工作全部交给界面线程"""
         self.is_running = False
+        self.dispatcher.post(self.shutdown_ui)
+
+    def shutdown_ui(self):
+        """主线程退出清理"""
         # 停止托盘
         if self.tray_icon:
             self.tray_icon.stop()
         # 停止定时器
         if self.timer_id:
             self.root.after_cancel(self.timer_id)
-        # 销毁窗口
-        self.root.after(0, self.root.destroy)
+            self.timer_id = None
+        if self.hidden_publish_job:
+            self.root.after_cancel(self.hidden_publish_job)
+            self.hidden_publish_job = None
+        self.dispatcher.stop()
+        metrics = self.dispatcher.metrics()
+        print(f"📬 界面任务队列: 共{metrics['executed']}个，最大积压 {metrics['max_depth']}，"
+              f"排队延迟 p50 {metrics['p50']:.1f}ms，p95 {metrics['p95']:.1f}ms")
+        self.stop_local_api()
+        if self.code_table is not None:
+            self.code_table.close()
+        if self.batch_decoder is not None:
+            self.batch_decoder.shutdown()
+        # 等核心服务写完账户文件，再写快照：快照不能比账户文件新
+        self.core.stop()
+        for line in self.core.report():
+            print(line)
+        # 保存快照并销毁窗口
+        self.save_list_snapshot()
+        self.root.destroy()
 
     # 配置管理
     def load_settings(self):
         """加载配置（配置目录）"""
         default_dir = str(Path.home())
+        self.sort_mode = "insertion"
+        self.smooth_scroll = False
+        self.clipboard_clear_seconds = 30
+        self.hotp_resync_window = DEFAULT_RESYNC_WINDOW
+        self.api_enabled = False
+        self.api_address = DEFAULT_API_ADDRESS
+        self.code_table_enabled = False
+        self.tray_pinned = []
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, "r", encoding="utf-8") as f:
-                    settings = json.load(f)
-                config_dir = settings.get("config_dir", default_dir)
-                # 验证目录有效性
-                if os.path.exists(config_dir) and os.access(config_dir, os.W_OK):
-                    self.config_dir = config_dir
-                else:
-                    self.config_dir = default_dir
-            else:
-                self.config_dir = default_dir
+            settings = read_settings(self.config_file)
+            if settings.get("sort_mode") in ("insertion", "frecency"):
+                self.sort_mode = settings["sort_mode"]
+            self.smooth_scroll = bool(settings.get("smooth_scroll", False))
+            self.clipboard_clear_seconds = float(settings.get("clipboard_clear_seconds", 30))
+            self.hotp_resync_window = int(settings.get("hotp_resync_window", DEFAULT_RESYNC_WINDOW))
+            self.api_enabled = bool(settings.get("api_enabled", False))
+            self.api_address = str(settings.get("api_address", DEFAULT_API_ADDRESS))
+            self.code_table_enabled = bool(settings.get("code_table_enabled", False))
+            self.tray_pinned = [str(account_id) for account_id in settings.get("tray_pinned", [])]
+            # 验证目录有效性（无效时回退到用户主目录）
+            self.config_dir = resolve_config_dir(settings)
 
             # 确保目录存在
             if not os.path.exists(self.config_dir):
@@ -1735,7 +2977,17 @@ Protobuf定义文件，需确保来源安全。
         """保存配置"""
         try:
             with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump({"config_dir": self.config_dir}, f, ensure_ascii=False)
+                json.dump({
+                    "config_dir": self.config_dir,
+                    "sort_mode": self.sort_mode,
+                    "smooth_scroll": self.smooth_scroll,
+                    "clipboard_clear_seconds": self.clipboard_clear_seconds,
+                    "hotp_resync_window": self.hotp_resync_window,
+                    "api_enabled": self.api_enabled,
+                    "api_address": self.api_address,
+                    "code_table_enabled": self.code_table_enabled,
+                    "tray_pinned": self.tray_pinned
+                }, f, ensure_ascii=False)
         except Exception as e:
             messagebox.showerror("错误", f"保存配置失败：{str(e)}")
 
@@ -1857,9 +3109,19 @@ Protobuf定义文件，需确保来源安全。
         old_dir = self.config_dir
         old_save_file = self.save_file
 
-        # 更新配置
+        # 更新配置（核心服务写完旧目录中的账户文件后再切换，界面不等待）
+        self.run_in_core(
+            self.core.set_config_dir(new_dir),
+            lambda result, error: self.on_config_dir_changed(window, new_dir, old_save_file, error),
+        )
+
+    def on_config_dir_changed(self, window, new_dir, old_save_file, error):
+        if error is not None:
+            messagebox.showerror("错误", f"切换配置目录失败：{str(error)}")
+            return
         self.config_dir = new_dir
-        self.save_file = os.path.join(self.config_dir, ".ubisoft_authenticator.json")
+        self.save_file = os.path.join(self.config_dir, VAULT_FILE_NAME)
+        self.snapshot_file = os.path.join(self.config_dir, ".auth_list_snapshot.json")
         self.save_settings()
 
         # 迁移数据
@@ -1873,10 +3135,19 @@ Protobuf定义文件，需确保来源安全。
         else:
             messagebox.showinfo("成功", f"配置目录已更改到:\n{new_dir}")
 
-        # 重新加载账户
+        # 重新加载账户（使用频率、解码缓存随配置目录切换）
+        self.usage_store = UsageStore(self.config_dir)
+        if self.batch_decoder is not None:
+            self.batch_decoder.shutdown()
+            self.batch_decoder = None
+        if self.api_server is not None:
+            # 令牌文件随配置目录切换
+            self.stop_local_api()
+            self.start_local_api()
         self.load_accounts()
         self.config_path_label.configure(text=f"当前目录：{self.config_dir}")
-        window.destroy()
+        if window.winfo_exists():
+            window.destroy()
 
     def open_config_folder(self):
         """打开配置目录"""
@@ -1892,13 +3163,22 @@ Protobuf定义文件，需确保来源安全。
 
 
 if __name__ == "__main__":
-    # 单例检查
-    single_instance = SystemMutexSingleInstance()
-    if not single_instance.check():
-        messagebox.showinfo("提示", "程序已在运行中")
+    # 单例检查：绑定 IPC 端点，失败说明另一个实例刚刚启动，让它显示窗口
+    instance_server = InstanceServer()
+    try:
+        started = instance_server.start()
+    except OSError as e:
+        print(f"⚠️ 单实例检查不可用，继续启动: {e}")
+        started = None
+    if started is False:
+        send_command("show")
         sys.exit(0)
+    if started:
+        atexit.register(instance_server.stop)
 
     # 启动应用
+    init_appearance()
     root = ctk.CTk()
     app = GoogleAuthenticator(root)
+    instance_server.handler = app.handle_ipc_command
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""导出为 Google Authenticator 迁移二维码
+
+账户先按容量装箱成尽量少的迁移链接，再在进程池中并行渲染为 PNG 图片。
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from gauth_core.migration import encode_migration_batches, parse_migration_uri, QR_BYTE_CAPACITY
+from gauth_core.otp_engine import decode_secret
+
+try:
+    import qrcode
+    from qrcode.constants import ERROR_CORRECT_L
+
+    QR_EXPORT_AVAILABLE = True
+except ImportError:
+    QR_EXPORT_AVAILABLE = False
+
+# 模块像素大小与静区宽度（版本40约 740×740 像素，手机可直接扫描）
+QR_BOX_SIZE = 4
+QR_BORDER = 4
+
+
+def render_migration_qr(uri, path):
+    """把一个迁移链接渲染为二维码图片（进程池工作函数）"""
+    start = time.perf_counter()
+    qr = qrcode.QRCode(error_correction=ERROR_CORRECT_L, box_size=QR_BOX_SIZE, border=QR_BORDER)
+    # 链接已是 URL 转义后的 ASCII，整体按字节模式编码，容量与装箱时的估算一致
+    qr.add_data(uri, optimize=0)
+    qr.make(fit=True)
+    qr.make_image().save(path)
+    return {"path": path, "version": qr.version, "ms": (time.perf_counter() - start) * 1000}
+
+
+def verify_round_trip(accounts, uris):
+    """用本程序的导入逻辑解析导出的链接，确认账户（包括密钥字节）完整一致"""
+    imported = []
+    for uri in uris:
+        imported.extend(parse_migration_uri(uri))
+    def key(acc):
+        otp_type = acc.get("type", "totp")
+        counter = acc.get("counter", 0) if otp_type == "hotp" else 0
+        return acc["issuer"], acc["name"], decode_secret(acc["secret"]), otp_type, counter
+
+    if sorted(map(key, accounts)) != sorted(map(key, imported)):
+        raise ValueError("导出校验失败：解析结果与原账户不一致")
+
+
+def export_migration_qr(accounts, folder, on_progress=None, max_workers=None, capacity=QR_BYTE_CAPACITY):
+    """导出迁移二维码到 folder，返回 {files, batches, encode_ms, render_ms}
+
+    accounts 为包含 issuer/name/secret/type/counter 的字典列表；
+    每渲染完一张调用 on_progress(done, total)（在调用线程中执行）。
+    """
+    if not QR_EXPORT_AVAILABLE:
+        raise Exception("缺少二维码生成模块，请安装 qrcode")
+    start = time.perf_counter()
+    uris = encode_migration_batches(accounts, capacity)
+    verify_round_trip(accounts, uris)
+    encode_ms = (time.perf_counter() - start) * 1000
+
+    total = len(uris)
+    width = len(str(total))
+    paths = [
+        os.path.join(folder, f"migration_{i + 1:0{width}d}_of_{total}.png")
+        for i in range(total)
+    ]
+    start = time.perf_counter()
+    files = []
+    if total == 1:
+        # 单张不值得启动进程池
+        files.append(render_migration_qr(uris[0], paths[0]))
+        if on_progress:
+            on_progress(1, 1)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(render_migration_qr, uri, path) for uri, path in zip(uris, paths)]
+            for future in as_completed(futures):
+                files.append(future.result())
+                if on_progress:
+                    on_progress(len(files), total)
+    files.sort(key=lambda f: f["path"])
+    return {
+        "files": files,
+        "batches": total,
+        "encode_ms": encode_ms,
+        "render_ms": (time.perf_counter() - start) * 1000
+    }
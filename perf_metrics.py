@@ -0,0 +1,58 @@
+"""轻量性能统计：滚动窗口内的耗时分位数"""
+import time
+from collections import deque
+
+
+class LatencyStats:
+    """记录最近若干次耗时（毫秒），每累计 report_every 次打印一次摘要"""
+
+    def __init__(self, name, window=512, report_every=0):
+        self.name = name
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.report_every = report_every
+
+    def record(self, ms):
+        """记录一次耗时"""
+        self.samples.append(ms)
+        self.count += 1
+        if self.report_every and self.count % self.report_every == 0:
+            print(self.report())
+
+    def time(self):
+        """上下文计时：with stats.time(): ..."""
+        return _Timer(self)
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self):
+        """返回 {count, p50, p95, max}"""
+        return {
+            "count": self.count,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": max(self.samples) if self.samples else 0.0
+        }
+
+    def report(self):
+        s = self.summary()
+        return (f"⏱ {self.name}: 共{s['count']}次，p50 {s['p50']:.2f}ms，"
+                f"p95 {s['p95']:.2f}ms，最大 {s['max']:.2f}ms")
+
+
+class _Timer:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record((time.perf_counter() - self.start) * 1000)
+        return False
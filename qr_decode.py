@@ -0,0 +1,321 @@
+"""二维码图片解码（可在进程池中运行，不依赖界面模块）"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageOps
+
+from decode_cache import content_keys
+import pyzbar.pyzbar as pyzbar
+from pyzbar.pyzbar import ZBarSymbol
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp")
+
+# 分辨率金字塔：最多缩小3级，边长不小于 PYRAMID_MIN_SIDE
+PYRAMID_LEVELS = (2, 4, 8)
+PYRAMID_MIN_SIDE = 160
+# 小图放大倍数（模块过小时 zbar 难以定位）
+UPSCALE_FACTORS = (2, 3)
+UPSCALE_MAX_SIDE = 600
+# 扫码页预览尺寸
+PREVIEW_SIZE = (280, 280)
+# 旋转回退的角度与图片边长上限
+ROTATION_ANGLES = (45, 22)
+ROTATION_MAX_SIDE = 1600
+
+
+def _zbar_decode(gray):
+    """只识别二维码，返回内容字符串列表
+
+    直接以 (像素, 宽, 高) 形式传入灰度缓冲，pyzbar 不再做模式转换。
+    """
+    width, height = gray.size
+    symbols = pyzbar.decode((gray.tobytes(), width, height), symbols=[ZBarSymbol.QRCODE])
+    return [obj.data.decode("utf-8", "replace").strip() for obj in symbols]
+
+
+def open_gray(path):
+    """以灰度打开图片；JPEG 使用 draft 模式直接解码为灰度，省去色彩转换"""
+    with Image.open(path) as image:
+        if image.format == "JPEG":
+            image.draft("L", image.size)
+        return image.convert("L")
+
+
+def ingest_image(path, preview_size=PREVIEW_SIZE):
+    """只打开、解码一次图片，从同一份像素生成灰度解码图和预览缩略图
+
+    返回 (gray, preview)。预览先按整数倍盒式降采样再精确缩放，
+    大照片不必对全尺寸图做 LANCZOS。
+    """
+    with Image.open(path) as image:
+        if image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        else:
+            image.load()
+    gray = image if image.mode == "L" else image.convert("L")
+
+    width, height = image.size
+    factor = max(1, min(width // (preview_size[0] * 2), height // (preview_size[1] * 2)))
+    preview = image.reduce(factor) if factor > 1 else image
+    preview = preview.resize(preview_size, Image.Resampling.LANCZOS)
+    return gray, preview
+
+
+def scan_image_file(path):
+    """单张扫码：读取图片、生成预览并分阶段解码（可在后台线程调用）
+
+    返回 {preview, payloads, stage, timings, ms}。
+    """
+    start = time.perf_counter()
+    gray, preview = ingest_image(path)
+    ingest_ms = (time.perf_counter() - start) * 1000
+    decoded = decode_qr_image(gray)
+    decoded["timings"] = {"ingest": ingest_ms, **decoded["timings"]}
+    decoded["preview"] = preview
+    decoded["ms"] = (time.perf_counter() - start) * 1000
+    return decoded
+
+
+def _pyramid(gray):
+    """缩小（盒式降采样）和小图放大的候选图"""
+    width, height = gray.size
+    level, previous = 1, gray
+    for factor in PYRAMID_LEVELS:
+        if min(width, height) // factor < PYRAMID_MIN_SIDE:
+            break
+        # 在上一级基础上继续缩小，避免每级都从原图计算
+        previous = previous.reduce(factor // level)
+        level = factor
+        yield f"pyramid/{factor}", previous
+    if max(width, height) <= UPSCALE_MAX_SIDE:
+        for factor in UPSCALE_FACTORS:
+            yield f"upscale×{factor}", gray.resize((width * factor, height * factor), Image.Resampling.NEAREST)
+
+
+def _otsu_threshold(gray):
+    """Otsu 阈值（基于直方图，开销与像素数无关）"""
+    histogram = gray.histogram()
+    total = sum(histogram)
+    sum_all = sum(i * h for i, h in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best_threshold, best_variance = 127, -1.0
+    for i, h in enumerate(histogram):
+        weight_bg += h
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * h
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = i, variance
+    return best_threshold
+
+
+def _working_copy(gray, max_side):
+    """边长超过 max_side 时按整数倍缩小"""
+    factor = 1
+    while max(gray.size) // factor > max_side:
+        factor *= 2
+    return gray.reduce(factor) if factor > 1 else gray
+
+
+def _binarized(gray):
+    """二值化及反色候选图（应对低对比度、深色背景的二维码）"""
+    base = _working_copy(gray, ROTATION_MAX_SIDE)
+    threshold = _otsu_threshold(base)
+    binary = base.point(lambda v: 255 if v > threshold else 0)
+    yield "binarize", binary
+    yield "invert", ImageOps.invert(binary)
+
+
+def _rotated(gray):
+    """旋转候选图（应对倾斜拍摄）"""
+    base = _working_copy(gray, ROTATION_MAX_SIDE)
+    for angle in ROTATION_ANGLES:
+        yield f"rotate/{angle}", base.rotate(angle, expand=True, fillcolor=255)
+
+
+def decode_qr_image(gray):
+    """分阶段解码灰度图，首个成功的阶段即返回
+
+    顺序：原始分辨率 → 分辨率金字塔 → 二值化/反色 → 旋转。
+    返回 {payloads, stage, timings}，timings 记录每个尝试过的阶段耗时（毫秒）。
+    """
+    timings = {}
+
+    def candidates():
+        yield "native", gray
+        yield from _pyramid(gray)
+        yield from _binarized(gray)
+        yield from _rotated(gray)
+
+    stages = candidates()
+    while True:
+        start = time.perf_counter()
+        try:
+            stage, image = next(stages)
+        except StopIteration:
+            break
+        payloads = _zbar_decode(image)
+        timings[stage] = (time.perf_counter() - start) * 1000
+        if payloads:
+            return {"payloads": payloads, "stage": stage, "timings": timings}
+    return {"payloads": [], "stage": None, "timings": timings}
+
+
+def format_timings(result):
+    """把阶段耗时格式化为一行日志"""
+    return "，".join(f"{stage} {ms:.0f}ms" for stage, ms in result["timings"].items())
+
+
+def collect_image_files(folder):
+    """列出目录下的图片文件（不递归，按文件名排序）"""
+    paths = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                paths.append(entry.path)
+    paths.sort()
+    return paths
+
+
+NO_QR_ERROR = "未识别到二维码"
+
+
+def decode_image_file(path):
+    """解码单个图片中的所有二维码，返回 {path, payloads, error, stage, timings, ms}
+
+    作为进程池工作函数使用，异常不会抛出，统一放进 error 字段。
+    """
+    start = time.perf_counter()
+    stage, timings = None, {}
+    try:
+        decoded = decode_qr_image(open_gray(path))
+        payloads, stage, timings = decoded["payloads"], decoded["stage"], decoded["timings"]
+        error = None if payloads else NO_QR_ERROR
+    except Exception as e:
+        payloads = []
+        error = str(e)
+    return {
+        "path": path,
+        "payloads": payloads,
+        "error": error,
+        "stage": stage,
+        "timings": timings,
+        "ms": (time.perf_counter() - start) * 1000
+    }
+
+
+class BatchDecoder:
+    """用进程池批量解码图片，结果通过回调逐个返回
+
+    回调在后台线程中执行，调用方负责切回界面线程。
+    提供 cache（DecodeCache）时先按内容哈希查缓存，命中的文件（包括已知没有二维码的）不再解码。
+    """
+
+    def __init__(self, max_workers=None, cache=None):
+        self.max_workers = max_workers
+        self.cache = cache
+        self.executor = None
+        self.cancelled = False
+
+    def start(self, paths, on_result, on_done):
+        """后台解码 paths；每个文件完成调用 on_result(result)，全部完成调用 on_done()"""
+        self.cancelled = False
+        if self.cache is not None:
+            self.cache.reset_counters()
+        thread = threading.Thread(target=self._run, args=(list(paths), on_result, on_done), daemon=True)
+        thread.start()
+        return thread
+
+    def _run(self, paths, on_result, on_done):
+        try:
+            futures = {}
+            for path in paths:
+                if self.cancelled:
+                    break
+                keys = self._cached(path, on_result)
+                if keys is True:
+                    continue
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                try:
+                    futures[self.executor.submit(decode_image_file, path)] = (keys, path)
+                except BrokenProcessPool as e:
+                    self._discard_executor()
+                    on_result(self._failed(path, e))
+
+            for future in as_completed(futures):
+                if self.cancelled:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                keys, path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 进程池崩溃（BrokenProcessPool）等：只记为该文件失败，继续处理其余结果
+                    if isinstance(e, BrokenProcessPool):
+                        self._discard_executor()
+                    on_result(self._failed(path, e))
+                    continue
+                # 读取失败等错误不缓存，下次重新解码
+                if keys and (result["payloads"] or result["error"] == NO_QR_ERROR):
+                    self.cache.put(keys, result["payloads"])
+                on_result(result)
+        except Exception as e:
+            print(f"批量解码失败: {e}")
+        finally:
+            if self.cache is not None:
+                self.cache.save()
+            on_done()
+
+    @staticmethod
+    def _failed(path, error):
+        return {"path": path, "payloads": [], "error": str(error) or type(error).__name__,
+                "stage": None, "timings": {}, "ms": 0.0}
+
+    def _discard_executor(self):
+        # 崩溃的进程池不能再提交任务，下次按需重建
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _cached(self, path, on_result):
+        """查缓存：命中时直接回调并返回 True，否则返回用于写缓存的内容密钥"""
+        if self.cache is None:
+            return None
+        try:
+            keys = content_keys(path)
+        except OSError:
+            return None  # 交给解码进程报告读取错误
+        payloads = self.cache.get(keys)
+        if payloads is None:
+            return keys
+        on_result({
+            "path": path,
+            "payloads": payloads,
+            "error": None if payloads else NO_QR_ERROR,
+            "stage": "cache",
+            "timings": {},
+            "ms": 0.0
+        })
+        return True
+
+    def cancel(self):
+        """取消尚未开始的解码任务"""
+        self.cancelled = True
+
+    def shutdown(self):
+        """关闭进程池"""
+        self.cancelled = True
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
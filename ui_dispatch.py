@@ -0,0 +1,142 @@
+"""后台线程 -> 界面线程的任务队列
+
+托盘、IPC、后台解码/导入导出等线程只调用 post()：往队列追加任务，并唤醒界面线程。
+界面线程被唤醒后取出任务执行：有积压时每帧（frame_ms）最多执行 batch_limit 个或 budget_ms 毫秒，
+避免后台突发任务挤占界面刷新；队列清空后不再安排任何定时器，空闲时（无论窗口是否可见）零唤醒。
+
+唤醒方式：post() 只设置一个 threading.Event，由专用的唤醒线程调用
+root.event_generate("<<UiDispatch>>", when="tail")。Tcl 为线程版（官方发行版默认）时，
+tkinter 会把其他线程的调用转交界面线程执行，虚拟事件排在事件队列末尾，界面线程处理到它时执行 drain。
+投递线程自身从不调用 Tk，界面线程忙时也不会被阻塞；连续投递只会合并成一次唤醒。
+Tcl 非线程版时无法跨线程唤醒，退回按 idle_ms 轮询。
+"""
+import threading
+import time
+from collections import deque
+
+from perf_metrics import LatencyStats
+
+FRAME_MS = 16
+IDLE_MS = 50
+BATCH_LIMIT = 64
+BUDGET_MS = 8.0
+WAKE_EVENT = "<<UiDispatch>>"
+
+
+class UiDispatcher:
+    """post(fn, *args) 可在任意线程调用；start()/stop() 只在界面线程调用"""
+
+    def __init__(self, root, frame_ms=FRAME_MS, idle_ms=IDLE_MS, batch_limit=BATCH_LIMIT, budget_ms=BUDGET_MS):
+        self.root = root
+        self.frame_ms = frame_ms
+        self.idle_ms = idle_ms  # 仅非线程版 Tcl 的轮询间隔
+        self.batch_limit = batch_limit
+        self.budget_ms = budget_ms
+        self.queue = deque()  # append/popleft 本身是线程安全的
+        self.lock = threading.Lock()  # 保护计数
+        self.posted = 0
+        self.executed = 0
+        self.max_depth = 0
+        self.latency_stats = LatencyStats("界面任务排队延迟", report_every=500)
+        self.job = None
+        self.running = False
+        self.polling = False  # Tcl 非线程版：无法跨线程唤醒，按 idle_ms 轮询
+        self.wake = threading.Event()
+        self.waker = None
+        self.wakeups = 0  # drain 执行次数（功耗统计）
+
+    def post(self, fn, *args):
+        """把 fn(*args) 交给界面线程执行"""
+        self.queue.append((time.perf_counter(), fn, args))
+        with self.lock:
+            self.posted += 1
+            depth = self.posted - self.executed
+            if depth > self.max_depth:
+                self.max_depth = depth
+        self.wake.set()
+
+    def start(self):
+        """绑定唤醒事件；唤醒线程等主循环运行后再启动（主循环之前跨线程调用 Tk 会卡住调用方）"""
+        self.root.bind(WAKE_EVENT, self._on_wake, add="+")
+        self.job = self.root.after(0, self._begin)
+
+    def _begin(self):
+        self.job = None
+        self.running = True
+        self.polling = not self.root.tk.getboolean(self.root.tk.eval("info exists tcl_platform(threaded)"))
+        if self.polling:
+            print("⚠️ Tcl 不是线程版，界面任务队列改为轮询")
+        else:
+            self.waker = threading.Thread(target=self._wake_loop, name="ui-dispatch-waker", daemon=True)
+            self.waker.start()
+        self.drain()
+
+    def _wake_loop(self):
+        """唤醒线程：每批投递产生一个虚拟事件"""
+        while True:
+            self.wake.wait()
+            if not self.running:
+                return
+            self.wake.clear()
+            try:
+                self.root.event_generate(WAKE_EVENT, when="tail")
+            except Exception as e:
+                # 窗口已销毁或主循环已退出
+                if self.running:
+                    print(f"❌ 界面任务队列唤醒失败: {e}")
+                return
+
+    def _on_wake(self, event=None):
+        if not self.running:
+            return
+        if self.job is not None:
+            # 积压时安排的下一帧提前执行
+            self.root.after_cancel(self.job)
+            self.job = None
+        self.drain()
+
+    def stop(self):
+        """停止处理（销毁窗口前调用）；未执行的任务丢弃"""
+        self.running = False
+        self.wake.set()  # 让唤醒线程退出
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+
+    def drain(self):
+        """执行一批任务；仍有积压时下一帧继续，队列为空时等下一次唤醒"""
+        self.job = None
+        self.wakeups += 1
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        done = 0
+        queue = self.queue
+        while queue and done < self.batch_limit:
+            posted_at, fn, args = queue.popleft()
+            start = time.perf_counter()
+            self.latency_stats.record((start - posted_at) * 1000)
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"❌ 界面任务出错（{getattr(fn, '__name__', fn)}）: {e}")
+            done += 1
+            if time.perf_counter() >= deadline:
+                break
+        with self.lock:
+            self.executed += done
+        if self.running:
+            if queue:
+                self.job = self.root.after(self.frame_ms, self.drain)
+            elif self.polling:
+                self.job = self.root.after(self.idle_ms, self.drain)
+
+    def depth(self):
+        return len(self.queue)
+
+    def metrics(self):
+        """{posted, executed, depth, max_depth, p50, p95, max}（延迟单位毫秒）"""
+        summary = self.latency_stats.summary()
+        with self.lock:
+            counts = {"posted": self.posted, "executed": self.executed, "max_depth": self.max_depth}
+        counts["depth"] = len(self.queue)
+        counts.update(p50=summary["p50"], p95=summary["p95"], max=summary["max"])
+        return counts
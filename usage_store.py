@@ -0,0 +1,189 @@
+"""复制频率存储（frecency）
+
+复制事件先追加写入日志文件，累计到一定条数后压缩为按账户ID索引的衰减分数。
+分数以对数形式保存：key = log2(Σ 2^(t_i / half_life))，它与当前时间无关，
+因此账户之间的相对顺序不会随时间漂移，每次复制只需要重新定位一个账户。
+"""
+import bisect
+import json
+import math
+import os
+import time
+
+# 默认半衰期：14天
+DEFAULT_HALF_LIFE = 14 * 86400
+# 日志条数超过该值时压缩
+DEFAULT_COMPACT_EVERY = 256
+
+_UNUSED = float("-inf")
+
+
+def _log2_add(a, b):
+    """计算 log2(2^a + 2^b)，避免溢出"""
+    if a == _UNUSED:
+        return b
+    if b == _UNUSED:
+        return a
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log2(1.0 + 2.0 ** (lo - hi))
+
+
+class UsageStore:
+    """持久化的复制频率存储"""
+
+    def __init__(self, directory, half_life=DEFAULT_HALF_LIFE, compact_every=DEFAULT_COMPACT_EVERY):
+        self.half_life = half_life
+        self.compact_every = compact_every
+        self.log_file = os.path.join(directory, ".auth_usage.log")
+        self.scores_file = os.path.join(directory, ".auth_usage.json")
+        self.keys = {}  # 账户ID -> 对数分数
+        self.log_lines = 0
+        self.load()
+
+    def load(self):
+        """读取压缩分数并重放追加日志"""
+        self.keys = {}
+        self.log_lines = 0
+        try:
+            if os.path.exists(self.scores_file):
+                with open(self.scores_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("half_life") == self.half_life:
+                    self.keys = {k: float(v) for k, v in data.get("keys", {}).items()}
+        except Exception as e:
+            print(f"读取使用频率失败: {e}")
+
+        try:
+            if os.path.exists(self.log_file):
+                with open(self.log_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        parts = line.split()
+                        if len(parts) != 2:
+                            continue  # 崩溃时可能留下半行，直接跳过
+                        try:
+                            ts = float(parts[0])
+                        except ValueError:
+                            continue
+                        self._apply(parts[1], ts)
+                        self.log_lines += 1
+        except Exception as e:
+            print(f"重放使用日志失败: {e}")
+
+    def _apply(self, account_id, ts):
+        key = _log2_add(self.keys.get(account_id, _UNUSED), ts / self.half_life)
+        self.keys[account_id] = key
+        return key
+
+    def record(self, account_id, now=None):
+        """记录一次复制事件，返回该账户的新排序分数"""
+        ts = time.time() if now is None else now
+        key = self._apply(account_id, ts)
+        try:
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(f"{ts:.3f} {account_id}\n")
+            self.log_lines += 1
+            if self.log_lines >= self.compact_every:
+                self.compact()
+        except Exception as e:
+            print(f"写入使用日志失败: {e}")
+        return key
+
+    def compact(self, valid_ids=None):
+        """把日志压缩进分数文件；可选地清理已删除账户"""
+        if valid_ids is not None:
+            self.keys = {k: v for k, v in self.keys.items() if k in valid_ids}
+        tmp_file = self.scores_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"half_life": self.half_life, "keys": self.keys}, f)
+        os.replace(tmp_file, self.scores_file)
+        # 分数文件落盘后再截断日志，中途崩溃最多重复计入一批事件
+        open(self.log_file, "w").close()
+        self.log_lines = 0
+
+    def prune(self, valid_ids):
+        """有已删除账户的分数时压缩并清理（加载账户后调用）；没有账户时不清理"""
+        valid_ids = set(valid_ids)
+        if valid_ids and any(account_id not in valid_ids for account_id in self.keys):
+            try:
+                self.compact(valid_ids)
+            except Exception as e:
+                print(f"压缩使用频率失败: {e}")
+
+    def key(self, account_id):
+        """与时间无关的排序分数（越大越常用）"""
+        return self.keys.get(account_id, _UNUSED)
+
+    def score(self, account_id, now=None):
+        """当前时刻的衰减分数（约等于半衰期内的有效复制次数）"""
+        key = self.key(account_id)
+        if key == _UNUSED:
+            return 0.0
+        ts = time.time() if now is None else now
+        return 2.0 ** (key - ts / self.half_life)
+
+
+class RankedOrder:
+    """按 frecency 排序的账户ID序列
+
+    内部维护有序的 (-分数, 插入序号, ID) 列表，复制后只需二分定位并移动一个元素：
+    定位 O(log n)，列表删除/插入是一次 O(n) 的指针搬移（一万个账户约几微秒），不做整体重排。
+    """
+
+    def __init__(self, store, account_ids=()):
+        self.store = store
+        self.entries = []
+        self.seq = {}
+        self.next_seq = 0
+        for account_id in account_ids:
+            self.add(account_id)
+
+    def _entry(self, account_id):
+        return (-self.store.key(account_id), self.seq[account_id], account_id)
+
+    def add(self, account_id):
+        """追加账户，返回其位置"""
+        if account_id in self.seq:
+            return self.index(account_id)
+        self.seq[account_id] = self.next_seq
+        self.next_seq += 1
+        entry = self._entry(account_id)
+        pos = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(pos, entry)
+        return pos
+
+    def remove(self, account_id):
+        """移除账户"""
+        if account_id not in self.seq:
+            return
+        pos = self.index(account_id)
+        del self.entries[pos]
+        del self.seq[account_id]
+
+    def index(self, account_id):
+        """账户当前位置（二分查找）"""
+        entry = self._entry(account_id)
+        pos = bisect.bisect_left(self.entries, entry)
+        if pos < len(self.entries) and self.entries[pos] == entry:
+            return pos
+        raise KeyError(account_id)
+
+    def touch(self, account_id, now=None):
+        """记录一次使用并重新定位，返回 (旧位置, 新位置)"""
+        old_pos = self.index(account_id)
+        del self.entries[old_pos]
+        self.store.record(account_id, now)
+        entry = self._entry(account_id)
+        new_pos = bisect.bisect_left(self.entries, entry)
+        self.entries.insert(new_pos, entry)
+        return old_pos, new_pos
+
+    def ids(self):
+        """按排序返回账户ID列表"""
+        return [entry[2] for entry in self.entries]
+
+    def top(self, count):
+        """最常用的 count 个账户ID（不含从未使用的账户）"""
+        return [entry[2] for entry in self.entries[:count] if entry[0] != -_UNUSED]
+
+    def __len__(self):
+        return len(self.entries)